@@ -0,0 +1,103 @@
+# benchmarks/bench_converter.py
+"""
+Compare the single-pass converter against the old serialize/re-parse one.
+
+Usage:
+    python -m benchmarks.bench_converter [--sections 200] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+from typing import Optional
+
+from bs4 import BeautifulSoup, Tag
+from markdownify import markdownify as md
+
+from src.converter import Section, html_to_sections
+from src.defaults import PARSERS
+
+
+def legacy_html_to_sections(html: str, lesson_title: str) -> list[Section]:
+    """The baseline: src/converter.py as it was before the single-pass rewrite, copied verbatim."""
+    if not html.strip():
+        return [Section(heading=lesson_title, content="")]
+
+    soup = BeautifulSoup(html, "html.parser")
+    sections: list[Section] = []
+    current_heading = lesson_title
+    current_nodes: list = []
+
+    def flush():
+        raw = "".join(str(n) for n in current_nodes)
+        content = md(raw, heading_style="ATX").strip()
+        sections.append(Section(heading=current_heading, content=content))
+
+    for elem in soup.children:
+        if isinstance(elem, Tag) and elem.name in ("h2", "h3"):
+            if current_nodes:
+                flush()
+            current_heading = elem.get_text(strip=True)
+            current_nodes = []
+        else:
+            current_nodes.append(elem)
+
+    if current_nodes:
+        flush()
+
+    if not sections:
+        # Fallback: HTML had only headings with no interspersed content
+        sections.append(Section(heading=lesson_title, content=md(html, heading_style="ATX").strip()))
+
+    return sections
+
+
+def make_reading(sections: int) -> str:
+    """A long reading with the tables, lists and code blocks Coursera lessons tend to have."""
+    parts = []
+    for i in range(sections):
+        parts.append(f"<h2>Section {i}</h2>")
+        parts.append(
+            "<p>Prompting is <strong>iterative</strong>: write, test, <em>refine</em>. "
+            f'See <a href="https://example.com/{i}">reference {i}</a> for details.</p>' * 3
+        )
+        parts.append("<ul>" + "".join(f"<li>Point {j} with <code>inline()</code></li>" for j in range(6)) + "</ul>")
+        parts.append(
+            "<table><thead><tr><th>Model</th><th>Score</th></tr></thead><tbody>"
+            + "".join(f"<tr><td>model-{j}</td><td>{j * 7 % 100}</td></tr>" for j in range(8))
+            + "</tbody></table>"
+        )
+        parts.append("<pre><code>for step in range(10):\n    print(step)\n</code></pre>")
+    return "".join(parts)
+
+
+def timed(fn, repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sections", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    html = make_reading(args.sections)
+    print(f"Reading: {len(html) / 1000:.0f} kB, {args.sections} sections, median of {args.repeat} runs")
+
+    baseline = timed(lambda: legacy_html_to_sections(html, "Bench"), args.repeat)
+    print(f"  {'legacy (html.parser)':<24} {baseline * 1000:8.1f} ms")
+    for name in PARSERS:
+        try:
+            elapsed = timed(lambda: html_to_sections(html, "Bench", parser=name), args.repeat)
+        except Exception as e:
+            print(f"  {'single-pass (' + name + ')':<24} unavailable: {e}")
+            continue
+        print(f"  {'single-pass (' + name + ')':<24} {elapsed * 1000:8.1f} ms  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# benchmarks/bench_e2e.py
+"""
+End-to-end scraper benchmark against the local fake Coursera server.
+
+Each run drives main.run in a fresh process and working directory and
+reports lessons/s, p50/p95 lesson latency, peak RSS and CPU time; the
+median of --repeat runs is compared with --baseline if given. Options not
+listed here (--concurrency, --sink, --no-direct, ...) are passed through
+to the scraper.
+
+Usage:
+    python -m benchmarks.bench_e2e [--modules 4] [--readings 10] [--sections 20]
+        [--latency-ms 50] [--repeat 3] [--cache cold|warm] [--json out.json]
+        [--baseline base.json --tolerance 0.1] [scraper options...]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.fake_coursera import FakeCourse, base_url, start_server
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+COURSE_SLUG = "bench-course"
+METRICS = ("lessons_per_second", "p50_ms", "p95_ms", "peak_rss_mb", "child_peak_rss_mb", "cpu_s")
+
+
+def child(course_url: str, scraper_args: list[str]) -> None:
+    """Run one scrape in this process (cwd is a scratch directory) and print its metrics as JSON."""
+    Path("session.json").write_text(json.dumps({"cookies": [], "origins": []}))
+    os.environ.setdefault("COURSERA_EMAIL", "bench@example.com")
+    os.environ.setdefault("COURSERA_PASSWORD", "bench")
+
+    # Imported here so COURSERA_BASE_URL from the parent is in place first
+    import main as scraper
+    from src.metrics import metrics
+
+    args = scraper.parse_args([course_url] + scraper_args)
+    started = time.monotonic()
+    result = asyncio.run(scraper.run(course_url, scraper.options_from_args(args)))
+    wall = time.monotonic() - started
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # Per-lesson latency (start of extraction to saved), from the metrics report
+    lesson = metrics.report()["stages"].get("lesson", {})
+    print(
+        json.dumps(
+            {
+                "lessons": result.stats.saved,
+                "wall_s": wall,
+                "lessons_per_second": result.stats.saved / wall if wall > 0 else 0.0,
+                "p50_ms": lesson.get("p50_s", 0.0) * 1000,
+                "p95_ms": lesson.get("p95_s", 0.0) * 1000,
+                # ru_maxrss is in KiB on Linux; for children it is the largest single child
+                "peak_rss_mb": own.ru_maxrss / 1024,
+                "child_peak_rss_mb": children.ru_maxrss / 1024,
+                "cpu_s": own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+            }
+        )
+    )
+
+
+def run_once(url: str, workdir: Path, scraper_args: list[str]) -> dict:
+    env = dict(os.environ, COURSERA_BASE_URL=url, PYTHONPATH=str(REPO_ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_e2e", "--child", f"{url}/learn/{COURSE_SLUG}", "--", *scraper_args],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Scraper run failed ({proc.returncode}):\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs: list[dict]) -> dict:
+    return {key: statistics.median(r[key] for r in runs) for key in METRICS}
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions beyond `tolerance` (a fraction) against a previous --json output."""
+    problems = []
+    base = baseline["summary"]
+    if summary["lessons_per_second"] < base["lessons_per_second"] * (1 - tolerance):
+        problems.append(
+            f"throughput {summary['lessons_per_second']:.2f} < baseline {base['lessons_per_second']:.2f} lessons/s"
+        )
+    for key in ("p95_ms", "peak_rss_mb", "cpu_s"):
+        if summary[key] > base[key] * (1 + tolerance):
+            problems.append(f"{key} {summary[key]:.1f} > baseline {base[key]:.1f}")
+    return problems
+
+
+def main(argv: Optional[list[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--child" in argv:
+        i = argv.index("--child")
+        rest = argv[i + 2:]
+        child(argv[i + 1], rest[1:] if rest[:1] == ["--"] else rest)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", type=int, default=4)
+    parser.add_argument("--readings", type=int, default=10, help="Readings per module")
+    parser.add_argument("--sections", type=int, default=20, help="Sections per reading (payload size)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Server delay per request")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--cache",
+        choices=("cold", "warm"),
+        default="cold",
+        help="warm: scrape once untimed first, so timed runs read HTML from the cache "
+        "(with --no-incremental, or they would skip every lesson as unchanged)",
+    )
+    parser.add_argument("--json", type=Path, help="Write the runs and their median here")
+    parser.add_argument("--baseline", type=Path, help="Earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args, scraper_args = parser.parse_known_args(argv)
+    if "--rate" not in scraper_args:
+        # The production default paces lessons 2s apart, which would hide everything else
+        scraper_args += ["--rate", "0"]
+    if args.cache == "warm" and "--no-incremental" not in scraper_args:
+        # The untimed run records every lesson in the manifest; the timed run
+        # should still convert and write them, only with HTML from the cache
+        scraper_args += ["--no-incremental"]
+
+    course = FakeCourse(args.modules, args.readings, args.sections, args.latency_ms / 1000)
+    server = start_server(course)
+    url = base_url(server)
+    print(
+        f"{course.total_readings} readings x {args.sections} sections, {args.latency_ms:.0f} ms latency, "
+        f"{args.cache} cache, scraper args: {' '.join(scraper_args)}"
+    )
+
+    runs = []
+    try:
+        for i in range(args.repeat):
+            with tempfile.TemporaryDirectory(prefix="bench-e2e-") as tmp:
+                if args.cache == "warm":
+                    run_once(url, Path(tmp), scraper_args)
+                result = run_once(url, Path(tmp), scraper_args)
+            if result["lessons"] == 0:
+                sys.exit(f"Run {i + 1} processed no lessons; its throughput would be meaningless")
+            runs.append(result)
+            print(
+                f"  run {i + 1}: {result['lessons']} lessons, {result['lessons_per_second']:6.2f} lessons/s, "
+                f"p50 {result['p50_ms']:7.1f} ms, p95 {result['p95_ms']:7.1f} ms, "
+                f"RSS {result['peak_rss_mb']:6.1f} MB (largest child {result['child_peak_rss_mb']:6.1f} MB), "
+                f"CPU {result['cpu_s']:6.2f} s"
+            )
+    finally:
+        server.shutdown()
+
+    summary = summarize(runs)
+    print("  median: " + ", ".join(f"{key} {summary[key]:.2f}" for key in METRICS))
+    if args.json is not None:
+        args.json.write_text(
+            json.dumps({"settings": vars(args) | {"scraper_args": scraper_args}, "runs": runs, "summary": summary},
+                       indent=2, default=str)
+        )
+    if args.baseline is not None:
+        problems = compare(summary, json.loads(args.baseline.read_text()), args.tolerance)
+        for problem in problems:
+            print(f"  REGRESSION: {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
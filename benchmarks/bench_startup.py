@@ -0,0 +1,102 @@
+# benchmarks/bench_startup.py
+"""
+CLI startup time per subcommand, and which heavy modules each one loads.
+
+Each case runs `python main.py ... --help` in a fresh interpreter --repeat
+times and reports the median wall time next to a bare `python -c pass`.
+Browser-free commands must stay under --budget-ms and must not import
+Playwright, BeautifulSoup or markdownify just to start; --check turns a
+violation into exit status 1.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 10] [--budget-ms 100] [--check] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("playwright", "bs4", "markdownify")
+MARKER = "LOADED_HEAVY_MODULES="
+
+# (name, main.py arguments, browser-free)
+CASES = [
+    ("help", ["--help"], True),
+    ("convert", ["convert", "--help"], True),
+    ("export", ["export", "--help"], True),
+    ("search", ["search", "--help"], True),
+    ("discover", ["discover", "--help"], False),
+    ("scrape", ["scrape", "--help"], False),
+]
+
+# Runs main.py as __main__ and reports the heavy top-level packages it left in sys.modules
+_PROBE = f"""
+import atexit, runpy, sys
+atexit.register(lambda: print({MARKER!r} + ",".join(sorted(
+    m for m in sys.modules if "." not in m and m in {HEAVY_MODULES!r}))))
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def heavy_modules(args: list[str]) -> list[str]:
+    """Heavy packages imported by `main.py *args`."""
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE, "main.py", *args],
+        cwd=REPO_ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith(MARKER):
+            return [m for m in line[len(MARKER):].split(",") if m]
+    raise RuntimeError(f"main.py {' '.join(args)} did not finish: exit status {proc.returncode}")
+
+
+def startup_ms(command: list[str], repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        runs.append((time.perf_counter() - started) * 1000)
+    return statistics.median(runs)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Limit for browser-free commands")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a browser-free command breaks the budget")
+    parser.add_argument("--json", type=Path, help="Write the results here")
+    args = parser.parse_args(argv)
+
+    interpreter = startup_ms([sys.executable, "-c", "pass"], args.repeat)
+    print(f"Median of {args.repeat} runs; bare interpreter {interpreter:.1f} ms")
+    results = []
+    problems = []
+    for name, case_args, browser_free in CASES:
+        elapsed = startup_ms([sys.executable, "main.py", *case_args], args.repeat)
+        loaded = heavy_modules(case_args)
+        results.append({"command": name, "ms": elapsed, "heavy_modules": loaded, "browser_free": browser_free})
+        print(f"  {name:<10} {elapsed:7.1f} ms  (+{elapsed - interpreter:5.1f})  loads: {', '.join(loaded) or '-'}")
+        if browser_free and elapsed > args.budget_ms:
+            problems.append(f"{name} took {elapsed:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        if browser_free and loaded:
+            problems.append(f"{name} imports {', '.join(loaded)}")
+
+    if args.json is not None:
+        args.json.write_text(json.dumps({"interpreter_ms": interpreter, "results": results}, indent=2))
+    for problem in problems:
+        print(f"  REGRESSION: {problem}")
+    if args.check and problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
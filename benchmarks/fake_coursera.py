@@ -0,0 +1,220 @@
+# benchmarks/fake_coursera.py
+"""
+Local stand-in for the parts of Coursera the scraper talks to.
+
+Serves synthetic course home, module and lesson pages plus the
+onDemandCourses.v1, onDemandCourseMaterials.v2 and onDemandSupplements.v1
+JSON for any course slug, with a fixed delay per request. Content is
+deterministic, so runs against the same settings see the same input.
+
+Usage:
+    python -m benchmarks.fake_coursera [--port 8000] [--modules 4] [--readings 10]
+        [--sections 20] [--latency-ms 50]
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.bench_converter import make_reading
+
+
+@dataclass
+class FakeCourse:
+    modules: int = 4
+    readings_per_module: int = 10
+    sections: int = 20
+    latency: float = 0.05
+
+    @property
+    def total_readings(self) -> int:
+        return self.modules * self.readings_per_module
+
+
+def _item_id(module: int, reading: int) -> str:
+    return f"m{module}r{reading}"
+
+
+def _course_id(slug: str) -> str:
+    return f"course-{slug}"
+
+
+def home_page(course: FakeCourse, slug: str) -> str:
+    links = "".join(
+        f'<a data-testid="rc-WeekNavigationItem" href="/learn/{slug}/home/module/{m + 1}">Module {m + 1}</a>'
+        for m in range(course.modules)
+    )
+    return f"<html><body><nav>{links}</nav></body></html>"
+
+
+def module_page(course: FakeCourse, slug: str, module: int) -> str:
+    items = "".join(
+        f'<li data-test="WeekSingleItemDisplay-supplement">'
+        f'<a href="/learn/{slug}/supplement/{_item_id(module, r)}/reading-{r + 1}">'
+        f'<span data-test="rc-ItemName">Reading {module + 1}.{r + 1}</span></a></li>'
+        for r in range(course.readings_per_module)
+    )
+    return (
+        f'<html><body><div data-test="rc-periodPage"><h2>Module {module + 1}</h2>'
+        f"<ul>{items}</ul></div></body></html>"
+    )
+
+
+def lesson_page(slug: str, item_id: str) -> str:
+    # Like the real page, the reading arrives through an API call made by the page's script
+    api = f"/api/onDemandSupplements.v1/{_course_id(slug)}~{item_id}?includes=asset"
+    return f'<html><body><div id="root"></div><script>fetch("{api}")</script></body></html>'
+
+
+def course_materials(course: FakeCourse, slug: str) -> dict:
+    modules, lessons, items = [], [], []
+    for m in range(course.modules):
+        lesson_id = f"l{m}"
+        item_ids = [_item_id(m, r) for r in range(course.readings_per_module)] + [f"m{m}video"]
+        modules.append({"id": f"mod{m}", "name": f"Module {m + 1}", "lessonIds": [lesson_id]})
+        lessons.append({"id": lesson_id, "name": f"Lesson {m + 1}", "itemIds": item_ids})
+        items.extend(
+            {
+                "id": _item_id(m, r),
+                "name": f"Reading {m + 1}.{r + 1}",
+                "slug": f"reading-{r + 1}",
+                "contentSummary": {"typeName": "supplement"},
+            }
+            for r in range(course.readings_per_module)
+        )
+        items.append({"id": f"m{m}video", "name": "Video", "slug": "video", "contentSummary": {"typeName": "lecture"}})
+    return {
+        "elements": [{"id": _course_id(slug), "moduleIds": [m["id"] for m in modules]}],
+        "linked": {
+            "onDemandCourseMaterialModules.v1": modules,
+            "onDemandCourseMaterialLessons.v1": lessons,
+            "onDemandCourseMaterialItems.v2": items,
+        },
+    }
+
+
+def supplement(course: FakeCourse, item_id: str) -> dict:
+    html = f"<p>Introduction to {item_id}.</p>" + make_reading(course.sections)
+    return {
+        "elements": [{"id": item_id}],
+        "linked": {
+            "openCourseAssets.v1": [
+                {"typeName": "cml", "definition": {"renderableHtmlWithMetadata": {"renderableHtml": html}}}
+            ]
+        },
+    }
+
+
+ROUTES = [
+    (re.compile(r"^/learn/([^/]+)/home/module/(\d+)$"), "module"),
+    (re.compile(r"^/learn/([^/]+)/supplement/([^/]+)(?:/[^/]*)?$"), "lesson"),
+    (re.compile(r"^/learn/([^/]+)(?:/home(?:/[^/]*)?)?/?$"), "home"),
+    (re.compile(r"^/api/onDemandSupplements\.v1/[^~]+~([^/?]+)$"), "supplement"),
+    (re.compile(r"^/api/onDemandCourseMaterials\.v2/?$"), "materials"),
+    (re.compile(r"^/api/onDemandCourses\.v1$"), "courses"),
+    (re.compile(r"^/api/externalBasicProfiles\.v1$"), "profile"),
+    (re.compile(r"^/$"), "index"),
+]
+
+
+def make_handler(course: FakeCourse):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if course.latency > 0:
+                time.sleep(course.latency)
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            for pattern, name in ROUTES:
+                match = pattern.match(url.path)
+                if match:
+                    break
+            else:
+                return self._send(404, "text/plain", b"not found")
+
+            if name == "home":
+                self._html(home_page(course, match.group(1)))
+            elif name == "module":
+                module = int(match.group(2)) - 1
+                if not 0 <= module < course.modules:
+                    return self._send(404, "text/plain", b"no such module")
+                self._html(module_page(course, match.group(1), module))
+            elif name == "lesson":
+                self._html(lesson_page(match.group(1), match.group(2)))
+            elif name == "supplement":
+                self._json(supplement(course, match.group(1)))
+            elif name == "materials":
+                self._json(course_materials(course, query.get("slug", [""])[0]))
+            elif name == "courses":
+                self._json({"elements": [{"id": _course_id(query.get("slug", [""])[0])}]})
+            elif name == "profile":
+                # Every session is logged in, so auth.login's session check passes
+                self._json({"elements": [{"id": "1", "name": "Bench User"}]})
+            else:
+                self._html("<html><body>Fake Coursera</body></html>")
+
+        def _html(self, body: str):
+            self._send(200, "text/html; charset=utf-8", body.encode("utf-8"))
+
+        def _json(self, data: dict):
+            self._send(200, "application/json", json.dumps(data).encode("utf-8"))
+
+        def _send(self, status: int, content_type: str, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(course: FakeCourse, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve `course` on a background thread. Call .shutdown() to stop it."""
+    server = ThreadingHTTPServer((host, port), make_handler(course))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def serve_in_process(course: FakeCourse, conn) -> None:
+    """multiprocessing target: start the server, send its base URL through `conn`, serve until killed."""
+    server = start_server(course)
+    conn.send(base_url(server))
+    threading.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--modules", type=int, default=4)
+    parser.add_argument("--readings", type=int, default=10, help="Readings per module")
+    parser.add_argument("--sections", type=int, default=20, help="Sections per reading (payload size)")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    course = FakeCourse(args.modules, args.readings, args.sections, args.latency_ms / 1000)
+    server = start_server(course, port=args.port)
+    print(f"Serving {course.total_readings} readings per course on {base_url(server)}")
+    print(f"Point the scraper at it with COURSERA_BASE_URL={base_url(server)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,73 +1,571 @@
 # main.py
-import asyncio
+"""
+Download Coursera Reading lessons.
+
+Usage:
+    python main.py [scrape] COURSE_URL | --batch FILE [options]
+    python main.py discover COURSE_URL [--json]
+    python main.py convert [--course SLUG] [--sink csv|jsonl|...|sqlite]
+    python main.py export [--course SLUG] [--output output]
+    python main.py search "chain of thought" [--limit 20]
+    python main.py bench e2e|converter|startup [benchmark options]
+    python main.py browser [--port 9222]
+
+Every subcommand imports what it needs when it runs: convert, export and
+search never load Playwright, and nothing loads before the command is known.
+"""
+from __future__ import annotations
+
+import argparse
 import logging
 import os
 import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-from dotenv import load_dotenv
-
-from src.auth import login
-from src.navigator import get_course_readings
-from src.extractor import extract_reading_content
-from src.converter import html_to_sections
-from src.writer import write_csv
+if TYPE_CHECKING:
+    from src.runner import ScrapeOptions
 
-load_dotenv()
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
-DELAY_BETWEEN_LESSONS = float(os.getenv("SCRAPE_DELAY", "2"))
+COMMANDS = {
+    "scrape": "Download the reading lessons of one or more courses (the default)",
+    "discover": "List a course's reading lessons without downloading them",
+    "convert": "Rebuild outputs from archived reading HTML, with no browser or network",
+    "export": "Write lessons stored by --sink sqlite as per-lesson CSV files",
+    "search": "Full-text search over the sections stored by --sink sqlite",
+    "bench": "Run a benchmark: e2e, converter or startup",
+    "browser": "Keep a browser running for scrape/discover --browser-endpoint",
+}
+ALIASES = {"reconvert": "convert"}
+BENCHMARKS = {
+    "e2e": "benchmarks.bench_e2e",
+    "converter": "benchmarks.bench_converter",
+    "startup": "benchmarks.bench_startup",
+}
 
 
-async def run(course_url: str):
-    email = os.getenv("COURSERA_EMAIL")
-    password = os.getenv("COURSERA_PASSWORD")
-    if not email or not password:
+def _load_env() -> None:
+    """Read .env; must run before src modules that read settings at import (SCRAPE_DELAY, ...)."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def _credentials(options: ScrapeOptions) -> tuple[str, str]:
+    _load_env()
+    email = os.getenv("COURSERA_EMAIL", "")
+    password = os.getenv("COURSERA_PASSWORD", "")
+    # Replays never log in
+    if (not email or not password) and options.replay_har is None:
         logger.error("Missing COURSERA_EMAIL or COURSERA_PASSWORD in environment / .env file")
         sys.exit(1)
+    return email, password
 
-    logger.info("Logging into Coursera...")
-    playwright, browser, context = await login(email, password)
 
-    try:
-        logger.info(f"Fetching course structure from {course_url}")
-        readings, course_slug = await get_course_readings(context, course_url)
+def read_course_list(path: Path) -> list[str]:
+    """One course URL per line; blank lines and # comments are ignored."""
+    urls = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line and line not in urls:
+            urls.append(line)
+    return urls
+
+
+async def run(course_url: str, options: ScrapeOptions | None = None):
+    from src.runner import ScrapeOptions, run_courses
+
+    options = options or ScrapeOptions()
+    email, password = _credentials(options)
+    [result] = await run_courses([course_url], email, password, options)
+    if not result.ok:
+        sys.exit(1)
+    logger.info("Done.")
+    return result
+
+
+async def run_batch(course_urls: list[str], options: ScrapeOptions | None = None):
+    from src.runner import ScrapeOptions, log_results, run_courses
+
+    options = options or ScrapeOptions()
+    email, password = _credentials(options)
+    results = await run_courses(course_urls, email, password, options)
+    log_results(results)
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+async def run_workers(course_urls: list[str], workers: int, options: ScrapeOptions | None = None):
+    from src.runner import ScrapeOptions, log_results
+    from src.sharding import run_sharded
+
+    options = options or ScrapeOptions()
+    email, password = _credentials(options)
+    results = await run_sharded(course_urls, email, password, options, workers)
+    log_results(results)
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+def add_browser_endpoint(parser: argparse.ArgumentParser, default: str | None) -> None:
+    parser.add_argument(
+        "--browser-endpoint",
+        default=default,
+        help="Use an already-running browser instead of launching one: a Playwright "
+        "ws:// endpoint or a DevTools http:// endpoint such as the one `main.py browser` "
+        "prints (default: SCRAPE_BROWSER_ENDPOINT)",
+    )
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """Options of the scrape command."""
+    from src.defaults import DEFAULT_ARCHIVE_DIR, DEFAULT_DB_PATH, DEFAULT_PARSER, PARSERS, SINKS
+    from src.metrics import DEFAULT_METRICS_PATH
+    from src.pagepool import DEFAULT_MAX_HEAP_MB, DEFAULT_MAX_USES
+    from src.runner import (
+        DEFAULT_BROWSER_ENDPOINT,
+        DEFAULT_CACHE_MAX_MB,
+        DEFAULT_CONCURRENCY,
+        DEFAULT_CONVERT_WORKERS,
+    )
+    from src.sharding import SHARDABLE_SINKS
+
+    parser = argparse.ArgumentParser(prog="main.py scrape", description="Download Coursera Reading lessons.")
+    parser.add_argument(
+        "course_url", nargs="?", help="Course URL, e.g. https://www.coursera.org/learn/<slug>"
+    )
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        help="File with one course URL per line; all courses share one browser and login",
+    )
+    parser.add_argument(
+        "--parallel-courses",
+        type=int,
+        default=2,
+        help="Courses scraped at the same time in --batch mode (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Scrape with this many worker processes, each with its own browser, "
+        "claiming lessons from a shared queue; --concurrency applies per worker "
+        "(default: one process)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of lessons extracted in parallel, shared by all courses (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Max lessons started per second across all workers "
+        "(default: 1 / SCRAPE_DELAY; 0 disables the limit)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Adjust --rate and --concurrency during the run: back off on HTTP 429/5xx "
+        "or slow responses, speed up again while responses are healthy",
+    )
+    parser.add_argument(
+        "--min-rate",
+        type=float,
+        default=0.2,
+        help="Lowest lessons/s --adaptive may back off to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=5.0,
+        help="Highest lessons/s --adaptive may reach (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-concurrency",
+        type=int,
+        default=1,
+        help="Lowest concurrency --adaptive may back off to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=8,
+        help="Highest concurrency --adaptive may reach (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--target-latency",
+        type=float,
+        default=5.0,
+        help="Seconds to first byte above which --adaptive treats a response as congestion "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--page-max-uses",
+        type=int,
+        default=DEFAULT_MAX_USES,
+        help="Navigations before a reused browser page is replaced; 0 opens a fresh page "
+        "for every navigation (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--page-max-heap-mb",
+        type=float,
+        default=DEFAULT_MAX_HEAP_MB,
+        help="Replace a reused page once its JS heap grows past this (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-direct",
+        dest="direct",
+        action="store_false",
+        help="Always render lesson pages instead of calling the supplements API directly",
+    )
+    parser.add_argument(
+        "--no-block-resources",
+        dest="block_resources",
+        action="store_false",
+        help="Download images, fonts, media and telemetry like a normal browser",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached HTML and fetch every reading again (the cache is still updated)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Do not read or write the HTML cache in output/.cache",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help="Hours before a cached reading is fetched again (default: never expires)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_MB,
+        help="Cache size cap; least recently used entries are evicted (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Discard the journal of an interrupted run and start from lesson 1",
+    )
+    parser.add_argument(
+        "--no-incremental",
+        dest="incremental",
+        action="store_false",
+        help="Convert and write every lesson, even those whose reading HTML is unchanged "
+        "since the last run (JSON Lines sinks always do)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        dest="archive",
+        action="store_false",
+        help=f"Do not keep each reading's raw HTML in {DEFAULT_ARCHIVE_DIR} (needed by `reconvert`)",
+    )
+    parser.add_argument(
+        "--no-api-discovery",
+        dest="api_discovery",
+        action="store_false",
+        help="Find readings by scraping module pages instead of the course-materials API",
+    )
+    parser.add_argument(
+        "--convert-workers",
+        type=int,
+        default=DEFAULT_CONVERT_WORKERS,
+        help="Processes converting HTML to Markdown; 0 converts on the event loop "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSERS,
+        default=DEFAULT_PARSER,
+        help="HTML parser used by the converter (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sink",
+        choices=SINKS,
+        default="csv",
+        help="Output format: one CSV per lesson, one (compressed) JSON Lines file "
+        "per course, or one SQLite database with a full-text index (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help="Database file for --sink sqlite (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        default=DEFAULT_METRICS_PATH,
+        help="JSON report of per-stage timings, per-lesson spans and counters (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--prometheus",
+        type=Path,
+        help="Also write the metrics as a Prometheus node_exporter textfile here",
+    )
+    add_browser_endpoint(parser, DEFAULT_BROWSER_ENDPOINT)
+    har = parser.add_mutually_exclusive_group()
+    har.add_argument(
+        "--record-har",
+        type=Path,
+        help="Record all browser traffic to this HAR file (.har or .zip) for later replay. "
+        "Lessons and modules are fetched by navigation and the cache is bypassed; "
+        "the archive contains session cookies, so keep it private",
+    )
+    har.add_argument(
+        "--replay-har",
+        type=Path,
+        help="Serve every request from a HAR file made with --record-har, "
+        "without touching the network or logging in",
+    )
+    args = parser.parse_args(argv)
+    if (args.course_url is None) == (args.batch is None):
+        parser.error("give either a COURSE_URL or --batch FILE")
+    if args.workers and args.sink not in SHARDABLE_SINKS:
+        parser.error(f"--workers supports --sink {' or '.join(SHARDABLE_SINKS)}")
+    if args.workers and args.record_har is not None:
+        parser.error("--record-har cannot be combined with --workers")
+    return args
+
+
+def options_from_args(args: argparse.Namespace) -> ScrapeOptions:
+    from src.runner import ScrapeOptions
+
+    return ScrapeOptions(
+        concurrency=args.concurrency,
+        rate=args.rate,
+        adaptive=args.adaptive,
+        min_rate=args.min_rate,
+        max_rate=args.max_rate,
+        min_concurrency=args.min_concurrency,
+        max_concurrency=args.max_concurrency,
+        target_latency=args.target_latency,
+        incremental=args.incremental,
+        archive=args.archive,
+        page_max_uses=args.page_max_uses,
+        page_max_heap_mb=args.page_max_heap_mb,
+        direct=args.direct,
+        block_resources=args.block_resources,
+        use_cache=args.use_cache,
+        refresh=args.refresh,
+        cache_ttl=args.cache_ttl,
+        cache_max_mb=args.cache_max_mb,
+        fresh=args.fresh,
+        api_discovery=args.api_discovery,
+        convert_workers=args.convert_workers,
+        parser=args.parser,
+        sink=args.sink,
+        db_path=args.db,
+        parallel_courses=args.parallel_courses,
+        record_har=args.record_har,
+        replay_har=args.replay_har,
+        browser_endpoint=args.browser_endpoint,
+        metrics_path=args.metrics,
+        prometheus_path=args.prometheus,
+    )
+
+
+def scrape(argv: list[str]) -> None:
+    import asyncio
+
+    _load_env()
+    args = parse_args(argv)
+    options = options_from_args(args)
+    if args.workers > 0:
+        urls = read_course_list(args.batch) if args.batch is not None else [args.course_url]
+        asyncio.run(run_workers(urls, args.workers, options))
+    elif args.batch is not None:
+        asyncio.run(run_batch(read_course_list(args.batch), options))
+    else:
+        asyncio.run(run(args.course_url, options))
 
-        if not readings:
-            logger.warning("No Reading lessons found in this course.")
-            return
 
-        logger.info(f"Found {len(readings)} Reading lessons. Starting extraction...")
+def discover(argv: list[str]) -> None:
+    import asyncio
+    import json
+    from dataclasses import asdict
 
-        for i, lesson in enumerate(readings, 1):
-            logger.info(f"[{i}/{len(readings)}] {lesson.module} → {lesson.lesson_title}")
-            html = await extract_reading_content(context, lesson.url)
+    _load_env()
+    from src.runner import DEFAULT_BROWSER_ENDPOINT, ScrapeOptions, discover_course
 
-            if html is None:
-                logger.warning(f"  Skipping — could not extract content.")
-                continue
+    parser = argparse.ArgumentParser(prog="main.py discover", description=COMMANDS["discover"] + ".")
+    parser.add_argument("course_url")
+    parser.add_argument("--json", action="store_true", help="One JSON object per lesson")
+    parser.add_argument(
+        "--no-api-discovery",
+        dest="api_discovery",
+        action="store_false",
+        help="Scrape module pages instead of calling the course-materials API",
+    )
+    parser.add_argument("--replay-har", type=Path, help="Serve every request from this HAR file")
+    add_browser_endpoint(parser, DEFAULT_BROWSER_ENDPOINT)
+    args = parser.parse_args(argv)
 
-            sections = html_to_sections(html, lesson_title=lesson.lesson_title)
-            path = write_csv(
-                course_slug=course_slug,
-                module=lesson.module,
-                lesson_title=lesson.lesson_title,
-                sections=sections,
-            )
-            logger.info(f"  Saved → {path}")
+    options = ScrapeOptions(
+        api_discovery=args.api_discovery,
+        replay_har=args.replay_har,
+        browser_endpoint=args.browser_endpoint,
+    )
+    email, password = _credentials(options)
+    readings = asyncio.run(discover_course(args.course_url, email, password, options))
+    for lesson in readings:
+        if args.json:
+            print(json.dumps(asdict(lesson), ensure_ascii=False))
+        else:
+            print(f"{lesson.module} / {lesson.lesson_title} / {lesson.url}")
+    logger.info(f"{len(readings)} reading lesson(s)")
 
-            if i < len(readings):
-                await asyncio.sleep(DELAY_BETWEEN_LESSONS)
 
+def convert(argv: list[str]) -> None:
+    from src.defaults import DEFAULT_ARCHIVE_DIR, DEFAULT_DB_PATH, DEFAULT_PARSER, PARSERS, SINKS
+
+    parser = argparse.ArgumentParser(prog="main.py convert", description=COMMANDS["convert"] + ".")
+    parser.add_argument("--course", help="Only this course slug (default: every archived course)")
+    parser.add_argument(
+        "--archive",
+        type=Path,
+        default=DEFAULT_ARCHIVE_DIR,
+        help="Archive written by earlier scrapes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Converter processes (default: one per core, %(default)s)",
+    )
+    parser.add_argument("--parser", choices=PARSERS, default=DEFAULT_PARSER)
+    parser.add_argument("--sink", choices=SINKS, default="csv")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH)
+    args = parser.parse_args(argv)
+
+    # After parsing, so --help and usage errors do not pay for the converter's imports
+    from src.archive import HtmlArchive
+    from src.reconvert import reconvert
+
+    stats = reconvert(
+        HtmlArchive(args.archive),
+        course_slug=args.course,
+        sink=args.sink,
+        db_path=args.db,
+        parser=args.parser,
+        workers=args.workers,
+    )
+    if stats.failed:
+        sys.exit(1)
+
+
+def export(argv: list[str]) -> None:
+    from src.defaults import DEFAULT_DB_PATH
+
+    parser = argparse.ArgumentParser(prog="main.py export", description=COMMANDS["export"] + ".")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH)
+    parser.add_argument("--course", help="Only export this course slug")
+    parser.add_argument("--output", type=Path, default=Path("output"))
+    args = parser.parse_args(argv)
+
+    if not args.db.exists():
+        parser.error(f"{args.db} does not exist")
+    from src.database import SectionDatabase
+
+    db = SectionDatabase(args.db)
+    try:
+        paths = db.export_csv(args.output, course_slug=args.course)
     finally:
-        await browser.close()
-        await playwright.stop()
+        db.close()
+    logger.info(f"Exported {len(paths)} lesson(s) to {args.output}")
+
+
+def search(argv: list[str]) -> None:
+    from src.defaults import DEFAULT_DB_PATH
+
+    parser = argparse.ArgumentParser(prog="main.py search", description=COMMANDS["search"] + ".")
+    parser.add_argument("query")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if not args.db.exists():
+        parser.error(f"{args.db} does not exist")
+    from src.database import SectionDatabase
+
+    db = SectionDatabase(args.db)
+    try:
+        for hit in db.search(args.query, limit=args.limit):
+            print(f"{hit.course_slug} / {hit.module} / {hit.lesson_title} / {hit.section}")
+            print(f"    {hit.snippet}")
+    finally:
+        db.close()
+
+
+def bench(argv: list[str]) -> None:
+    import importlib
+
+    if not argv or argv[0] not in BENCHMARKS:
+        sys.exit(f"usage: main.py bench {{{','.join(BENCHMARKS)}}} [benchmark options]")
+    importlib.import_module(BENCHMARKS[argv[0]]).main(argv[1:])
+
+
+def browser(argv: list[str]) -> None:
+    import asyncio
+
+    from src.auth import serve_browser
+
+    parser = argparse.ArgumentParser(
+        prog="main.py browser",
+        description="Launch Chromium once and keep it running, so repeated runs with "
+        "--browser-endpoint skip the browser launch.",
+    )
+    parser.add_argument("--port", type=int, default=9222, help="DevTools port (default: %(default)s)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve_browser(args.port, headless=not args.headed))
+    except KeyboardInterrupt:
+        pass
+
+
+def split_command(argv: list[str]) -> tuple[str, list[str]]:
+    """(command, its arguments); anything that is not a command name is a scrape."""
+    if argv and argv[0] in COMMANDS:
+        return argv[0], argv[1:]
+    if argv and argv[0] in ALIASES:
+        return ALIASES[argv[0]], argv[1:]
+    return "scrape", argv
 
-    logger.info("Done.")
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    commands = "\n".join(f"  {name:<{width}}  {help}" for name, help in COMMANDS.items())
+    return f"{__doc__.strip()}\n\ncommands:\n{commands}\n\nRun `main.py COMMAND --help` for its options."
+
+
+def main(argv: list[str]) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    if argv[:1] in (["-h"], ["--help"]):
+        print(usage())
+        return
+    command, rest = split_command(argv)
+    handlers = {
+        "scrape": scrape,
+        "discover": discover,
+        "convert": convert,
+        "export": export,
+        "search": search,
+        "bench": bench,
+        "browser": browser,
+    }
+    handlers[command](rest)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <COURSE_URL>")
-        sys.exit(1)
-    asyncio.run(run(sys.argv[1]))
+    main(sys.argv[1:])
@@ -0,0 +1,99 @@
+# src/archive.py
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from src.defaults import DEFAULT_ARCHIVE_DIR
+from src.writer import sanitize_filename
+
+if TYPE_CHECKING:
+    from src.navigator import ReadingLesson
+
+
+@dataclass
+class ArchivedLesson:
+    course_slug: str
+    module: str
+    lesson_title: str
+    url: str
+    position: int
+    html_sha256: str
+    fetched_at: float
+    html: str
+
+    @property
+    def lesson(self) -> ReadingLesson:
+        # navigator pulls in asyncio; `main.py convert --help` should not
+        from src.navigator import ReadingLesson
+
+        return ReadingLesson(module=self.module, lesson_title=self.lesson_title, url=self.url)
+
+
+class HtmlArchive:
+    """
+    Durable copy of every reading's raw HTML together with its lesson
+    metadata, one gzipped JSON file per lesson under <root>/<course-slug>/.
+
+    Unlike HtmlCache it never expires or evicts anything: it is the input
+    for rebuilding outputs offline (see src.reconvert).
+    """
+
+    def __init__(self, root: Path = DEFAULT_ARCHIVE_DIR):
+        self.root = root
+
+    def path_for(self, course_slug: str, url: str) -> Path:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+        return self.root / sanitize_filename(course_slug) / f"{key}.json.gz"
+
+    def is_current(self, course_slug: str, lesson: ReadingLesson, position: int) -> bool:
+        """True if `lesson` is archived under its current module, title and position."""
+        path = self.path_for(course_slug, lesson.url)
+        if not path.exists():
+            return False
+        try:
+            entry = load_archived(path)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        return (entry.module, entry.lesson_title, entry.position) == (lesson.module, lesson.lesson_title, position)
+
+    def put(self, course_slug: str, lesson: ReadingLesson, position: int, html: str) -> Path:
+        path = self.path_for(course_slug, lesson.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = ArchivedLesson(
+            course_slug=course_slug,
+            module=lesson.module,
+            lesson_title=lesson.lesson_title,
+            url=lesson.url,
+            position=position,
+            html_sha256=hashlib.sha256(html.encode("utf-8")).hexdigest(),
+            fetched_at=time.time(),
+            html=html,
+        )
+        tmp = path.with_name(path.name + ".tmp")
+        # Level 6 is plenty for HTML and several times faster to write than 9
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(asdict(entry), f, ensure_ascii=False)
+        os.replace(tmp, path)
+        return path
+
+    def courses(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def entries(self, course_slug: Optional[str] = None) -> list[Path]:
+        """Archive files, all courses or one."""
+        courses = [sanitize_filename(course_slug)] if course_slug is not None else self.courses()
+        return [path for course in courses for path in sorted((self.root / course).glob("*.json.gz"))]
+
+
+def load_archived(path: Path) -> ArchivedLesson:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return ArchivedLesson(**json.load(f))
@@ -1,56 +1,160 @@
 # src/auth.py
-import json
+import asyncio
 import logging
 from pathlib import Path
-from playwright.async_api import async_playwright
+from typing import Optional
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from src.blocker import ResourceBlocker
+from src.navigator import BASE_URL
 
 logger = logging.getLogger(__name__)
 
 SESSION_FILE = Path("session.json")
+# Small, and answered with the current user only when the session is logged in
+SESSION_CHECK_URL = BASE_URL + "/api/externalBasicProfiles.v1?q=me&fields=name"
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/121.0.0.0 Safari/537.36"
+)
+
+
+async def new_context(
+    browser: Browser,
+    storage_state: Optional[dict] = None,
+    blocker: Optional[ResourceBlocker] = None,
+) -> BrowserContext:
+    """
+    Open another context on an already-launched browser, e.g. one per course
+    in batch mode, reusing the authenticated `storage_state` of the first.
+    """
+    context = await browser.new_context(user_agent=USER_AGENT, storage_state=storage_state)
+    if blocker is not None:
+        await blocker.install(context)
+    return context
+
+
+async def open_browser(playwright: Playwright, headless: bool = True, endpoint: Optional[str] = None) -> Browser:
+    """
+    Launch Chromium, or connect to one that is already running at `endpoint`:
+    the ws:// address of a Playwright browser server, or the DevTools (CDP)
+    address of a Chromium started with --remote-debugging-port, such as
+    `main.py browser`. Closing a connected browser only disconnects from it.
+    """
+    if endpoint is None:
+        return await playwright.chromium.launch(headless=headless)
+    logger.info(f"Connecting to the running browser at {endpoint}")
+    if endpoint.startswith(("ws://", "wss://")) and "/devtools/" not in endpoint:
+        return await playwright.chromium.connect(endpoint)
+    return await playwright.chromium.connect_over_cdp(endpoint)
+
+
+async def serve_browser(port: int = 9222, headless: bool = True) -> None:
+    """Keep a Chromium running with its DevTools endpoint on `port` until interrupted."""
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=headless, args=[f"--remote-debugging-port={port}"])
+        logger.info(f"Browser running; scrape with --browser-endpoint http://localhost:{port} (Ctrl-C to stop)")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await browser.close()
 
 
-async def login(email: str, password: str, headless: bool = True) -> tuple:
+async def session_is_valid(context: BrowserContext) -> bool:
+    """
+    Check the context's session with one authenticated API request instead
+    of loading a page. Only a definite answer (401/403, or no current user)
+    counts as expired; if the check itself fails the session is kept.
+    """
+    try:
+        response = await context.request.get(SESSION_CHECK_URL, timeout=15_000)
+        if response.status in (401, 403):
+            return False
+        if not response.ok:
+            logger.warning(f"Session check returned HTTP {response.status}; keeping the saved session")
+            return True
+        return bool((await response.json()).get("elements"))
+    except Exception as e:
+        logger.warning(f"Could not check the saved session ({e}); keeping it")
+        return True
+
+
+async def login(
+    email: str,
+    password: str,
+    headless: bool = True,
+    blocker: Optional[ResourceBlocker] = None,
+    record_har: Optional[Path] = None,
+    replay_har: Optional[Path] = None,
+    browser_endpoint: Optional[str] = None,
+) -> tuple:
     """
     Login to Coursera and return (playwright, browser, context).
-    If session.json exists, loads saved cookies (skips login form).
-    Caller is responsible for closing playwright/browser.
+    If session.json exists, the context is created from its full storage
+    state (cookies and localStorage) and checked with one API request; the
+    login form is only used without a session file or when it has expired.
+    With `browser_endpoint`, an already-running browser is used instead of
+    launching one (see open_browser).
+    If `blocker` is given, it is installed on the context before any navigation.
+    With `record_har`, all of the context's traffic is recorded to that file,
+    which is only written once the context is closed. With `replay_har`,
+    requests are answered from that archive and anything not in it is
+    aborted, so nothing reaches the network and no login is attempted.
+    Caller is responsible for closing playwright/browser/context.
     """
     playwright = await async_playwright().start()
-    browser = await playwright.chromium.launch(headless=headless)
-    context = await browser.new_context(
-        user_agent=(
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/121.0.0.0 Safari/537.36"
+    try:
+        browser = await open_browser(playwright, headless, browser_endpoint)
+        session = SESSION_FILE if replay_har is None and SESSION_FILE.exists() else None
+        if record_har is not None:
+            record_har.parent.mkdir(parents=True, exist_ok=True)
+        context = await browser.new_context(
+            user_agent=USER_AGENT,
+            storage_state=str(session) if session is not None else None,
+            record_har_path=str(record_har) if record_har is not None else None,
         )
-    )
+        if replay_har is not None:
+            await context.route_from_har(str(replay_har), not_found="abort")
+        # Installed after HAR routing so it runs first and falls back to the archive
+        if blocker is not None:
+            await blocker.install(context)
 
-    if SESSION_FILE.exists():
-        logger.info("Loading saved session from session.json...")
-        state = json.loads(SESSION_FILE.read_text())
-        await context.add_cookies(state["cookies"])
-        return playwright, browser, context
+        if replay_har is not None:
+            logger.info(f"Replaying traffic from {replay_har}; the network is not used")
+            return playwright, browser, context
+
+        if session is not None:
+            logger.info(f"Loaded saved session from {SESSION_FILE}")
+            if await session_is_valid(context):
+                return playwright, browser, context
+            logger.warning(f"The session in {SESSION_FILE} has expired. Attempting browser login...")
+            await context.clear_cookies()
+        else:
+            logger.info(f"No {SESSION_FILE} found. Attempting browser login...")
 
-    # No session file — do browser login
-    logger.info("No session.json found. Attempting browser login...")
-    page = await context.new_page()
-    await page.goto("https://www.coursera.org/?authMode=login", wait_until="networkidle", timeout=30_000)
-
-    await page.wait_for_selector('input[name="email"]', timeout=15_000)
-    await page.fill('input[name="email"]', email)
-    await page.click('button:has-text("Continue")', timeout=10_000)
-
-    await page.wait_for_selector('input[name="password"]', timeout=15_000)
-    await page.fill('input[name="password"]', password)
-    await page.press('input[name="password"]', "Enter")
-
-    await page.wait_for_url(
-        lambda url: "accounts.coursera.org" not in url and "authMode" not in url,
-        timeout=30_000
-    )
-    logger.info(f"Logged in. Saving session to {SESSION_FILE}...")
-    state = await context.storage_state()
-    SESSION_FILE.write_text(json.dumps(state))
-    await page.close()
-
-    return playwright, browser, context
+        page = await context.new_page()
+        await page.goto(f"{BASE_URL}/?authMode=login", wait_until="networkidle", timeout=30_000)
+
+        await page.wait_for_selector('[name="email"]', timeout=15_000)
+        await page.fill('[name="email"]', email)
+        await page.click('button:has-text("Continue")', timeout=10_000)
+
+        await page.wait_for_selector('[name="password"]', timeout=15_000)
+        await page.fill('[name="password"]', password)
+        await page.press('[name="password"]', "Enter")
+
+        await page.wait_for_url(
+            lambda url: "accounts.coursera.org" not in url and "authMode" not in url,
+            timeout=30_000
+        )
+        logger.info(f"Logged in. Saving session to {SESSION_FILE}...")
+        await context.storage_state(path=str(SESSION_FILE))
+        await page.close()
+
+        return playwright, browser, context
+    except BaseException:
+        # Otherwise the driver process outlives a failed login
+        await playwright.stop()
+        raise
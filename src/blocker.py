@@ -0,0 +1,99 @@
+# src/blocker.py
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from src.extractor import READING_API_PATTERNS
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Route
+
+logger = logging.getLogger(__name__)
+
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+# Analytics, ads and telemetry beacons fired by Coursera pages
+BLOCKED_URL_PATTERNS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "facebook.net",
+    "connect.facebook",
+    "segment.io",
+    "segment.com",
+    "amplitude.com",
+    "hotjar.com",
+    "clarity.ms",
+    "bat.bing.com",
+    "optimizely.com",
+    "sentry.io",
+    "/eventing/",
+)
+
+# Always let these through, whatever their type: they carry the data we scrape
+ALLOWED_URL_PATTERNS = tuple(READING_API_PATTERNS) + (
+    "onDemandCourseMaterials",
+    "onDemandCourses.v1",
+)
+
+# Rough transfer size per blocked request, used to estimate bytes saved
+ESTIMATED_BYTES = {"image": 40_000, "media": 500_000, "font": 35_000}
+DEFAULT_ESTIMATED_BYTES = 2_000
+
+
+@dataclass
+class BlockerStats:
+    allowed: int = 0
+    blocked: int = 0
+    bytes_saved: int = 0
+    blocked_by_type: Counter = field(default_factory=Counter)
+
+
+class ResourceBlocker:
+    """
+    Route handler that aborts requests the scraper never uses (images,
+    fonts, media, telemetry) and lets everything else through.
+    Install it once per BrowserContext with `install()`.
+    """
+
+    def __init__(
+        self,
+        blocked_types: frozenset[str] = BLOCKED_RESOURCE_TYPES,
+        blocked_patterns: tuple[str, ...] = BLOCKED_URL_PATTERNS,
+        allowed_patterns: tuple[str, ...] = ALLOWED_URL_PATTERNS,
+    ):
+        self.blocked_types = frozenset(blocked_types)
+        self.blocked_patterns = tuple(blocked_patterns)
+        self.allowed_patterns = tuple(allowed_patterns)
+        self.stats = BlockerStats()
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if resource_type == "document" or any(p in url for p in self.allowed_patterns):
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        return any(p in url for p in self.blocked_patterns)
+
+    async def handle(self, route: Route) -> None:
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.stats.blocked += 1
+            self.stats.blocked_by_type[request.resource_type] += 1
+            self.stats.bytes_saved += ESTIMATED_BYTES.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+            await route.abort()
+        else:
+            self.stats.allowed += 1
+            await route.fallback()
+
+    async def install(self, context: BrowserContext) -> None:
+        await context.route("**/*", self.handle)
+
+    def summary(self) -> str:
+        return (
+            f"Blocked {self.stats.blocked} request(s), allowed {self.stats.allowed}, "
+            f"~{self.stats.bytes_saved / 1_000_000:.1f} MB saved"
+        )
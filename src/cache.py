@@ -0,0 +1,100 @@
+# src/cache.py
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.metrics import metrics
+
+DEFAULT_CACHE_PATH = Path("output") / ".cache" / "html.sqlite3"
+
+
+class HtmlCache:
+    """
+    On-disk cache of raw reading HTML keyed by lesson URL.
+
+    Entries older than `ttl` seconds are treated as misses. When the stored
+    HTML exceeds `max_bytes`, least recently used entries are evicted.
+    Safe to call from executor threads; calls are serialized.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Sharded workers share one cache file: readers must not block the
+        # writer, and a writer waits for the lock instead of failing at once
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                html TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+            """
+        )
+
+    def get(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT html, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            now = time.time()
+            if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+                self.misses += 1
+                metrics.incr("cache_misses", lesson=url)
+                return None
+
+            self.hits += 1
+            metrics.incr("cache_hits", lesson=url)
+            with self._conn:
+                self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, url))
+            return row[0]
+
+    def put(self, url: str, html: str) -> None:
+        with self._lock:
+            now = time.time()
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pages (url, html, size, fetched_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (url, html, len(html.encode("utf-8")), now, now),
+                )
+                self._evict()
+
+    def _evict(self) -> None:
+        if self.max_bytes is None:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        stale: list[str] = []
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            stale.append(url)
+            total -= size
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", [(u,) for u in stale])
+
+    def summary(self) -> str:
+        return f"Cache: {self.hits} hit(s), {self.misses} miss(es)"
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,7 +1,19 @@
 # src/converter.py
+from __future__ import annotations
+
 from dataclasses import dataclass
-from markdownify import markdownify as md
-from bs4 import BeautifulSoup, Tag
+from typing import TYPE_CHECKING
+
+from src.defaults import DEFAULT_PARSER
+
+if TYPE_CHECKING:
+    from markdownify import MarkdownConverter
+
+# Bump whenever html_to_sections output changes, so incremental runs rewrite every lesson.
+# 2: single-pass conversion. Unlike the original it drops HTML comments (their
+# text used to end up in the Markdown), and with the lxml parser <style> and
+# <head> text is dropped too, where html.parser keeps it.
+CONVERTER_VERSION = "2"
 
 
 @dataclass
@@ -10,21 +22,51 @@ class Section:
     content: str
 
 
-def html_to_sections(html: str, lesson_title: str) -> list[Section]:
+def _nodes_to_markdown(converter: MarkdownConverter, nodes: list) -> str:
+    """Convert already-parsed top-level nodes, the same way markdownify walks a root's children."""
+    from bs4 import Comment, Doctype, NavigableString
+
+    text = ""
+    for node in nodes:
+        if isinstance(node, (Comment, Doctype)):
+            continue
+        elif isinstance(node, NavigableString):
+            text += converter.process_text(node)
+        else:
+            text += converter.process_tag(node, convert_as_inline=False)
+    return text.strip()
+
+
+def html_to_sections(html: str, lesson_title: str, parser: str = DEFAULT_PARSER) -> list[Section]:
+    """
+    Split reading HTML into Markdown sections at each h2/h3.
+
+    The HTML is parsed once with `parser` ("html.parser" or "lxml") and each
+    section is converted straight from the tree, without serializing and
+    re-parsing it. Comments are skipped; lxml also moves <style> and <head>
+    content out of the body, so it never reaches a section.
+    """
+    # BeautifulSoup and markdownify are imported on first use, so commands
+    # that never convert (and everything importing Section) start quickly
+    from bs4 import BeautifulSoup, Tag
+    from markdownify import MarkdownConverter
+
     if not html.strip():
         return [Section(heading=lesson_title, content="")]
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, parser)
+    # lxml wraps fragments in <html><body>; sections live at the body's top level
+    root = soup.body if soup.body is not None else soup
+    converter = MarkdownConverter(heading_style="ATX")
     sections: list[Section] = []
     current_heading = lesson_title
     current_nodes: list = []
 
     def flush():
-        raw = "".join(str(n) for n in current_nodes)
-        content = md(raw, heading_style="ATX").strip()
+        content = _nodes_to_markdown(converter, current_nodes)
         sections.append(Section(heading=current_heading, content=content))
 
-    for elem in soup.children:
+    for elem in list(root.children):
         if isinstance(elem, Tag) and elem.name in ("h2", "h3"):
             if current_nodes:
                 flush()
@@ -38,6 +80,6 @@ def html_to_sections(html: str, lesson_title: str) -> list[Section]:
 
     if not sections:
         # Fallback: HTML had only headings with no interspersed content
-        sections.append(Section(heading=lesson_title, content=md(html, heading_style="ATX").strip()))
+        sections.append(Section(heading=lesson_title, content=converter.convert_soup(soup).strip()))
 
     return sections
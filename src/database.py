@@ -0,0 +1,164 @@
+# src/database.py
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.converter import Section
+from src.defaults import DEFAULT_DB_PATH
+from src.writer import write_csv
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS lessons (
+    id INTEGER PRIMARY KEY,
+    course_id INTEGER NOT NULL REFERENCES courses (id),
+    module TEXT NOT NULL,
+    lesson_title TEXT NOT NULL,
+    url TEXT NOT NULL DEFAULT '',
+    UNIQUE (course_id, module, lesson_title)
+);
+CREATE INDEX IF NOT EXISTS lessons_course_module ON lessons (course_id, module);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    lesson_id INTEGER NOT NULL REFERENCES lessons (id),
+    position INTEGER NOT NULL,
+    heading TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sections_lesson ON sections (lesson_id, position);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5 (
+    heading, content, content='sections', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS sections_ai AFTER INSERT ON sections BEGIN
+    INSERT INTO sections_fts (rowid, heading, content) VALUES (new.id, new.heading, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS sections_ad AFTER DELETE ON sections BEGIN
+    INSERT INTO sections_fts (sections_fts, rowid, heading, content)
+    VALUES ('delete', old.id, old.heading, old.content);
+END;
+"""
+
+
+@dataclass
+class SearchHit:
+    course_slug: str
+    module: str
+    lesson_title: str
+    section: str
+    snippet: str
+
+
+class SectionDatabase:
+    """
+    One SQLite database holding the sections of every scraped lesson,
+    with a full-text index over headings and content.
+
+    Writes stay in one open transaction until `commit`; SqliteSink commits
+    once per batch.
+    """
+
+    def __init__(self, path: Path = DEFAULT_DB_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        # Created by the caller but may be written from a sink thread; never used concurrently
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._course_ids: dict[str, int] = {}
+
+    def _course_id(self, slug: str) -> int:
+        if slug not in self._course_ids:
+            self._conn.execute("INSERT OR IGNORE INTO courses (slug) VALUES (?)", (slug,))
+            row = self._conn.execute("SELECT id FROM courses WHERE slug = ?", (slug,)).fetchone()
+            self._course_ids[slug] = row[0]
+        return self._course_ids[slug]
+
+    def write_lesson(
+        self,
+        course_slug: str,
+        module: str,
+        lesson_title: str,
+        sections: list[Section],
+        url: str = "",
+    ) -> Path:
+        """Insert or replace a lesson's sections. Returns the database path."""
+        course_id = self._course_id(course_slug)
+        row = self._conn.execute(
+            "SELECT id FROM lessons WHERE course_id = ? AND module = ? AND lesson_title = ?",
+            (course_id, module, lesson_title),
+        ).fetchone()
+        if row:
+            lesson_id = row[0]
+            self._conn.execute("UPDATE lessons SET url = ? WHERE id = ?", (url, lesson_id))
+            self._conn.execute("DELETE FROM sections WHERE lesson_id = ?", (lesson_id,))
+        else:
+            lesson_id = self._conn.execute(
+                "INSERT INTO lessons (course_id, module, lesson_title, url) VALUES (?, ?, ?, ?)",
+                (course_id, module, lesson_title, url),
+            ).lastrowid
+        self._conn.executemany(
+            "INSERT INTO sections (lesson_id, position, heading, content) VALUES (?, ?, ?, ?)",
+            [(lesson_id, i, s.heading, s.content) for i, s in enumerate(sections)],
+        )
+        return self.path
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """Full-text search (FTS5 query syntax) over section headings and content."""
+        rows = self._conn.execute(
+            """
+            SELECT c.slug, l.module, l.lesson_title, s.heading,
+                   snippet(sections_fts, 1, '[', ']', '…', 12)
+            FROM sections_fts
+            JOIN sections s ON s.id = sections_fts.rowid
+            JOIN lessons l ON l.id = s.lesson_id
+            JOIN courses c ON c.id = l.course_id
+            WHERE sections_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (query, limit),
+        ).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def lessons(self, course_slug: Optional[str] = None) -> list[tuple[str, str, str, list[Section]]]:
+        """Return (course_slug, module, lesson_title, sections) for every stored lesson."""
+        query = (
+            "SELECT l.id, c.slug, l.module, l.lesson_title FROM lessons l "
+            "JOIN courses c ON c.id = l.course_id"
+        )
+        params: tuple = ()
+        if course_slug is not None:
+            query += " WHERE c.slug = ?"
+            params = (course_slug,)
+        result = []
+        for lesson_id, slug, module, title in self._conn.execute(query + " ORDER BY l.id", params).fetchall():
+            sections = [
+                Section(heading=h, content=c)
+                for h, c in self._conn.execute(
+                    "SELECT heading, content FROM sections WHERE lesson_id = ? ORDER BY position",
+                    (lesson_id,),
+                )
+            ]
+            result.append((slug, module, title, sections))
+        return result
+
+    def export_csv(self, output_dir: Path = Path("output"), course_slug: Optional[str] = None) -> list[Path]:
+        """Write the stored lessons out as the usual per-lesson CSV files."""
+        # A title is unique within a module here, so the module tells lessons apart
+        owners: dict[Path, str] = {}
+        return [
+            write_csv(slug, module, title, sections, output_dir, module, owners)
+            for slug, module, title, sections in self.lessons(course_slug)
+        ]
+
+    def close(self) -> None:
+        self.commit()
+        self._conn.close()
@@ -0,0 +1,13 @@
+# src/defaults.py
+"""
+Defaults that the CLI needs to build its parsers. Kept apart from the
+modules that use them so `main.py convert --help` or `export --help` does
+not have to import sqlite3, gzip and the sinks just to print a default.
+"""
+from pathlib import Path
+
+DEFAULT_ARCHIVE_DIR = Path("output") / ".archive"
+DEFAULT_PARSER = "html.parser"
+PARSERS = ("html.parser", "lxml")
+DEFAULT_DB_PATH = Path("output") / "readings.sqlite3"
+SINKS = ("csv", "jsonl", "jsonl.gz", "jsonl.zst", "sqlite")
@@ -1,8 +1,17 @@
 # src/extractor.py
 import asyncio
+import json
 import logging
-from typing import Optional
+import re
+import time
+from typing import Callable, Optional
 from playwright.async_api import BrowserContext, Response
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from src.metrics import metrics
+from src.navigator import BASE_URL
+from src.pagepool import PagePool, borrow_page
+from src.throttle import backoff_delay, retry_after_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -12,15 +21,79 @@ READING_API_PATTERNS = [
     "onDemandSupplements.v1",
 ]
 
+COURSE_API_URL = BASE_URL + "/api/onDemandCourses.v1?q=slug&slug={slug}&fields=id"
+SUPPLEMENT_API_URL = (
+    BASE_URL
+    + "/api/onDemandSupplements.v1/{course_id}~{item_id}"
+    + "?includes=asset&fields=openCourseAssets.v1(typeName),openCourseAssets.v1(definition)"
+)
+
+# Why a page attempt came back without a reading; only transient failures are retried
+FAILURE_TIMEOUT = "timeout"
+FAILURE_NAVIGATION = "navigation"
+FAILURE_AUTH = "auth"
+FAILURE_NO_CONTENT = "no_content"
+RETRYABLE_FAILURES = frozenset({FAILURE_TIMEOUT, FAILURE_NAVIGATION})
+
+_LESSON_URL_RE = re.compile(r"/learn/([^/?#]+)/supplement/([^/?#]+)")
+
+# Course slug -> course id, resolved once per process
+_course_ids: dict[str, str] = {}
+
+
+def parse_lesson_url(lesson_url: str) -> Optional[tuple[str, str]]:
+    """Return (course_slug, item_id) for a /learn/<slug>/supplement/<item>/... URL."""
+    match = _LESSON_URL_RE.search(lesson_url)
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+def _item_of(entry) -> Optional[str]:
+    """The item id an API element or asset says it belongs to, if any."""
+    if not isinstance(entry, dict):
+        return None
+    if entry.get("itemId"):
+        return str(entry["itemId"])
+    entry_id = entry.get("id")
+    if isinstance(entry_id, str) and "~" in entry_id:
+        return entry_id.rsplit("~", 1)[1]
+    return None
+
+
+def _for_item(entries, item_id: Optional[str]) -> list:
+    """`entries` minus those of other items, the ones of `item_id` first."""
+    if item_id is None or not isinstance(entries, list):
+        return entries
+    return sorted(
+        (e for e in entries if _item_of(e) in (None, item_id)),
+        key=lambda e: _item_of(e) != item_id,
+    )
+
+
+def _is_item_response(url: str, item_id: str) -> bool:
+    """Whether a reading API URL names `item_id` (as .../<course>~<item> or ?...=<item>)."""
+    return re.search(rf"(?<![\w-]){re.escape(item_id)}(?![\w-])", url) is not None
+
 
-def extract_html_from_response(data: dict) -> Optional[str]:
+def extract_html_from_response(data: dict, item_id: Optional[str] = None) -> Optional[str]:
     """Parse Coursera API JSON and extract HTML content field.
 
     Supports the linked/openCourseAssets.v1 structure used by onDemandSupplements.v1.
+    With `item_id`, a response whose elements all belong to other items
+    yields nothing, and an asset of that item is preferred over the rest.
     """
+    if item_id is not None:
+        try:
+            owners = {_item_of(e) for e in data.get("elements", [])} - {None}
+        except (AttributeError, TypeError):
+            owners = set()
+        if owners and item_id not in owners:
+            return None
+
     # Primary path: linked["openCourseAssets.v1"][].definition.renderableHtmlWithMetadata.renderableHtml
     try:
-        for asset in data.get("linked", {}).get("openCourseAssets.v1", []):
+        for asset in _for_item(data.get("linked", {}).get("openCourseAssets.v1", []), item_id):
             html = (
                 asset.get("definition", {})
                 .get("renderableHtmlWithMetadata", {})
@@ -33,7 +106,7 @@ def extract_html_from_response(data: dict) -> Optional[str]:
 
     # Fallback: elements[].definition.value.html (legacy structure)
     try:
-        for elem in data.get("elements", []):
+        for elem in _for_item(data.get("elements", []), item_id):
             html = elem.get("definition", {}).get("value", {}).get("html")
             if html:
                 return html
@@ -43,47 +116,222 @@ def extract_html_from_response(data: dict) -> Optional[str]:
     return None
 
 
+async def resolve_course_id(context: BrowserContext, slug: str, timeout: float = 15.0) -> Optional[str]:
+    """Look up the internal course id for a slug (needed by the supplements API)."""
+    if slug in _course_ids:
+        return _course_ids[slug]
+
+    response = await context.request.get(COURSE_API_URL.format(slug=slug), timeout=timeout * 1000)
+    if not response.ok:
+        logger.debug(f"Course lookup for {slug} returned HTTP {response.status}")
+        return None
+    elements = (await response.json()).get("elements", [])
+    if not elements or not elements[0].get("id"):
+        return None
+
+    _course_ids[slug] = elements[0]["id"]
+    return _course_ids[slug]
+
+
+async def fetch_reading_direct(
+    context: BrowserContext,
+    lesson_url: str,
+    timeout: float = 15.0,
+    on_response: Optional[Callable[[int, float, Optional[float]], None]] = None,
+) -> Optional[str]:
+    """
+    Fetch reading HTML straight from onDemandSupplements.v1 using the
+    context's cookies, without rendering the lesson page.
+    Returns None on any failure so the caller can fall back to the browser.
+    `on_response(status, seconds, retry_after)` is told about the API response,
+    which page-level response listeners never see.
+    """
+    parsed = parse_lesson_url(lesson_url)
+    if parsed is None:
+        return None
+    slug, item_id = parsed
+
+    try:
+        course_id = await resolve_course_id(context, slug, timeout)
+        if course_id is None:
+            return None
+        started = time.monotonic()
+        response = await context.request.get(
+            SUPPLEMENT_API_URL.format(course_id=course_id, item_id=item_id),
+            timeout=timeout * 1000,
+        )
+        if on_response is not None:
+            on_response(response.status, time.monotonic() - started, retry_after_seconds(response.headers))
+        if not response.ok:
+            logger.debug(f"Direct fetch of {lesson_url} returned HTTP {response.status}")
+            return None
+        body = await response.body()
+        metrics.incr("bytes_received", len(body), lesson=lesson_url)
+        return extract_html_from_response(json.loads(body), item_id)
+    except Exception as e:
+        logger.debug(f"Direct fetch of {lesson_url} failed: {e}")
+        return None
+
+
 async def extract_reading_content(
     context: BrowserContext,
     lesson_url: str,
     timeout: float = 15.0,
     retry: int = 2,
+    direct: bool = True,
+    on_response: Optional[Callable[[int, float, Optional[float]], None]] = None,
+    pool: Optional[PagePool] = None,
+    backoff: float = 1.0,
 ) -> Optional[str]:
     """
-    Navigate to a reading lesson URL and intercept the API response
-    that contains the reading HTML content.
-    Returns the HTML string or None if not found after retries.
+    Return the reading HTML for a lesson URL, or None if not found after retries.
+
+    With `direct`, the supplements API is called first; if that fails, the
+    lesson page is opened (borrowed from `pool` if given) and the first API
+    response carrying the HTML is intercepted; the page is released as soon
+    as it arrives, and `timeout` (seconds per attempt) is the only upper
+    bound on the wait. `on_response` is passed on to the direct fetch.
+
+    Timeouts and navigation errors are retried up to `retry` times after an
+    exponential, jittered delay starting around `backoff` seconds. A lesson
+    that answers 401/403 or lands on the login page, or whose page loads
+    without any reading HTML, is not retried.
     """
+    if direct:
+        with metrics.span("direct_fetch", lesson=lesson_url):
+            html = await fetch_reading_direct(context, lesson_url, timeout, on_response)
+        if html:
+            return html
+        metrics.incr("direct_fallbacks", lesson=lesson_url)
+        logger.info(f"Direct API fetch failed for {lesson_url}; falling back to page load")
+
     for attempt in range(retry + 1):
-        captured: list[str] = []
-        page = await context.new_page()
+        html, failure = await _capture_from_page(context, lesson_url, timeout, pool)
+        if html:
+            return html
+
+        metrics.incr(f"failures_{failure}", lesson=lesson_url)
+        if failure == FAILURE_AUTH:
+            logger.error(
+                f"Not authorized to read {lesson_url}; the saved session may have expired "
+                f"(delete session.json to log in again)"
+            )
+            break
+        if failure not in RETRYABLE_FAILURES:
+            logger.warning(f"{lesson_url} has no reading content; not retrying")
+            break
+        if attempt < retry:
+            delay = backoff_delay(attempt, backoff)
+            logger.info(f"Retrying {lesson_url} after {failure} in {delay:.1f}s (attempt {attempt + 2})")
+            metrics.incr("extract_retries", lesson=lesson_url)
+            await asyncio.sleep(delay)
+
+    logger.warning(f"Could not extract content from {lesson_url}")
+    metrics.incr("extract_failures", lesson=lesson_url)
+    return None
+
+
+def _looks_like_login(url: str) -> bool:
+    return "authMode=login" in url or "accounts.coursera.org" in url
+
 
-        async def handle_response(response: Response):
-            if any(p in response.url for p in READING_API_PATTERNS):
-                try:
-                    body = await response.json()
-                    html = extract_html_from_response(body)
-                    if html:
-                        captured.append(html)
-                except Exception:
-                    pass
+async def _capture_from_page(
+    context: BrowserContext,
+    lesson_url: str,
+    timeout: float,
+    pool: Optional[PagePool],
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    One page attempt. Returns (html, None) on success, otherwise (None, why):
+    one of the FAILURE_* kinds.
 
-        page.on("response", handle_response)
+    Only successful JSON responses of the reading APIs that name the
+    lesson's item are read and decoded; the page stops listening once the
+    reading has been captured.
+    """
+    found: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+    failure = FAILURE_TIMEOUT
+    parsed = parse_lesson_url(lesson_url)
+    item_id = parsed[1] if parsed is not None else None
+    lease = None
 
+    async def handle_response(response: Response):
+        nonlocal failure
+        if found.done() or not any(p in response.url for p in READING_API_PATTERNS):
+            return
+        if response.status in (401, 403):
+            failure = FAILURE_AUTH
+            return
+        # Decided from the URL and headers, before the body is even fetched
+        if (
+            not 200 <= response.status < 300
+            or "json" not in response.headers.get("content-type", "")
+            or (item_id is not None and not _is_item_response(response.url, item_id))
+        ):
+            metrics.incr("responses_skipped", lesson=lesson_url)
+            return
         try:
-            await page.goto(lesson_url, wait_until="networkidle", timeout=30_000)
-            await asyncio.sleep(2)
-        except Exception as e:
-            logger.warning(f"Navigation error on attempt {attempt + 1}: {e}")
-        finally:
-            await page.close()
+            body = await response.body()
+            if found.done():
+                return
+            metrics.incr("bytes_received", len(body), lesson=lesson_url)
+            html = extract_html_from_response(json.loads(body), item_id)
+        except Exception:
+            return
+        if html:
+            if not found.done():
+                found.set_result(html)
+                lease.off("response", handle_response)
+        elif failure == FAILURE_TIMEOUT:
+            failure = FAILURE_NO_CONTENT
 
-        if captured:
-            return captured[0]
+    try:
+        async with borrow_page(context, pool) as lease:
+            lease.on("response", handle_response)
+            navigation = asyncio.ensure_future(lease.page.goto(lesson_url, timeout=timeout * 1000))
+            try:
+                with metrics.span("page_capture", lesson=lesson_url):
+                    html = await _wait_for_capture(found, navigation, timeout)
+                if html is None and navigation.done() and not navigation.cancelled():
+                    response = navigation.result()
+                    if _looks_like_login(lease.page.url) or (response is not None and response.status in (401, 403)):
+                        failure = FAILURE_AUTH
+                    elif response is not None and response.status == 404:
+                        failure = FAILURE_NO_CONTENT
+            finally:
+                navigation.cancel()
+                await asyncio.gather(navigation, return_exceptions=True)
+    except Exception as e:
+        # Raised from the navigation itself; the pool discards the page
+        logger.warning(f"Navigation error on {lesson_url}: {e}")
+        metrics.incr("navigation_errors", lesson=lesson_url)
+        if isinstance(e, (PlaywrightTimeoutError, asyncio.TimeoutError)):
+            return None, FAILURE_TIMEOUT
+        return None, FAILURE_AUTH if failure == FAILURE_AUTH else FAILURE_NAVIGATION
 
-        if attempt < retry:
-            logger.info(f"Retrying {lesson_url} (attempt {attempt + 2})")
-            await asyncio.sleep(3)
+    return html, None if html else failure
 
-    logger.warning(f"Could not extract content from {lesson_url}")
-    return None
+
+async def _wait_for_capture(
+    found: asyncio.Future, navigation: asyncio.Future, timeout: float
+) -> Optional[str]:
+    """
+    Wait until `found` resolves, bounded by `timeout`. A finished navigation
+    does not end the wait (the API call may still be in flight), but a
+    failed one does, by re-raising its error.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    pending = {found, navigation}
+
+    while not found.done():
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        done, pending = await asyncio.wait(
+            pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+        )
+        if navigation in done and navigation.exception() and not found.done():
+            raise navigation.exception()
+
+    return found.result() if found.done() else None
@@ -0,0 +1,128 @@
+# src/journal.py
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional
+
+from src.navigator import ReadingLesson
+from src.writer import sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_DIR = Path("output") / ".journal"
+
+
+def file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class Journal:
+    """
+    Append-only, crash-safe record of one course run.
+
+    Each line is a JSON event: `discovered` (the get_course_readings result),
+    `discovery_started`, `lesson` and `discovery_done` (the same, streamed
+    while discovery runs; a new start discards an earlier unfinished one),
+    `written` (a finished lesson with its output path and, for per-lesson
+    files, their content hash) or `finished`. Discovery is only reused once
+    it is complete. Re-opening the journal of an unfinished run restores that
+    state so the run can resume; a finished or `reset` journal starts over.
+    """
+
+    def __init__(self, course_slug: str, journal_dir: Path = DEFAULT_JOURNAL_DIR, reset: bool = False):
+        journal_dir.mkdir(parents=True, exist_ok=True)
+        self.path = journal_dir / (sanitize_filename(course_slug) + ".jsonl")
+        self.readings: Optional[list[ReadingLesson]] = None
+        self.completed: dict[str, dict] = {}
+
+        if not reset and self.path.exists():
+            finished = self._replay()
+            reset = finished
+        if reset:
+            self.readings = None
+            self.completed = {}
+        self._file = open(self.path, "w" if reset else "a", encoding="utf-8")
+
+    def _replay(self) -> bool:
+        finished = False
+        streamed: list[ReadingLesson] = []
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn write from a crash; everything before it is still valid
+                logger.warning(f"Ignoring corrupt journal line in {self.path}")
+                continue
+            kind = event.get("event")
+            if kind == "discovered":
+                self.readings = [ReadingLesson(**r) for r in event["readings"]]
+            elif kind == "discovery_started":
+                # An interrupted run's lessons are superseded, not extended
+                streamed = []
+            elif kind == "lesson":
+                streamed.append(ReadingLesson(**event["lesson"]))
+            elif kind == "discovery_done":
+                self.readings = streamed
+            elif kind == "written":
+                self.completed[event["url"]] = event
+            elif kind == "finished":
+                finished = True
+        return finished
+
+    def _append(self, event: dict, sync: bool = True) -> None:
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def record_discovery(self, readings: list[ReadingLesson]) -> None:
+        self.readings = list(readings)
+        self._append({"event": "discovered", "readings": [asdict(r) for r in readings]})
+
+    async def track_discovery(
+        self, lessons: AsyncIterable[ReadingLesson], failed_modules: Optional[list[str]] = None
+    ) -> AsyncIterator[ReadingLesson]:
+        """
+        Pass lessons through while journaling them; marks discovery complete
+        at the end, unless `failed_modules` (filled in by the discovery) is
+        non-empty: a resumed run then discovers again and retries them.
+        """
+        self._append({"event": "discovery_started"}, sync=False)
+        async for lesson in lessons:
+            self._append({"event": "lesson", "lesson": asdict(lesson)}, sync=False)
+            yield lesson
+        if failed_modules:
+            logger.warning(f"Discovery missed {len(failed_modules)} module(s); a resumed run will discover again")
+            return
+        self._append({"event": "discovery_done"})
+
+    def record_written(self, lesson: ReadingLesson, path: Path, shared: bool = False) -> None:
+        """
+        Record a finished lesson. Per-lesson files are hashed so a damaged
+        output is redone on resume; `shared` outputs (one file holding many
+        lessons, like a database) are only checked for existence.
+        """
+        event = {"event": "written", "url": lesson.url, "path": str(path)}
+        if not shared:
+            event["sha256"] = file_sha256(path)
+        self.completed[lesson.url] = event
+        self._append(event)
+
+    def record_finished(self) -> None:
+        self._append({"event": "finished"})
+
+    def is_done(self, url: str) -> bool:
+        """True if the lesson was written and its output is still intact on disk."""
+        event = self.completed.get(url)
+        if event is None:
+            return False
+        path = Path(event["path"])
+        if not path.exists():
+            return False
+        return "sha256" not in event or file_sha256(path) == event["sha256"]
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,157 @@
+# src/manifest.py
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from src.converter import CONVERTER_VERSION
+from src.navigator import ReadingLesson
+from src.writer import sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST_DIR = Path("output") / ".manifest"
+CHANGE_KINDS = ("added", "changed", "unchanged", "removed")
+
+
+def html_sha256(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ChangeReport:
+    course_slug: str
+    added: list[dict] = field(default_factory=list)
+    changed: list[dict] = field(default_factory=list)
+    unchanged: list[dict] = field(default_factory=list)
+    removed: list[dict] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return ", ".join(f"{len(getattr(self, kind))} {kind}" for kind in CHANGE_KINDS)
+
+
+class Manifest:
+    """
+    What each lesson's output of one course was built from: the SHA-256 of
+    its raw reading HTML and the converter it went through.
+
+    A lesson whose HTML and converter match its entry (and whose output
+    still exists) is unchanged and need not be converted or written again.
+    Entries are appended as lessons are written, like the journal, so the
+    changes of an interrupted run are still reported by the run that
+    completes it; `finish` compacts the file.
+    """
+
+    def __init__(
+        self,
+        course_slug: str,
+        sink: str = "csv",
+        parser: str = "html.parser",
+        manifest_dir: Path = DEFAULT_MANIFEST_DIR,
+    ):
+        manifest_dir.mkdir(parents=True, exist_ok=True)
+        self.course_slug = course_slug
+        # Each sink keeps its own outputs, and the parser can change what they contain
+        self.path = manifest_dir / f"{sanitize_filename(course_slug)}.{sink}.jsonl"
+        self.converter = f"{CONVERTER_VERSION}/{parser}"
+        self.lessons: dict[str, dict] = {}
+        # url -> "added" | "changed", for writes not yet covered by a finished run
+        self.pending: dict[str, str] = {}
+        self._seen: set[str] = set()
+        self._unchanged: list[dict] = []
+
+        if self.path.exists():
+            self._replay()
+        self._previous = set(self.lessons)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _replay(self) -> None:
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring corrupt manifest line in {self.path}")
+                continue
+            url = event.pop("url", None)
+            change = event.pop("change", None)
+            if url is None:
+                continue
+            self.lessons[url] = event
+            if change is not None:
+                self.pending[url] = self.pending.get(url, change)
+
+    def see(self, lesson: ReadingLesson) -> None:
+        """Note that discovery still lists `lesson` (anything not seen is reported removed)."""
+        self._seen.add(lesson.url)
+
+    def is_unchanged(self, url: str, digest: str) -> bool:
+        entry = self.lessons.get(url)
+        return (
+            entry is not None
+            and entry.get("html_sha256") == digest
+            and entry.get("converter") == self.converter
+            and Path(entry.get("output", "")).exists()
+        )
+
+    def record_unchanged(self, lesson: ReadingLesson) -> None:
+        if lesson.url in self.pending:
+            # Written by an interrupted run; reported as that change
+            return
+        self._unchanged.append(asdict(lesson) | {"output": self.lessons[lesson.url]["output"]})
+
+    def record_written(self, lesson: ReadingLesson, digest: str, output: Path) -> None:
+        change = self.pending.get(lesson.url) or ("changed" if lesson.url in self.lessons else "added")
+        entry = {
+            "module": lesson.module,
+            "lesson_title": lesson.lesson_title,
+            "html_sha256": digest,
+            "converter": self.converter,
+            "output": str(output),
+        }
+        self.lessons[lesson.url] = entry
+        self.pending[lesson.url] = change
+        self._file.write(json.dumps({"url": lesson.url, "change": change} | entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def finish(self, complete: bool = True) -> ChangeReport:
+        """
+        Build the run's change report. With `complete` discovery, lessons no
+        longer listed are reported removed and dropped, pending changes are
+        cleared and the file is compacted; otherwise they carry over.
+        """
+        report = ChangeReport(self.course_slug, unchanged=self._unchanged)
+        for url, change in self.pending.items():
+            entry = self.lessons[url]
+            getattr(report, change).append(self._describe(url, entry))
+        if not complete:
+            return report
+
+        for url in sorted(self._previous - self._seen):
+            report.removed.append(self._describe(url, self.lessons.pop(url)))
+        self.pending = {}
+        self._file.close()
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            "".join(json.dumps({"url": url} | entry, ensure_ascii=False) + "\n" for url, entry in self.lessons.items()),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return report
+
+    @staticmethod
+    def _describe(url: str, entry: dict) -> dict:
+        return {"module": entry["module"], "lesson_title": entry["lesson_title"], "url": url, "output": entry["output"]}
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def write_change_report(report: ChangeReport, output_dir: Path = Path("output")) -> Path:
+    """output/<course-slug>.changes.json, for downstream jobs that only want what changed."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"{sanitize_filename(report.course_slug)}.changes.json"
+    path.write_text(json.dumps(asdict(report), ensure_ascii=False, indent=1), encoding="utf-8")
+    return path
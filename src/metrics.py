@@ -0,0 +1,114 @@
+# src/metrics.py
+import json
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_METRICS_PATH = Path("output") / "metrics.json"
+PROMETHEUS_PREFIX = "coursera_scraper"
+
+
+def _summary(durations: list[float]) -> dict:
+    ordered = sorted(durations)
+    n = len(ordered)
+    return {
+        "count": n,
+        "total_s": sum(ordered),
+        "mean_s": statistics.fmean(ordered) if n else 0.0,
+        "p50_s": ordered[int(0.50 * (n - 1))] if n else 0.0,
+        "p95_s": ordered[int(0.95 * (n - 1))] if n else 0.0,
+        "max_s": ordered[-1] if n else 0.0,
+    }
+
+
+class Metrics:
+    """
+    Process-wide timings and counters for one run.
+
+    `span(stage)` times a block; `incr(name)` bumps a counter. Passing
+    `lesson=<url>` to either also attributes the value to that lesson, so
+    the report has a per-lesson breakdown next to the per-stage totals.
+    Safe to use from the sink thread as well as the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self.counters: dict[str, float] = defaultdict(float)
+            self.timings: dict[str, list[float]] = defaultdict(list)
+            self.lessons: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    @contextmanager
+    def span(self, stage: str, lesson: Optional[str] = None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, lesson=lesson)
+
+    def observe(self, stage: str, seconds: float, lesson: Optional[str] = None) -> None:
+        with self._lock:
+            self.timings[stage].append(seconds)
+            if lesson is not None:
+                self.lessons[lesson][f"{stage}_s"] += seconds
+
+    def incr(self, name: str, value: float = 1, lesson: Optional[str] = None) -> None:
+        with self._lock:
+            self.counters[name] += value
+            if lesson is not None:
+                self.lessons[lesson][name] += value
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "elapsed_s": time.time() - self.started,
+                "counters": dict(self.counters),
+                "stages": {stage: _summary(durations) for stage, durations in self.timings.items()},
+                "lessons": {url: dict(values) for url, values in self.lessons.items()},
+            }
+
+    def write_json(self, path: Path = DEFAULT_METRICS_PATH) -> Path:
+        _write_atomic(path, json.dumps(self.report(), indent=2))
+        return path
+
+    def write_prometheus(self, path: Path) -> Path:
+        """Write a node_exporter textfile (replaced atomically, as the collector expects)."""
+        report = self.report()
+        lines = [
+            f"# TYPE {PROMETHEUS_PREFIX}_stage_seconds summary",
+        ]
+        for stage, s in sorted(report["stages"].items()):
+            label = f'stage="{stage}"'
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds{{{label},quantile="0.5"}} {s["p50_s"]:.6f}')
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds{{{label},quantile="0.95"}} {s["p95_s"]:.6f}')
+            lines.append(f"{PROMETHEUS_PREFIX}_stage_seconds_sum{{{label}}} {s['total_s']:.6f}")
+            lines.append(f"{PROMETHEUS_PREFIX}_stage_seconds_count{{{label}}} {s['count']}")
+        for name, value in sorted(report["counters"].items()):
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name}_total counter")
+            lines.append(f"{PROMETHEUS_PREFIX}_{name}_total {value:g}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_run_seconds gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}_run_seconds {report['elapsed_s']:.3f}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_last_run_timestamp_seconds gauge")
+        lines.append(f"{PROMETHEUS_PREFIX}_last_run_timestamp_seconds {time.time():.0f}")
+        _write_atomic(path, "\n".join(lines) + "\n")
+        return path
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+metrics = Metrics()
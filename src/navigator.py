@@ -1,12 +1,34 @@
 # src/navigator.py
+from __future__ import annotations
+
+import asyncio
+import json
 import logging
+import os
+from collections import deque
 from dataclasses import dataclass
-from bs4 import BeautifulSoup
-from playwright.async_api import BrowserContext
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+from src.metrics import metrics
+from src.pagepool import PagePool, borrow_page
+from src.throttle import backoff_delay
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://www.coursera.org"
+# Overridable so benchmarks can point the scraper at a local stand-in server
+BASE_URL = os.getenv("COURSERA_BASE_URL", "https://www.coursera.org").rstrip("/")
+
+COURSE_MATERIALS_API_URL = (
+    BASE_URL
+    + "/api/onDemandCourseMaterials.v2/?q=slug&slug={slug}"
+    + "&includes=modules,lessons,items"
+    + "&fields=moduleIds,onDemandCourseMaterialModules.v1(name,lessonIds),"
+    + "onDemandCourseMaterialLessons.v1(name,itemIds),"
+    + "onDemandCourseMaterialItems.v2(name,slug,contentSummary)"
+)
 
 
 @dataclass
@@ -18,6 +40,8 @@ class ReadingLesson:
 
 def parse_module_page(html: str, base_url: str = BASE_URL) -> tuple[str, list[ReadingLesson]]:
     """Parse a single module page. Returns (module_name, reading_lessons)."""
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
 
     # Module name: h2 inside rc-periodPage (strip nested badge elements)
@@ -50,21 +74,123 @@ def parse_module_page(html: str, base_url: str = BASE_URL) -> tuple[str, list[Re
     return module_name, lessons
 
 
-async def get_course_readings(
-    context: BrowserContext, course_url: str
-) -> tuple[list[ReadingLesson], str]:
-    """Navigate to course home, visit each module, and return (readings, course_slug)."""
-    # Extract slug from /learn/<slug>/... pattern
+def parse_course_materials(
+    data: dict, slug: str, base_url: str = BASE_URL
+) -> list[ReadingLesson]:
+    """Build the reading list from an onDemandCourseMaterials.v2 response, in course order."""
+    linked = data.get("linked", {})
+    modules = {m["id"]: m for m in linked.get("onDemandCourseMaterialModules.v1", [])}
+    lessons = {l["id"]: l for l in linked.get("onDemandCourseMaterialLessons.v1", [])}
+    items = {i["id"]: i for i in linked.get("onDemandCourseMaterialItems.v2", [])}
+
+    readings: list[ReadingLesson] = []
+    for element in data.get("elements", []):
+        for module_id in element.get("moduleIds", []):
+            module = modules.get(module_id)
+            if not module:
+                continue
+            for lesson_id in module.get("lessonIds", []):
+                for item_id in lessons.get(lesson_id, {}).get("itemIds", []):
+                    item = items.get(item_id)
+                    if not item or item.get("contentSummary", {}).get("typeName") != "supplement":
+                        continue
+                    url = f"{base_url}/learn/{slug}/supplement/{item_id}/{item.get('slug', '')}"
+                    readings.append(
+                        ReadingLesson(
+                            module=module.get("name", "Unknown Module"),
+                            lesson_title=item["name"],
+                            url=url,
+                        )
+                    )
+    return readings
+
+
+async def fetch_course_materials(context: BrowserContext, slug: str) -> Optional[list[ReadingLesson]]:
+    """Fetch the whole module/item tree in one authenticated request. Returns None on failure."""
+    try:
+        with metrics.span("course_materials_api"):
+            response = await context.request.get(COURSE_MATERIALS_API_URL.format(slug=slug), timeout=30_000)
+            body = await response.body()
+        metrics.incr("bytes_received", len(body))
+        if not response.ok:
+            logger.info(f"Course materials API returned HTTP {response.status}")
+            return None
+        return parse_course_materials(json.loads(body), slug)
+    except Exception as e:
+        logger.info(f"Course materials API failed: {e}")
+        return None
+
+
+def course_slug_from_url(course_url: str) -> str:
+    """Extract the course slug from a /learn/<slug>/... URL."""
     parts = course_url.rstrip("/").split("/learn/")
-    slug = parts[-1].split("/")[0] if len(parts) > 1 else course_url.rstrip("/").split("/")[-1]
+    return parts[-1].split("/")[0] if len(parts) > 1 else course_url.rstrip("/").split("/")[-1]
+
+
+async def _fetch_module_readings(
+    context: BrowserContext, module_url: str, retry: int, pool: Optional[PagePool] = None
+) -> list[ReadingLesson]:
+    """Render one module page and parse its readings, retrying navigation errors with backoff."""
+    for attempt in range(retry + 1):
+        try:
+            async with borrow_page(context, pool) as lease:
+                with metrics.span("module_page"):
+                    await lease.page.goto(module_url, wait_until="networkidle", timeout=30_000)
+                    module_html = await lease.page.content()
+        except Exception as e:
+            if attempt == retry:
+                raise
+            delay = backoff_delay(attempt)
+            logger.info(f"Retrying module {module_url} in {delay:.1f}s (attempt {attempt + 2}): {e}")
+            metrics.incr("module_retries")
+            await asyncio.sleep(delay)
+            continue
+
+        _, readings = parse_module_page(module_html)
+        logger.info("Module %s: found %d reading(s)", module_url, len(readings))
+        return readings
+    return []
+
+
+async def iter_course_readings(
+    context: BrowserContext,
+    course_url: str,
+    concurrency: int = 4,
+    retry: int = 1,
+    use_api: bool = True,
+    pool: Optional[PagePool] = None,
+    failed_modules: Optional[list[str]] = None,
+) -> AsyncIterator[ReadingLesson]:
+    """
+    Yield a course's readings module by module, in course order.
+
+    With `use_api`, the course-materials API is tried first. Otherwise, or if
+    it fails or lists no readings, the course home and each module page are
+    rendered and scraped. Module pages are fetched up to `concurrency` ahead
+    of the consumer, so a slow consumer holds back discovery. Readings keep
+    the order of the rc-WeekNavigationItem links; a module that still fails
+    after `retry` extra attempts is reported and left out without losing
+    the rest, and its URL is appended to `failed_modules` if given.
+    Pages are borrowed from `pool` when one is given.
+    """
+    slug = course_slug_from_url(course_url)
+
+    if use_api:
+        readings = await fetch_course_materials(context, slug)
+        if readings:
+            logger.info(f"Course materials API: found {len(readings)} reading(s)")
+            for lesson in readings:
+                yield lesson
+            return
+        logger.info("Falling back to scraping module pages")
 
     # Visit the course home page to discover module links
-    page = await context.new_page()
-    try:
-        await page.goto(course_url, wait_until="networkidle", timeout=30_000)
-        home_html = await page.content()
-    finally:
-        await page.close()
+    async with borrow_page(context, pool) as lease:
+        with metrics.span("course_home"):
+            await lease.page.goto(course_url, wait_until="networkidle", timeout=30_000)
+            home_html = await lease.page.content()
+
+    from bs4 import BeautifulSoup
 
     soup = BeautifulSoup(home_html, "html.parser")
     module_hrefs = [
@@ -76,20 +202,50 @@ async def get_course_readings(
     if not module_hrefs:
         logger.warning("No module links found on course home page; parsing home page directly.")
         _, readings = parse_module_page(home_html)
-        return readings, slug
+        for lesson in readings:
+            yield lesson
+        return
 
-    # Visit each module page and collect reading lessons
-    all_readings: list[ReadingLesson] = []
-    for href in module_hrefs:
-        module_url = href if href.startswith("http") else BASE_URL + href
-        page = await context.new_page()
-        try:
-            await page.goto(module_url, wait_until="networkidle", timeout=30_000)
-            module_html = await page.content()
-        finally:
-            await page.close()
-        _, readings = parse_module_page(module_html)
-        logger.info("Module %s: found %d reading(s)", module_url, len(readings))
-        all_readings.extend(readings)
+    # Keep a window of `concurrency` module fetches in flight, consumed in link order
+    module_urls = iter(href if href.startswith("http") else BASE_URL + href for href in module_hrefs)
+    in_flight: deque[tuple[str, asyncio.Task]] = deque()
+
+    def schedule_next():
+        url = next(module_urls, None)
+        if url is not None:
+            in_flight.append((url, asyncio.ensure_future(_fetch_module_readings(context, url, retry, pool))))
+
+    for _ in range(max(1, concurrency)):
+        schedule_next()
 
-    return all_readings, slug
+    try:
+        while in_flight:
+            module_url, task = in_flight.popleft()
+            try:
+                readings = await task
+            except Exception as e:
+                logger.error(f"Module {module_url} failed after {retry + 1} attempt(s): {e}")
+                if failed_modules is not None:
+                    failed_modules.append(module_url)
+                readings = []
+            schedule_next()
+            for lesson in readings:
+                yield lesson
+    finally:
+        for _, task in in_flight:
+            task.cancel()
+
+
+async def get_course_readings(
+    context: BrowserContext,
+    course_url: str,
+    concurrency: int = 4,
+    retry: int = 1,
+    use_api: bool = True,
+) -> tuple[list[ReadingLesson], str]:
+    """Collect iter_course_readings into a list. Returns (readings, course_slug)."""
+    readings = [
+        lesson
+        async for lesson in iter_course_readings(context, course_url, concurrency, retry, use_api)
+    ]
+    return readings, course_slug_from_url(course_url)
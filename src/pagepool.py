@@ -0,0 +1,150 @@
+# src/pagepool.py
+from __future__ import annotations
+
+import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Optional
+
+from src.metrics import metrics
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_USES = 50
+DEFAULT_MAX_HEAP_MB = 256.0
+
+# Chromium-only; 0 elsewhere, which never triggers a recycle
+_JS_HEAP_USED = "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+
+
+class PageLease:
+    """A page borrowed for one navigation; listeners added through it are removed on return."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self._listeners: list[tuple[str, Callable]] = []
+
+    def on(self, event: str, handler: Callable) -> None:
+        self.page.on(event, handler)
+        self._listeners.append((event, handler))
+
+    def off(self, event: str, handler: Callable) -> None:
+        if (event, handler) in self._listeners:
+            self._listeners.remove((event, handler))
+            self.page.remove_listener(event, handler)
+
+    def reset(self) -> None:
+        for event, handler in self._listeners:
+            self.page.remove_listener(event, handler)
+        self._listeners = []
+
+
+class PagePool:
+    """
+    Pages of one BrowserContext, reused across lessons and module pages.
+
+    A returned page is blanked (about:blank), its listeners are removed and
+    it waits for the next borrower. Pages are closed instead after
+    `max_uses` navigations, when their JS heap passes `max_heap_mb`, or when
+    the borrower's navigation raised, so a wedged renderer is never reused.
+    At most `size` idle pages are kept.
+    """
+
+    def __init__(
+        self,
+        context: BrowserContext,
+        size: int = 4,
+        max_uses: int = DEFAULT_MAX_USES,
+        max_heap_mb: Optional[float] = DEFAULT_MAX_HEAP_MB,
+    ):
+        self.context = context
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.max_heap_bytes = max_heap_mb * 1_000_000 if max_heap_mb else None
+        self._idle: list[Page] = []
+        self._uses: dict[Page, int] = {}
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[PageLease]:
+        if self._idle:
+            page = self._idle.pop()
+            self.reused += 1
+            metrics.incr("pages_reused")
+        else:
+            page = await self.context.new_page()
+            self._uses[page] = 0
+            self.created += 1
+            metrics.incr("pages_created")
+        lease = PageLease(page)
+        healthy = False
+        try:
+            yield lease
+            healthy = True
+        finally:
+            lease.reset()
+            await self._return(page, healthy)
+
+    async def _return(self, page: Page, healthy: bool) -> None:
+        self._uses[page] += 1
+        reason = None
+        if not healthy:
+            reason = "navigation failed"
+        elif self._uses[page] >= self.max_uses:
+            reason = f"{self._uses[page]} navigations"
+        elif len(self._idle) >= self.size:
+            reason = "pool full"
+        else:
+            try:
+                if self.max_heap_bytes is not None:
+                    heap = await page.evaluate(_JS_HEAP_USED)
+                    if heap > self.max_heap_bytes:
+                        reason = f"JS heap {heap / 1_000_000:.0f} MB"
+                if reason is None:
+                    # Stops the previous lesson's requests so they cannot reach the next borrower
+                    await page.goto("about:blank")
+            except Exception as e:
+                reason = f"reset failed: {e}"
+
+        if reason is None:
+            self._idle.append(page)
+            return
+        if reason != "pool full":
+            self.recycled += 1
+            metrics.incr("pages_recycled")
+            logger.debug(f"Recycling page ({reason})")
+        del self._uses[page]
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for page in idle:
+            self._uses.pop(page, None)
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+    def summary(self) -> str:
+        return f"Page pool: {self.created} page(s) opened, {self.reused} reuse(s), {self.recycled} recycled"
+
+
+@asynccontextmanager
+async def borrow_page(context: BrowserContext, pool: Optional[PagePool] = None) -> AsyncIterator[PageLease]:
+    """A page from `pool`, or without one a fresh page that is closed afterwards."""
+    if pool is not None:
+        async with pool.lease() as lease:
+            yield lease
+        return
+    page = await context.new_page()
+    try:
+        yield PageLease(page)
+    finally:
+        await page.close()
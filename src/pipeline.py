@@ -0,0 +1,361 @@
+# src/pipeline.py
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterable, Awaitable, Callable, Optional, Union
+
+from src.archive import HtmlArchive
+from src.cache import HtmlCache
+from src.converter import DEFAULT_PARSER, html_to_sections
+from src.extractor import extract_reading_content
+from src.journal import Journal
+from src.manifest import Manifest, html_sha256
+from src.metrics import metrics
+from src.navigator import ReadingLesson
+from src.pagepool import PagePool
+from src.sinks import CsvSink, LessonRecord, Sink
+from src.throttle import AdaptiveLimit, RateLimiter
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RunStats:
+    total: int
+    saved: int = 0
+    skipped: int = 0
+    resumed: int = 0
+    unchanged: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def lessons_per_second(self) -> float:
+        return self.saved / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class BatchWriter:
+    """
+    Dedicated writer task in front of a Sink.
+
+    Records are buffered and handed to the sink in batches of up to
+    `batch_size`, or whatever arrived within `flush_interval` seconds. Sink
+    I/O runs on one background thread so it never blocks the event loop.
+    `on_written(record, path)` is called once a record's batch is durable.
+    """
+
+    def __init__(
+        self,
+        sink: Sink,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        on_written: Optional[Callable[[LessonRecord, Path], None]] = None,
+        on_failed: Optional[Callable[[LessonRecord, Exception], None]] = None,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_written = on_written
+        self.on_failed = on_failed
+        self._queue: asyncio.Queue[Optional[LessonRecord]] = asyncio.Queue(maxsize=batch_size * 2)
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sink")
+
+    async def put(self, record: LessonRecord) -> None:
+        await self._queue.put(record)
+
+    async def close(self) -> None:
+        """Flush everything queued so far and stop `run()`."""
+        await self._queue.put(None)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        done = False
+        try:
+            while not done:
+                batch: list[LessonRecord] = []
+                item = await self._queue.get()
+                deadline = loop.time() + self.flush_interval
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), max(0.0, deadline - loop.time()))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    done = True
+                if batch:
+                    await self._flush(batch)
+        finally:
+            self._thread.shutdown()
+
+    async def _flush(self, batch: list[LessonRecord]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            with metrics.span("write"):
+                paths = await loop.run_in_executor(self._thread, self.sink.write_batch, batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} lesson(s): {e}")
+            for record in batch:
+                if self.on_failed is not None:
+                    self.on_failed(record, e)
+            return
+        for record, path in zip(batch, paths):
+            if self.on_written is not None:
+                self.on_written(record, path)
+
+
+async def _run_stages(*stages: Awaitable[None]) -> None:
+    """
+    Run pipeline stages concurrently, like a TaskGroup: the first stage to
+    fail cancels the others, which are awaited before its error is raised,
+    so nothing keeps extracting or writing behind the caller's back.
+    """
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def scrape_lessons(
+    context: BrowserContext,
+    readings: Union[list[ReadingLesson], AsyncIterable[ReadingLesson]],
+    course_slug: str,
+    concurrency: int = 1,
+    limiter: Optional[RateLimiter] = None,
+    output_dir: Path = Path("output"),
+    direct: bool = True,
+    cache: Optional[HtmlCache] = None,
+    refresh: bool = False,
+    journal: Optional[Journal] = None,
+    executor: Optional[Executor] = None,
+    convert_workers: int = 1,
+    parser: str = DEFAULT_PARSER,
+    sink: Optional[Sink] = None,
+    slots: Optional[Union[asyncio.Semaphore, AdaptiveLimit]] = None,
+    on_response: Optional[Callable[[int, float, Optional[float]], None]] = None,
+    pages: Optional[PagePool] = None,
+    manifest: Optional[Manifest] = None,
+    archive: Optional[HtmlArchive] = None,
+) -> RunStats:
+    """
+    Extract, convert and write readings as they arrive from `readings`, a
+    list or an async iterator such as iter_course_readings. Every stage is
+    joined to the next by a bounded queue, so the first lessons are saved
+    while discovery is still running and a slow stage holds back the ones
+    before it instead of piling lessons up in memory.
+
+    Up to `concurrency` extraction workers pull lessons from the discovery
+    queue. All workers open their pages in the same BrowserContext and share
+    `limiter`, which paces how often a new lesson may be started; `slots`,
+    when shared between several courses, caps how many extractions run at
+    once across all of them; an AdaptiveLimit lets a controller change that
+    cap during the run, fed by `on_response` with the status and latency of
+    direct API fetches. Lesson pages are borrowed from `pages` instead of
+    opened per attempt. `direct` selects the supplements API backend in
+    front of the page-interception path.
+
+    With a `cache`, previously fetched HTML is reused without touching the
+    network or the rate limit; `refresh` skips cache reads but still stores
+    what was fetched. Freshly fetched HTML is kept in `archive` for offline
+    re-conversion. Cache and archive I/O runs on the default executor, off
+    the loop. With a `manifest`, lessons whose raw HTML hashes the same as
+    when their output was written are neither converted nor written again.
+    Lessons that `journal` already records as written are skipped, and
+    every new write is appended to it.
+
+    Conversion and writing run as a separate stage of `convert_workers`
+    tasks fed through a bounded queue, so extraction keeps fetching while
+    earlier lessons convert. With an `executor` (normally a
+    ProcessPoolExecutor) html_to_sections runs there instead of on the loop,
+    parsing with `parser`. Converted lessons go to a dedicated writer task
+    that hands them to `sink` in batches (per-lesson CSVs under `output_dir`
+    by default); a lesson is journaled once its batch is written.
+    """
+    workers = max(1, concurrency)
+    converters = max(1, convert_workers)
+    stats = RunStats(total=0)
+    lessons: asyncio.Queue[Optional[tuple[int, ReadingLesson]]] = asyncio.Queue(maxsize=workers * 2)
+    converted: asyncio.Queue[Optional[tuple[ReadingLesson, str]]] = asyncio.Queue(
+        maxsize=converters * 2
+    )
+    loop = asyncio.get_running_loop()
+    sink = sink if sink is not None else CsvSink(output_dir)
+    started_at: dict[str, float] = {}
+    digests: dict[str, str] = {}
+
+    def on_written(record: LessonRecord, path: Path):
+        lesson = ReadingLesson(record.module, record.lesson_title, record.url)
+        if journal is not None:
+            journal.record_written(lesson, path, shared=sink.shared)
+        if manifest is not None:
+            manifest.record_written(lesson, digests.pop(record.url), path)
+        stats.saved += 1
+        started = started_at.pop(record.url, None)
+        if started is not None:
+            metrics.observe("lesson", time.monotonic() - started, lesson=record.url)
+        metrics.incr("lessons_saved")
+        logger.info(f"  Saved → {path}")
+
+    def on_failed(record: LessonRecord, error: Exception):
+        started_at.pop(record.url, None)
+        digests.pop(record.url, None)
+        stats.skipped += 1
+        metrics.incr("lessons_skipped")
+
+    writer = BatchWriter(sink, on_written=on_written, on_failed=on_failed)
+
+    async def worker():
+        while True:
+            item = await lessons.get()
+            if item is None:
+                return
+            i, lesson = item
+
+            if journal is not None and journal.is_done(lesson.url):
+                stats.resumed += 1
+                metrics.incr("lessons_resumed")
+                continue
+
+            logger.info(f"[{i}] {lesson.module} → {lesson.lesson_title}")
+            started_at[lesson.url] = time.monotonic()
+            html = None
+            if cache is not None and not refresh:
+                html = await loop.run_in_executor(None, cache.get, lesson.url)
+            fetched = html is None
+
+            if html is None:
+                waiting = time.perf_counter()
+                async with slots if slots is not None else contextlib.nullcontext():
+                    if limiter is not None:
+                        await limiter.acquire()
+                    metrics.observe("throttle_wait", time.perf_counter() - waiting, lesson=lesson.url)
+                    with metrics.span("extract", lesson=lesson.url):
+                        html = await extract_reading_content(
+                            context, lesson.url, direct=direct, on_response=on_response, pool=pages
+                        )
+                if html is not None and cache is not None:
+                    await loop.run_in_executor(None, cache.put, lesson.url, html)
+
+            if html is None:
+                logger.warning(f"  Skipping — could not extract content.")
+                started_at.pop(lesson.url, None)
+                stats.skipped += 1
+                metrics.incr("lessons_skipped")
+                continue
+
+            # Cached HTML was archived when it was fetched; it is only written
+            # again if it is missing (cached before archiving was enabled) or
+            # the course was reorganised since
+            if archive is not None and (
+                fetched or not await loop.run_in_executor(None, archive.is_current, course_slug, lesson, i)
+            ):
+                try:
+                    with metrics.span("archive", lesson=lesson.url):
+                        await loop.run_in_executor(None, archive.put, course_slug, lesson, i, html)
+                except OSError as e:
+                    logger.warning(f"  Could not archive {lesson.lesson_title}: {e}")
+
+            if manifest is not None:
+                digest = html_sha256(html)
+                if manifest.is_unchanged(lesson.url, digest):
+                    started_at.pop(lesson.url, None)
+                    stats.unchanged += 1
+                    manifest.record_unchanged(lesson)
+                    metrics.incr("lessons_unchanged")
+                    continue
+                digests[lesson.url] = digest
+
+            await converted.put((lesson, html))
+
+    async def converter():
+        while True:
+            item = await converted.get()
+            if item is None:
+                return
+            lesson, html = item
+
+            try:
+                # With an executor this includes time spent queued for a free process
+                with metrics.span("convert", lesson=lesson.url):
+                    if executor is None:
+                        sections = html_to_sections(html, lesson.lesson_title, parser)
+                    else:
+                        sections = await loop.run_in_executor(
+                            executor, html_to_sections, html, lesson.lesson_title, parser
+                        )
+            except Exception as e:
+                logger.error(f"  Failed to convert {lesson.lesson_title}: {e}")
+                started_at.pop(lesson.url, None)
+                digests.pop(lesson.url, None)
+                stats.skipped += 1
+                metrics.incr("lessons_skipped")
+                continue
+
+            await writer.put(
+                LessonRecord(course_slug, lesson.module, lesson.lesson_title, lesson.url, sections)
+            )
+
+    async def discover_stage():
+        # In-flight state (start times, digests) is keyed by URL, so a lesson
+        # listed twice is only processed once
+        queued: set[str] = set()
+
+        async def queue(lesson: ReadingLesson) -> None:
+            if lesson.url in queued:
+                logger.warning(f"  Ignoring repeated lesson {lesson.url}")
+                return
+            queued.add(lesson.url)
+            stats.total += 1
+            if manifest is not None:
+                manifest.see(lesson)
+            await lessons.put((stats.total, lesson))
+
+        if isinstance(readings, list):
+            for lesson in readings:
+                await queue(lesson)
+        else:
+            async for lesson in readings:
+                await queue(lesson)
+        # Not in a finally: when discovery fails the other stages are
+        # cancelled, and nobody would be left to take these off a full queue
+        for _ in range(workers):
+            await lessons.put(None)
+
+    async def extract_stage():
+        await _run_stages(*(worker() for _ in range(workers)))
+        for _ in range(converters):
+            await converted.put(None)
+
+    async def convert_stage():
+        await _run_stages(*(converter() for _ in range(converters)))
+        await writer.close()
+
+    started = time.monotonic()
+    await _run_stages(discover_stage(), extract_stage(), convert_stage(), writer.run())
+    stats.elapsed = time.monotonic() - started
+
+    if stats.resumed:
+        logger.info(f"Skipped {stats.resumed} lesson(s) already saved by a previous run")
+    if stats.unchanged:
+        logger.info(f"Skipped {stats.unchanged} lesson(s) whose reading has not changed")
+    logger.info(
+        f"Saved {stats.saved}/{stats.total} lessons in {stats.elapsed:.1f}s "
+        f"({stats.lessons_per_second:.2f} lessons/s, {workers} worker(s))"
+    )
+    return stats
@@ -0,0 +1,134 @@
+# src/reconvert.py
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from pathlib import Path
+from typing import Optional
+
+from src.archive import HtmlArchive, load_archived
+from src.converter import DEFAULT_PARSER, html_to_sections
+from src.database import DEFAULT_DB_PATH
+from src.manifest import Manifest
+from src.navigator import ReadingLesson
+from src.sinks import LessonRecord, make_sink
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+
+
+@dataclass
+class ReconvertStats:
+    total: int = 0
+    saved: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def lessons_per_second(self) -> float:
+        return self.saved / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _convert_archived(path: Path, parser: str) -> tuple[str, int, Optional[LessonRecord], str]:
+    """
+    Runs in a worker process: load one archived reading and convert it.
+    Returns (course_slug, position, record, digest); on failure the record
+    is None and the last item is the error instead.
+    """
+    try:
+        entry = load_archived(path)
+    except Exception as e:
+        return "", 0, None, f"{path}: {e}"
+    try:
+        sections = html_to_sections(entry.html, entry.lesson_title, parser)
+    except Exception as e:
+        return entry.course_slug, entry.position, None, f"{entry.lesson_title}: {e}"
+    record = LessonRecord(entry.course_slug, entry.module, entry.lesson_title, entry.url, sections)
+    return entry.course_slug, entry.position, record, entry.html_sha256
+
+
+def reconvert(
+    archive: HtmlArchive,
+    course_slug: Optional[str] = None,
+    sink: str = "csv",
+    db_path: Path = DEFAULT_DB_PATH,
+    output_dir: Path = Path("output"),
+    parser: str = DEFAULT_PARSER,
+    workers: Optional[int] = None,
+) -> ReconvertStats:
+    """
+    Rebuild outputs from the raw HTML in `archive` (every course, or just
+    `course_slug`), with no browser and no network.
+
+    Loading and converting run in a pool of `workers` processes (all cores
+    by default). Each course's lessons are written in discovery order (a
+    scrape with concurrency > 1 writes them in the order they finish, so
+    JSONL rows can come out in a different order), and the course's
+    manifest is updated so the next incremental scrape does not convert
+    them again.
+    """
+    paths = archive.entries(course_slug)
+    stats = ReconvertStats(total=len(paths))
+    if not paths:
+        logger.warning(f"Nothing archived under {archive.root}")
+        return stats
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    output = make_sink(sink, output_dir=output_dir, db_path=db_path)
+    started = time.monotonic()
+    logger.info(f"Re-converting {len(paths)} archived lesson(s) with {workers} process(es)")
+
+    def write_course(slug: str, converted: list[tuple[int, LessonRecord, str]]) -> None:
+        converted.sort(key=lambda item: item[0])
+        manifest = Manifest(slug, sink=sink, parser=parser) if output.incremental else None
+        try:
+            for start in range(0, len(converted), BATCH_SIZE):
+                batch = converted[start : start + BATCH_SIZE]
+                try:
+                    written = output.write_batch([record for _, record, _ in batch])
+                except Exception as e:
+                    logger.error(f"Failed to write {len(batch)} lesson(s) of {slug}: {e}")
+                    stats.failed += len(batch)
+                    continue
+                for (_, record, digest), path in zip(batch, written):
+                    if manifest is not None:
+                        lesson = ReadingLesson(record.module, record.lesson_title, record.url)
+                        manifest.record_written(lesson, digest, path)
+                stats.saved += len(batch)
+        finally:
+            if manifest is not None:
+                manifest.close()
+        logger.info(f"  {slug}: {len(converted)} lesson(s) written")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            current: Optional[str] = None
+            converted: list[tuple[int, LessonRecord, str]] = []
+            # Archive entries come grouped by course, and map() keeps their order
+            chunksize = max(1, min(32, len(paths) // (workers * 4)))
+            for slug, position, record, detail in pool.map(
+                _convert_archived, paths, repeat(parser), chunksize=chunksize
+            ):
+                if record is None:
+                    logger.error(f"  Failed to re-convert {detail}")
+                    stats.failed += 1
+                    continue
+                if slug != current:
+                    if converted:
+                        write_course(current, converted)
+                    current, converted = slug, []
+                converted.append((position, record, detail))
+            if converted:
+                write_course(current, converted)
+    finally:
+        output.close()
+
+    stats.elapsed = time.monotonic() - started
+    logger.info(
+        f"Re-converted {stats.saved}/{stats.total} lessons in {stats.elapsed:.1f}s "
+        f"({stats.lessons_per_second:.2f} lessons/s)"
+    )
+    return stats
@@ -0,0 +1,415 @@
+# src/runner.py
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from playwright.async_api import BrowserContext
+
+from src.archive import HtmlArchive
+from src.auth import login, new_context
+from src.blocker import ResourceBlocker
+from src.cache import HtmlCache
+from src.converter import DEFAULT_PARSER
+from src.database import DEFAULT_DB_PATH
+from src.journal import Journal
+from src.manifest import Manifest, write_change_report
+from src.metrics import DEFAULT_METRICS_PATH, metrics
+from src.navigator import BASE_URL, ReadingLesson, course_slug_from_url, iter_course_readings
+from src.pagepool import DEFAULT_MAX_HEAP_MB, DEFAULT_MAX_USES, PagePool
+from src.pipeline import RunStats, scrape_lessons
+from src.sinks import make_sink
+from src.throttle import AdaptiveController, AdaptiveLimit, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+DELAY_BETWEEN_LESSONS = float(os.getenv("SCRAPE_DELAY", "2"))
+DEFAULT_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "1"))
+DEFAULT_CACHE_MAX_MB = 500.0
+DEFAULT_CONVERT_WORKERS = int(os.getenv("SCRAPE_CONVERT_WORKERS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_BROWSER_ENDPOINT = os.getenv("SCRAPE_BROWSER_ENDPOINT") or None
+
+
+@dataclass
+class ScrapeOptions:
+    concurrency: int = DEFAULT_CONCURRENCY
+    rate: Optional[float] = None
+    adaptive: bool = False
+    min_rate: float = 0.2
+    max_rate: float = 5.0
+    min_concurrency: int = 1
+    max_concurrency: int = 8
+    target_latency: float = 5.0
+    page_max_uses: int = DEFAULT_MAX_USES
+    page_max_heap_mb: Optional[float] = DEFAULT_MAX_HEAP_MB
+    incremental: bool = True
+    archive: bool = True
+    direct: bool = True
+    block_resources: bool = True
+    use_cache: bool = True
+    refresh: bool = False
+    cache_ttl: Optional[float] = None
+    cache_max_mb: Optional[float] = DEFAULT_CACHE_MAX_MB
+    fresh: bool = False
+    api_discovery: bool = True
+    convert_workers: int = DEFAULT_CONVERT_WORKERS
+    parser: str = DEFAULT_PARSER
+    sink: str = "csv"
+    db_path: Path = DEFAULT_DB_PATH
+    parallel_courses: int = 2
+    record_har: Optional[Path] = None
+    replay_har: Optional[Path] = None
+    browser_endpoint: Optional[str] = DEFAULT_BROWSER_ENDPOINT
+    metrics_path: Optional[Path] = DEFAULT_METRICS_PATH
+    prometheus_path: Optional[Path] = None
+
+    def __post_init__(self):
+        if self.record_har is not None or self.replay_har is not None:
+            # HAR routing only sees page traffic, not context.request API calls,
+            # so lessons and modules have to be reached by navigation
+            self.direct = False
+            self.api_discovery = False
+            # Neither may be short-circuited by the HTML cache or the manifest:
+            # a recording would miss those lessons and a replay would not test them
+            self.use_cache = False
+            self.incremental = False
+        if self.record_har is not None:
+            # Every lesson must actually be fetched to end up in the archive
+            self.refresh = True
+            self.fresh = True
+
+    @property
+    def har_mode(self) -> bool:
+        return self.record_har is not None or self.replay_har is not None
+
+    @property
+    def effective_rate(self) -> float:
+        """Lessons per second; defaults to one every SCRAPE_DELAY seconds."""
+        if self.rate is not None:
+            return self.rate
+        return 1 / DELAY_BETWEEN_LESSONS if DELAY_BETWEEN_LESSONS > 0 else 0
+
+    @property
+    def worker_tasks(self) -> int:
+        """Extraction tasks to start; adaptive runs need enough for the highest limit."""
+        return max(1, self.max_concurrency if self.adaptive else self.concurrency)
+
+
+@dataclass
+class CourseResult:
+    course_url: str
+    stats: Optional[RunStats] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class SharedResources:
+    """What every course in a run shares: rate budget, worker slots, cache and pool."""
+
+    limiter: RateLimiter
+    slots: Union[asyncio.Semaphore, AdaptiveLimit]
+    controller: Optional[AdaptiveController] = None
+    cache: Optional[HtmlCache] = None
+    executor: Optional[Executor] = None
+    blocker: Optional[ResourceBlocker] = None
+
+
+def make_throttle(
+    options: ScrapeOptions, share: int = 1
+) -> tuple[RateLimiter, Union[asyncio.Semaphore, AdaptiveLimit], Optional[AdaptiveController]]:
+    """
+    Rate limiter, extraction slots and (with `options.adaptive`) the AIMD
+    controller driving them. `share` splits the rate budget between that
+    many processes.
+    """
+    rate = options.effective_rate / share
+    if not options.adaptive:
+        return RateLimiter(rate), asyncio.Semaphore(max(1, options.concurrency)), None
+    limiter = RateLimiter(rate)
+    slots = AdaptiveLimit(options.concurrency)
+    controller = AdaptiveController(
+        limiter,
+        slots,
+        min_rate=options.min_rate / share,
+        max_rate=options.max_rate / share,
+        min_concurrency=options.min_concurrency,
+        max_concurrency=options.max_concurrency,
+        target_latency=options.target_latency,
+        base_url=BASE_URL,
+    )
+    logger.info(f"Adaptive throttle: starting at {controller.state()}")
+    return limiter, slots, controller
+
+
+def open_page_pool(context: BrowserContext, options: ScrapeOptions) -> Optional[PagePool]:
+    """A page pool for `context`, or None (a fresh page per navigation) if page_max_uses is 0."""
+    if options.page_max_uses <= 0:
+        return None
+    return PagePool(
+        context,
+        size=options.worker_tasks,
+        max_uses=options.page_max_uses,
+        max_heap_mb=options.page_max_heap_mb,
+    )
+
+
+def open_cache(options: ScrapeOptions) -> Optional[HtmlCache]:
+    if not options.use_cache:
+        return None
+    return HtmlCache(
+        ttl=options.cache_ttl * 3600 if options.cache_ttl is not None else None,
+        max_bytes=int(options.cache_max_mb * 1_000_000) if options.cache_max_mb is not None else None,
+    )
+
+
+async def scrape_course(
+    context: BrowserContext,
+    course_url: str,
+    options: ScrapeOptions,
+    shared: SharedResources,
+) -> RunStats:
+    """
+    Discover and scrape one course in `context`, resuming from its journal if
+    possible. Incremental runs skip lessons whose reading is unchanged and
+    write output/<slug>.changes.json listing what was added, changed,
+    unchanged and removed.
+    """
+    course_slug = course_slug_from_url(course_url)
+    journal = Journal(course_slug, reset=options.fresh)
+    pages = open_page_pool(context, options)
+    manifest = None
+    failed_modules: list[str] = []
+
+    try:
+        if journal.readings is not None:
+            readings = journal.readings
+            logger.info(
+                f"Resuming previous run from {journal.path} "
+                f"({len(journal.completed)}/{len(readings)} lessons done)"
+            )
+        else:
+            logger.info(f"Fetching course structure from {course_url}")
+            readings = journal.track_discovery(
+                iter_course_readings(
+                    context,
+                    course_url,
+                    use_api=options.api_discovery,
+                    pool=pages,
+                    failed_modules=failed_modules,
+                ),
+                failed_modules,
+            )
+
+        # Resumed runs extend streaming outputs instead of truncating them,
+        # keeping only the lessons the journal records as written
+        output = make_sink(
+            options.sink,
+            db_path=options.db_path,
+            append=bool(journal.completed),
+            keep=set(journal.completed),
+        )
+        if options.incremental and output.incremental:
+            manifest = Manifest(course_slug, sink=options.sink, parser=options.parser)
+        try:
+            stats = await scrape_lessons(
+                context,
+                readings,
+                course_slug,
+                concurrency=options.worker_tasks,
+                limiter=shared.limiter,
+                direct=options.direct,
+                cache=shared.cache,
+                refresh=options.refresh,
+                journal=journal,
+                executor=shared.executor,
+                convert_workers=max(1, options.convert_workers),
+                parser=options.parser,
+                sink=output,
+                slots=shared.slots,
+                on_response=shared.controller.observe if shared.controller is not None else None,
+                pages=pages,
+                manifest=manifest,
+                archive=HtmlArchive() if options.archive else None,
+            )
+        finally:
+            output.close()
+
+        journal.record_finished()
+        if manifest is not None:
+            # A lesson is only "removed" if discovery really saw the whole course
+            report = manifest.finish(complete=stats.total > 0 and not failed_modules)
+            logger.info(f"Changes: {report.summary()} → {write_change_report(report)}")
+        if stats.total == 0:
+            logger.warning(f"No Reading lessons found in {course_url}.")
+        return stats
+    finally:
+        journal.close()
+        if manifest is not None:
+            manifest.close()
+        if pages is not None:
+            logger.info(pages.summary())
+            await pages.close()
+
+
+async def run_courses(
+    course_urls: list[str],
+    email: str,
+    password: str,
+    options: ScrapeOptions,
+) -> list[CourseResult]:
+    """
+    Scrape one or more courses with a single browser launch and login.
+
+    The first course runs in the login context; further courses get their
+    own BrowserContext built from its storage state. Up to
+    `options.parallel_courses` courses run at once, all drawing on one rate
+    limit and one pool of `options.concurrency` extraction slots. A failing
+    course is reported in its CourseResult and does not stop the others.
+    """
+    metrics.reset()
+    limiter, slots, controller = make_throttle(options)
+    shared = SharedResources(
+        limiter=limiter,
+        slots=slots,
+        controller=controller,
+        blocker=ResourceBlocker() if options.block_resources else None,
+    )
+    shared.cache = open_cache(options)
+    if options.convert_workers > 0:
+        shared.executor = ProcessPoolExecutor(max_workers=options.convert_workers)
+
+    course_slots = asyncio.Semaphore(max(1, options.parallel_courses))
+    playwright = browser = context = storage_state = None
+    login_context_free = True
+
+    async def run_one(course_url: str) -> CourseResult:
+        nonlocal login_context_free
+        result = CourseResult(course_url=course_url)
+        async with course_slots:
+            started = time.monotonic()
+            own_context = None
+            try:
+                if login_context_free or options.har_mode:
+                    # One archive per run, so HAR runs keep every course in the login context
+                    login_context_free = False
+                    course_context = context
+                else:
+                    own_context = await new_context(browser, storage_state, shared.blocker)
+                    if shared.controller is not None:
+                        shared.controller.watch(own_context)
+                    course_context = own_context
+                result.stats = await scrape_course(course_context, course_url, options, shared)
+            except Exception as e:
+                logger.error(f"Course {course_url} failed: {e}")
+                result.error = str(e) or type(e).__name__
+            finally:
+                if own_context is not None:
+                    await own_context.close()
+                result.elapsed = time.monotonic() - started
+        return result
+
+    try:
+        logger.info("Logging into Coursera...")
+        with metrics.span("login"):
+            playwright, browser, context = await login(
+                email,
+                password,
+                blocker=shared.blocker,
+                record_har=options.record_har,
+                replay_har=options.replay_har,
+                browser_endpoint=options.browser_endpoint,
+            )
+        if shared.controller is not None:
+            shared.controller.watch(context)
+        if len(course_urls) > 1 and not options.har_mode:
+            storage_state = await context.storage_state()
+        return list(await asyncio.gather(*(run_one(url) for url in course_urls)))
+    finally:
+        # Closing the context explicitly is what writes a recorded HAR
+        if context is not None:
+            await context.close()
+        if browser is not None:
+            await browser.close()
+        if playwright is not None:
+            await playwright.stop()
+        if options.record_har is not None:
+            logger.info(f"Recorded traffic to {options.record_har}")
+        if shared.executor is not None:
+            shared.executor.shutdown()
+        if shared.controller is not None:
+            logger.info(shared.controller.summary())
+        if shared.blocker is not None:
+            logger.info(shared.blocker.summary())
+        if shared.cache is not None:
+            logger.info(shared.cache.summary())
+            shared.cache.close()
+        write_metrics(options)
+
+
+def write_metrics(options: ScrapeOptions, suffix: str = "") -> None:
+    """Write the run's metrics report(s); `suffix` keeps worker processes from sharing a file."""
+    for path, write in (
+        (options.metrics_path, metrics.write_json),
+        (options.prometheus_path, metrics.write_prometheus),
+    ):
+        if path is None:
+            continue
+        if suffix:
+            path = path.with_name(f"{path.stem}-{suffix}{path.suffix}")
+        try:
+            logger.info(f"Metrics written to {write(path)}")
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {path}: {e}")
+
+
+async def discover_course(
+    course_url: str,
+    email: str,
+    password: str,
+    options: ScrapeOptions,
+) -> list[ReadingLesson]:
+    """Log in and list a course's reading lessons, without extracting any."""
+    blocker = ResourceBlocker() if options.block_resources else None
+    playwright = browser = context = None
+    try:
+        playwright, browser, context = await login(
+            email,
+            password,
+            blocker=blocker,
+            replay_har=options.replay_har,
+            browser_endpoint=options.browser_endpoint,
+        )
+        return [
+            lesson
+            async for lesson in iter_course_readings(context, course_url, use_api=options.api_discovery)
+        ]
+    finally:
+        if context is not None:
+            await context.close()
+        if browser is not None:
+            await browser.close()
+        if playwright is not None:
+            await playwright.stop()
+
+
+def log_results(results: list[CourseResult]) -> None:
+    """Per-course summary for batch runs."""
+    logger.info(f"Batch finished: {sum(r.ok for r in results)}/{len(results)} course(s) succeeded")
+    for r in results:
+        if r.ok:
+            logger.info(
+                f"  OK     {r.course_url}: {r.stats.saved}/{r.stats.total} saved, "
+                f"{r.stats.resumed} resumed, {r.stats.unchanged} unchanged, "
+                f"{r.stats.skipped} skipped in {r.elapsed:.1f}s"
+            )
+        else:
+            logger.info(f"  FAILED {r.course_url}: {r.error}")
@@ -0,0 +1,304 @@
+# src/sharding.py
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from src.archive import HtmlArchive
+from src.auth import login
+from src.blocker import ResourceBlocker
+from src.converter import html_to_sections
+from src.extractor import extract_reading_content
+from src.navigator import course_slug_from_url, iter_course_readings
+from src.pipeline import RunStats
+from src.metrics import metrics
+from src.runner import (
+    CourseResult,
+    ScrapeOptions,
+    make_throttle,
+    open_cache,
+    open_page_pool,
+    write_metrics,
+)
+from src.sinks import LessonRecord, make_sink
+from src.workqueue import DEFAULT_QUEUE_PATH, Job, WorkQueue
+
+logger = logging.getLogger(__name__)
+
+# JSONL sinks append to one file per course, which several processes cannot share
+SHARDABLE_SINKS = ("csv", "sqlite")
+LEASE_SECONDS = 300.0
+POLL_INTERVAL = 1.0
+PROGRESS_INTERVAL = 10.0
+
+
+async def _work(
+    queue_path: Path,
+    worker_id: str,
+    email: str,
+    password: str,
+    options: ScrapeOptions,
+    workers: int,
+) -> int:
+    """
+    Claim and process lessons until the queue is drained. Returns how many were saved.
+
+    The queue, cache, archive and sink do blocking I/O, so they are opened,
+    used and closed on one I/O thread (which also keeps each SQLite
+    connection on the thread that made it); conversion runs on another
+    thread. The event loop is left to the browser.
+    """
+    loop = asyncio.get_running_loop()
+    io_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{worker_id}-io")
+
+    def io(fn, *args, **kwargs):
+        return loop.run_in_executor(io_thread, partial(fn, *args, **kwargs))
+
+    queue = await io(WorkQueue, queue_path)
+    # Each worker gets its share of the overall rate budget
+    limiter, slots, controller = make_throttle(options, share=workers)
+    cache = await io(open_cache, options)
+    archive = HtmlArchive() if options.archive else None
+    blocker = ResourceBlocker() if options.block_resources else None
+    sink = await io(make_sink, options.sink, db_path=options.db_path)
+    playwright = browser = context = pages = None
+    saved = 0
+
+    async def process(job: Job) -> None:
+        nonlocal saved
+        html = await io(cache.get, job.url) if cache is not None and not options.refresh else None
+        fetched = html is None
+        if html is None:
+            async with slots:
+                with metrics.span("throttle_wait", lesson=job.url):
+                    await limiter.acquire()
+                with metrics.span("extract", lesson=job.url):
+                    html = await extract_reading_content(
+                        context,
+                        job.url,
+                        direct=options.direct,
+                        on_response=controller.observe if controller is not None else None,
+                        pool=pages,
+                    )
+            if html and cache is not None:
+                await io(cache.put, job.url, html)
+        if not html:
+            await io(queue.fail, job, worker_id, "no reading content captured")
+            metrics.incr("lessons_failed")
+            logger.warning(f"[{worker_id}] No content for {job.lesson_title} (attempt {job.attempts})")
+            return
+        if archive is not None and (
+            fetched or not await io(archive.is_current, job.course_slug, job.lesson, job.id)
+        ):
+            # Job ids follow discovery order, which is all a position has to preserve
+            with metrics.span("archive", lesson=job.url):
+                await io(archive.put, job.course_slug, job.lesson, job.id, html)
+        with metrics.span("convert", lesson=job.url):
+            sections = await loop.run_in_executor(None, html_to_sections, html, job.lesson_title, options.parser)
+        with metrics.span("write"):
+            [path] = await io(
+                sink.write_batch, [LessonRecord(job.course_slug, job.module, job.lesson_title, job.url, sections)]
+            )
+        await io(queue.complete, job, worker_id, str(path))
+        metrics.incr("lessons_saved")
+        saved += 1
+        logger.info(f"[{worker_id}] Saved → {path}")
+
+    async def lane() -> None:
+        while True:
+            job = await io(queue.claim, worker_id, LEASE_SECONDS)
+            if job is None:
+                # Other lanes or workers may still hand jobs back, or let their leases lapse
+                if await io(queue.remaining) == 0:
+                    return
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+            try:
+                await process(job)
+            except Exception as e:
+                logger.error(f"[{worker_id}] {job.url} failed: {e}")
+                await io(queue.fail, job, worker_id, str(e) or type(e).__name__)
+                metrics.incr("lessons_failed")
+
+    try:
+        with metrics.span("login"):
+            playwright, browser, context = await login(
+                email,
+                password,
+                blocker=blocker,
+                replay_har=options.replay_har,
+                browser_endpoint=options.browser_endpoint,
+            )
+        if controller is not None:
+            controller.watch(context)
+        pages = open_page_pool(context, options)
+        await asyncio.gather(*(lane() for _ in range(options.worker_tasks)))
+        return saved
+    finally:
+        if pages is not None:
+            await pages.close()
+        if browser is not None:
+            await browser.close()
+        if playwright is not None:
+            await playwright.stop()
+        await io(sink.close)
+        if controller is not None:
+            logger.info(f"[{worker_id}] {controller.summary()}")
+        if cache is not None:
+            await io(cache.close)
+        await io(queue.close)
+        io_thread.shutdown()
+        write_metrics(options, suffix=worker_id)
+
+
+def worker_main(
+    queue_path: Path,
+    worker_id: str,
+    email: str,
+    password: str,
+    options: ScrapeOptions,
+    workers: int,
+) -> None:
+    """Entry point of a worker process."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    saved = asyncio.run(_work(queue_path, worker_id, email, password, options, workers))
+    logger.info(f"[{worker_id}] Queue drained, {saved} lesson(s) saved")
+
+
+async def enqueue_courses(
+    queue: WorkQueue,
+    course_urls: list[str],
+    email: str,
+    password: str,
+    options: ScrapeOptions,
+) -> None:
+    """
+    Discover every course and put its readings on the queue. Logging in here
+    also leaves session.json behind for the workers to load.
+    """
+    blocker = ResourceBlocker() if options.block_resources else None
+    playwright = browser = None
+    try:
+        logger.info("Logging into Coursera...")
+        playwright, browser, context = await login(
+            email,
+            password,
+            blocker=blocker,
+            replay_har=options.replay_har,
+            browser_endpoint=options.browser_endpoint,
+        )
+        for course_url in course_urls:
+            slug = course_slug_from_url(course_url)
+            logger.info(f"Fetching course structure from {course_url}")
+            with metrics.span("discover"):
+                readings = [
+                    lesson
+                    async for lesson in iter_course_readings(context, course_url, use_api=options.api_discovery)
+                ]
+            added = queue.enqueue(slug, readings)
+            logger.info(f"Queued {added} new of {len(readings)} reading(s) for {slug}")
+    finally:
+        if browser is not None:
+            await browser.close()
+        if playwright is not None:
+            await playwright.stop()
+
+
+async def run_sharded(
+    course_urls: list[str],
+    email: str,
+    password: str,
+    options: ScrapeOptions,
+    workers: int,
+    queue_path: Path = DEFAULT_QUEUE_PATH,
+) -> list[CourseResult]:
+    """
+    Coordinator: discover the courses into a WorkQueue, then start `workers`
+    processes, each with its own browser, that claim, extract, convert and
+    write lessons until the queue is drained.
+
+    The queue outlives the run, so an interrupted job resumes where it
+    stopped; a worker that dies is replaced and its leased lessons are picked
+    up again once the lease expires.
+    """
+    if options.record_har is not None:
+        raise ValueError("--record-har needs a single process; record first, then replay with --workers")
+    if options.sink not in SHARDABLE_SINKS:
+        raise ValueError(f"--workers needs one of the {', '.join(SHARDABLE_SINKS)} sinks, not {options.sink!r}")
+
+    started = time.monotonic()
+    metrics.reset()
+    queue = WorkQueue(queue_path)
+    try:
+        if options.fresh or queue.remaining() == 0:
+            # Nothing left from an interrupted run: start over
+            queue.clear()
+        await enqueue_courses(queue, course_urls, email, password, options)
+
+        spawn = multiprocessing.get_context("spawn")
+
+        # Processes started per slot so far, so a replacement gets a new id
+        starts = [0] * workers
+
+        def start(index: int):
+            worker_id = f"w{index}-{starts[index]}"
+            starts[index] += 1
+            process = spawn.Process(
+                target=worker_main,
+                args=(queue_path, worker_id, email, password, options, workers),
+                name=worker_id,
+            )
+            process.start()
+            return process
+
+        processes: list = []
+        slots = [start(i) for i in range(workers)]
+        processes.extend(slots)
+        restarts_left = workers * queue.max_attempts
+        last_report = time.monotonic()
+
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            for i, process in enumerate(slots):
+                if process.is_alive() or process.exitcode == 0:
+                    continue
+                if restarts_left == 0 or queue.remaining() == 0:
+                    continue
+                logger.warning(f"Worker {process.name} exited with {process.exitcode}; starting a replacement")
+                restarts_left -= 1
+                slots[i] = start(i)
+                processes.append(slots[i])
+            if not any(p.is_alive() for p in slots):
+                break
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                counts = queue.counts()
+                logger.info(
+                    f"Progress: {counts['done']} done, {counts['claimed']} in flight, "
+                    f"{counts['pending']} pending, {counts['failed']} failed"
+                )
+
+        for process in processes:
+            process.join()
+
+        elapsed = time.monotonic() - started
+        results = []
+        for course_url in course_urls:
+            counts = queue.counts(course_slug_from_url(course_url))
+            total = sum(counts.values())
+            result = CourseResult(
+                course_url=course_url,
+                stats=RunStats(total=total, saved=counts["done"], skipped=total - counts["done"], elapsed=elapsed),
+                elapsed=elapsed,
+            )
+            if counts["pending"] or counts["claimed"]:
+                result.error = f"{counts['pending'] + counts['claimed']} lesson(s) left unprocessed; run again to resume"
+            results.append(result)
+        logger.info(f"{workers} worker(s) finished in {elapsed:.1f}s")
+        return results
+    finally:
+        queue.close()
+        write_metrics(options)
@@ -0,0 +1,261 @@
+# src/sinks.py
+import gzip
+import io
+import json
+import logging
+import os
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Collection, Optional
+
+from src.converter import Section
+from src.database import SectionDatabase
+from src.defaults import DEFAULT_DB_PATH, SINKS
+from src.metrics import metrics
+from src.writer import sanitize_filename, write_csv
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LessonRecord:
+    course_slug: str
+    module: str
+    lesson_title: str
+    url: str
+    sections: list[Section]
+
+
+class Sink:
+    """
+    Destination for converted lessons.
+
+    `write_batch` must leave the whole batch durable before it returns and
+    gives back one output path per record. `shared` sinks keep many lessons
+    in one file, so their paths cannot be hashed per lesson. Only
+    `incremental` sinks keep earlier lessons when a run writes just the
+    changed ones.
+    """
+
+    shared = False
+    incremental = True
+
+    def write_batch(self, records: list[LessonRecord]) -> list[Path]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class CsvSink(Sink):
+    """
+    One CSV per lesson under output/<course-slug>/ (the original format).
+    A lesson whose title is already taken by another lesson of the course
+    gets its module, or failing that a hash of its URL, added to the name.
+    """
+
+    def __init__(self, output_dir: Path = Path("output")):
+        self.output_dir = output_dir
+        # Written path -> lesson URL, to tell a rewrite from a name collision
+        self._owners: dict[Path, str] = {}
+
+    def write_batch(self, records: list[LessonRecord]) -> list[Path]:
+        paths = []
+        for r in records:
+            with metrics.span("write_csv", lesson=r.url):
+                path = write_csv(
+                    r.course_slug, r.module, r.lesson_title, r.sections, self.output_dir, r.url, self._owners
+                )
+            paths.append(path)
+        return paths
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("The jsonl.zst sink needs the zstandard package (pip install zstandard)")
+    return zstandard
+
+
+def _open_zstd(path: Path, mode: str):
+    zstandard = _zstandard()
+    return io.TextIOWrapper(zstandard.open(path, mode.replace("t", "b")), encoding="utf-8")
+
+
+_CHUNK = 1 << 16
+
+
+def _recoverable_bytes(path: Path, compression: Optional[str]) -> bytes:
+    """Everything in `path` that still decompresses; a torn or corrupt tail is dropped."""
+    data = path.read_bytes()
+    if compression is None:
+        return data
+    out = []
+    if compression == "gz":
+        # One member per writer session; a crash leaves the last one without its trailer
+        while data:
+            member = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+            pos = 0
+            try:
+                while not member.eof and pos < len(data):
+                    out.append(member.decompress(data[pos : pos + _CHUNK]))
+                    pos += _CHUNK
+            except zlib.error:
+                break
+            if not member.eof:
+                break
+            data = member.unused_data + data[pos:]
+        return b"".join(out)
+
+    zstandard = _zstandard()
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+    try:
+        while chunk := reader.read(_CHUNK):
+            out.append(chunk)
+    except zstandard.ZstdError:
+        pass
+    return b"".join(out)
+
+
+class JsonlSink(Sink):
+    """
+    One JSON Lines file per course (output/<course-slug>.jsonl[.gz|.zst]),
+    one Section per line. With `append`, an existing file is extended
+    (used when resuming); otherwise it is replaced on first write.
+
+    Before appending, the existing file is rewritten from the rows that
+    survived: a torn line or compressed frame left by a crash is dropped,
+    and with `keep`, so are rows of lessons not in it (the ones the journal
+    does not record as written, which the resumed run writes again).
+    """
+
+    shared = True
+    # A fresh run replaces the whole file, so every lesson has to be written
+    incremental = False
+
+    def __init__(
+        self,
+        output_dir: Path = Path("output"),
+        compression: Optional[str] = None,
+        append: bool = False,
+        keep: Optional[Collection[str]] = None,
+    ):
+        self.output_dir = output_dir
+        self.compression = compression
+        self.append = append
+        self.keep = set(keep) if keep is not None else None
+        self._files: dict[str, tuple[Path, object]] = {}
+
+    def _open(self, path: Path, mode: str):
+        if self.compression == "gz":
+            return gzip.open(path, mode, encoding="utf-8")
+        if self.compression == "zst":
+            return _open_zstd(path, mode)
+        return open(path, mode, encoding="utf-8")
+
+    def _salvage(self, path: Path) -> None:
+        """Rewrite `path` with only its complete rows (of `keep` lessons), so appending is safe."""
+        rows = []
+        # Split on the row terminator only: str.splitlines would also break
+        # rows at U+2028, \x85 and the like, which json.dumps leaves raw
+        *lines, tail = _recoverable_bytes(path, self.compression).split(b"\n")
+        # `tail` is empty when the last row is complete, otherwise it is torn
+        for raw in lines:
+            line = raw.decode("utf-8", errors="replace")
+            try:
+                url = json.loads(line).get("url")
+            except (json.JSONDecodeError, AttributeError):
+                continue
+            if self.keep is None or url in self.keep:
+                rows.append(line + "\n")
+        tmp = path.with_name(path.name + ".tmp")
+        with self._open(tmp, "wt") as f:
+            f.write("".join(rows))
+        os.replace(tmp, path)
+
+    def _file(self, course_slug: str):
+        if course_slug not in self._files:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            suffix = ".jsonl" + (f".{self.compression}" if self.compression else "")
+            path = self.output_dir / (sanitize_filename(course_slug) + suffix)
+            append = self.append and path.exists()
+            if append:
+                self._salvage(path)
+            f = self._open(path, "at" if append else "wt")
+            self._files[course_slug] = (path, f)
+        return self._files[course_slug]
+
+    def write_batch(self, records: list[LessonRecord]) -> list[Path]:
+        paths = []
+        touched = {}
+        for r in records:
+            path, f = self._file(r.course_slug)
+            f.write(
+                "".join(
+                    json.dumps(
+                        {
+                            "course": r.course_slug,
+                            "module": r.module,
+                            "lesson_title": r.lesson_title,
+                            "url": r.url,
+                            "position": i,
+                            "section": s.heading,
+                            "content": s.content,
+                        },
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                    for i, s in enumerate(r.sections)
+                )
+            )
+            touched[r.course_slug] = f
+            paths.append(path)
+        for f in touched.values():
+            f.flush()
+        return paths
+
+    def close(self) -> None:
+        for _, f in self._files.values():
+            f.close()
+        self._files = {}
+
+
+class SqliteSink(Sink):
+    """Every lesson in one SectionDatabase; each batch is one transaction."""
+
+    shared = True
+
+    def __init__(self, database: SectionDatabase):
+        self.database = database
+
+    def write_batch(self, records: list[LessonRecord]) -> list[Path]:
+        for r in records:
+            self.database.write_lesson(r.course_slug, r.module, r.lesson_title, r.sections, url=r.url)
+        self.database.commit()
+        return [self.database.path] * len(records)
+
+    def close(self) -> None:
+        self.database.close()
+
+
+def make_sink(
+    name: str,
+    output_dir: Path = Path("output"),
+    db_path: Path = DEFAULT_DB_PATH,
+    append: bool = False,
+    keep: Optional[Collection[str]] = None,
+) -> Sink:
+    """Build a sink from its CLI name (one of SINKS); `append` and `keep` are passed to JsonlSink."""
+    if name == "csv":
+        return CsvSink(output_dir)
+    if name == "jsonl":
+        return JsonlSink(output_dir, append=append, keep=keep)
+    if name == "jsonl.gz":
+        return JsonlSink(output_dir, compression="gz", append=append, keep=keep)
+    if name == "jsonl.zst":
+        return JsonlSink(output_dir, compression="zst", append=append, keep=keep)
+    if name == "sqlite":
+        return SqliteSink(SectionDatabase(db_path))
+    raise ValueError(f"Unknown sink {name!r}; expected one of {', '.join(SINKS)}")
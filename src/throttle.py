@@ -0,0 +1,229 @@
+# src/throttle.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+
+from src.metrics import metrics
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Response
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Global request-rate limit shared by every worker.
+
+    Each call to `acquire()` reserves the next free slot, so no more than
+    `rate` acquisitions complete per second regardless of how many workers
+    are waiting. A rate of 0 (or less) disables limiting.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate if self.rate > 0 else 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Start no new slot for `seconds` (e.g. a server's Retry-After)."""
+        self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with jitter: half of base * 2**attempt (capped) plus a random other half."""
+    delay = min(cap, base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_after_seconds(headers: dict) -> Optional[float]:
+    """Retry-After in seconds, if the header is present in its delay-seconds form."""
+    value = headers.get("retry-after")
+    return float(value) if isinstance(value, str) and value.isdigit() else None
+
+
+class AdaptiveLimit:
+    """Semaphore-like cap on concurrent work whose `limit` can change while in use.
+
+    Lowering the limit never interrupts holders; new acquisitions simply
+    wait until enough of them have released.
+    """
+
+    def __init__(self, limit: int):
+        self._limit = max(1, limit)
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @limit.setter
+    def limit(self, value: int) -> None:
+        self._limit = max(1, value)
+        self._wake()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    async def acquire(self) -> None:
+        if self._active < self._limit and not self._waiters:
+            self._active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as we were cancelled: give it back
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._active < self._limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._active += 1
+                waiter.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class AdaptiveController:
+    """AIMD feedback on a RateLimiter and an AdaptiveLimit.
+
+    Every `increase_after` successful responses, the rate grows by
+    `rate_step` and the concurrency limit by one. A 429, a 5xx or a response
+    slower than `target_latency` seconds multiplies both by `backoff`,
+    at most once per `cooldown` seconds so a burst of errors counts as one
+    signal. A 429 with Retry-After also pauses the limiter for that long.
+    Both stay within their configured minimum and maximum.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        slots: AdaptiveLimit,
+        min_rate: float,
+        max_rate: float,
+        min_concurrency: int = 1,
+        max_concurrency: int = 8,
+        target_latency: float = 5.0,
+        rate_step: float = 0.25,
+        backoff: float = 0.5,
+        increase_after: int = 10,
+        cooldown: float = 5.0,
+        base_url: str = "",
+    ):
+        self.limiter = limiter
+        self.slots = slots
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.target_latency = target_latency
+        self.rate_step = rate_step
+        self.backoff = backoff
+        self.increase_after = increase_after
+        self.cooldown = cooldown
+        self.base_url = base_url
+        self.increases = 0
+        self.decreases = 0
+        self._successes = 0
+        self._last_decrease = float("-inf")
+        limiter.rate = min(max(limiter.rate if limiter.rate > 0 else max_rate, min_rate), max_rate)
+        slots.limit = min(max(slots.limit, self.min_concurrency), self.max_concurrency)
+
+    def observe(self, status: int, latency: Optional[float] = None, retry_after: Optional[float] = None) -> None:
+        """Feed one response's HTTP status and time to first byte (seconds)."""
+        if status == 429 or status >= 500:
+            if status == 429 and retry_after:
+                self.limiter.pause(retry_after)
+            self._decrease(f"HTTP {status}")
+        elif latency is not None and latency > self.target_latency:
+            self._decrease(f"{latency:.1f}s response")
+        elif 200 <= status < 400:
+            self._successes += 1
+            if self._successes >= self.increase_after:
+                self._successes = 0
+                self._increase()
+
+    def watch(self, context: BrowserContext) -> None:
+        """Observe the page and API responses under `base_url` of every page in `context`."""
+        context.on("response", self._on_page_response)
+
+    def _on_page_response(self, response: Response) -> None:
+        if not response.url.startswith(self.base_url):
+            return
+        if response.request.resource_type not in ("document", "xhr", "fetch"):
+            return
+        try:
+            first_byte = response.request.timing.get("responseStart", -1)
+        except Exception:
+            first_byte = -1
+        self.observe(
+            response.status,
+            first_byte / 1000 if first_byte > 0 else None,
+            retry_after_seconds(response.headers),
+        )
+
+    def _increase(self) -> None:
+        rate = min(self.max_rate, self.limiter.rate + self.rate_step)
+        concurrency = min(self.max_concurrency, self.slots.limit + 1)
+        if rate == self.limiter.rate and concurrency == self.slots.limit:
+            return
+        self.limiter.rate = rate
+        self.slots.limit = concurrency
+        self.increases += 1
+        metrics.incr("throttle_increases")
+        logger.info(f"Adaptive throttle: up to {self.state()}")
+
+    def _decrease(self, reason: str) -> None:
+        self._successes = 0
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limiter.rate = max(self.min_rate, self.limiter.rate * self.backoff)
+        self.slots.limit = max(self.min_concurrency, int(self.slots.limit * self.backoff))
+        self.decreases += 1
+        metrics.incr("throttle_decreases")
+        logger.warning(f"Adaptive throttle: {reason}, backing off to {self.state()}")
+
+    def state(self) -> str:
+        return f"{self.limiter.rate:.2f} lessons/s, concurrency {self.slots.limit}"
+
+    def summary(self) -> str:
+        return (
+            f"Adaptive throttle finished at {self.state()} "
+            f"({self.increases} increase(s), {self.decreases} back-off(s))"
+        )
@@ -0,0 +1,151 @@
+# src/workqueue.py
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.navigator import ReadingLesson
+
+DEFAULT_QUEUE_PATH = Path("output") / ".queue.sqlite3"
+
+
+@dataclass
+class Job:
+    id: int
+    course_slug: str
+    module: str
+    lesson_title: str
+    url: str
+    attempts: int
+
+    @property
+    def lesson(self) -> ReadingLesson:
+        return ReadingLesson(module=self.module, lesson_title=self.lesson_title, url=self.url)
+
+
+class WorkQueue:
+    """
+    SQLite-backed lesson queue shared by worker processes on one machine.
+
+    A claimed job carries a lease; if its worker crashes and the lease runs
+    out, the job becomes claimable again. Jobs are given up after
+    `max_attempts` claims.
+    """
+
+    def __init__(self, path: Path = DEFAULT_QUEUE_PATH, max_attempts: int = 3):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                course_slug TEXT NOT NULL,
+                module TEXT NOT NULL,
+                lesson_title TEXT NOT NULL,
+                url TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                output TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until);
+            """
+        )
+
+    def enqueue(self, course_slug: str, lessons: list[ReadingLesson]) -> int:
+        """Add lessons not queued yet. Returns how many were new."""
+        before = self._conn.total_changes
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (course_slug, module, lesson_title, url) VALUES (?, ?, ?, ?)",
+                [(course_slug, l.module, l.lesson_title, l.url) for l in lessons],
+            )
+        return self._conn.total_changes - before
+
+    def claim(self, worker: str, lease_seconds: float = 300.0) -> Optional[Job]:
+        """Atomically take the next pending job, or one whose lease has expired."""
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                """
+                SELECT id, course_slug, module, lesson_title, url, attempts FROM jobs
+                WHERE (status = 'pending' OR (status = 'claimed' AND lease_until < ?))
+                  AND attempts < ?
+                ORDER BY id LIMIT 1
+                """,
+                (now, self.max_attempts),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'claimed', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (worker, now + lease_seconds, row[0]),
+            )
+        job = Job(*row)
+        job.attempts += 1
+        return job
+
+    def complete(self, job: Job, worker: str, output: str) -> None:
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', output = ?, lease_until = NULL, error = NULL "
+                "WHERE id = ? AND worker = ?",
+                (output, job.id, worker),
+            )
+
+    def fail(self, job: Job, worker: str, error: str) -> None:
+        """Release a job for another attempt, or mark it failed once attempts run out."""
+        status = "pending" if job.attempts < self.max_attempts else "failed"
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_until = NULL WHERE id = ? AND worker = ?",
+                (status, error, job.id, worker),
+            )
+
+    def counts(self, course_slug: Optional[str] = None) -> dict[str, int]:
+        """Jobs per status; claimed jobs whose lease expired without retries left count as failed."""
+        counts = {"pending": 0, "claimed": 0, "done": 0, "failed": 0}
+        query = "SELECT status, lease_until < ?, attempts >= ?, COUNT(*) FROM jobs"
+        params: tuple = (time.time(), self.max_attempts)
+        if course_slug is not None:
+            query += " WHERE course_slug = ?"
+            params += (course_slug,)
+        for status, lease_until, attempts, n in self._conn.execute(query + " GROUP BY 1, 2, 3", params):
+            if status == "claimed" and lease_until and attempts:
+                status = "failed"
+            counts[status] = counts.get(status, 0) + n
+        return counts
+
+    def remaining(self) -> int:
+        counts = self.counts()
+        return counts["pending"] + counts["claimed"]
+
+    def clear(self) -> None:
+        with self._transaction():
+            self._conn.execute("DELETE FROM jobs")
+
+    def _transaction(self):
+        return _Immediate(self._conn)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class _Immediate:
+    """BEGIN IMMEDIATE ... COMMIT, so claims from several processes never interleave."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
@@ -1,7 +1,9 @@
 # src/writer.py
 import csv
+import hashlib
 import re
 from pathlib import Path
+from typing import Optional
 from src.converter import Section
 
 
@@ -11,16 +13,59 @@ def sanitize_filename(name: str) -> str:
     return result or "unnamed"
 
 
+def _csv_module(path: Path) -> Optional[str]:
+    """The module column of an existing lesson CSV, or None if there is none."""
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            row = next(csv.DictReader(f), None)
+    except OSError:
+        return None
+    return row.get("module") if row is not None else None
+
+
+def lesson_csv_path(
+    course_dir: Path,
+    module: str,
+    lesson_title: str,
+    owner: str,
+    owners: dict[Path, str],
+) -> Path:
+    """
+    <title>.csv, unless another lesson already has that file: then
+    <title>_<module>.csv, and failing that a name with a hash of `owner`
+    (the lesson's URL). `owners` maps the paths handed out so far to their
+    owner; a file left by an earlier run belongs to another lesson when its
+    module differs.
+    """
+    names = [lesson_title, f"{lesson_title} {module}"]
+    for name in names:
+        path = course_dir / (sanitize_filename(name) + ".csv")
+        taken_by = owners.get(path)
+        if taken_by == owner or (taken_by is None and _csv_module(path) in (None, module)):
+            owners[path] = owner
+            return path
+    digest = hashlib.sha1(owner.encode("utf-8")).hexdigest()[:8]
+    path = course_dir / (sanitize_filename(f"{lesson_title} {digest}") + ".csv")
+    owners[path] = owner
+    return path
+
+
 def write_csv(
     course_slug: str,
     module: str,
     lesson_title: str,
     sections: list[Section],
     output_dir: Path = Path("output"),
+    owner: Optional[str] = None,
+    owners: Optional[dict[Path, str]] = None,
 ) -> Path:
     course_dir = output_dir / sanitize_filename(course_slug)
     course_dir.mkdir(parents=True, exist_ok=True)
-    filepath = course_dir / (sanitize_filename(lesson_title) + ".csv")
+    if owners is None or owner is None:
+        filepath = course_dir / (sanitize_filename(lesson_title) + ".csv")
+    else:
+        # Titles repeat ("Summary", "Readings"); the first lesson written keeps the plain name
+        filepath = lesson_csv_path(course_dir, module, lesson_title, owner, owners)
 
     with open(filepath, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(
@@ -0,0 +1,69 @@
+# tests/test_archive.py
+import json
+from pathlib import Path
+from src.archive import HtmlArchive, load_archived
+from src.converter import html_to_sections
+from src.manifest import Manifest, html_sha256
+from src.navigator import ReadingLesson
+from src.reconvert import reconvert
+
+
+def lesson(n: int) -> ReadingLesson:
+    return ReadingLesson(module="Week 1", lesson_title=f"Lesson {n}", url=f"https://x/{n}")
+
+
+def html(n: int) -> str:
+    return f"<h2>Part {n}</h2><p>Body {n}</p>"
+
+
+def test_put_keeps_html_with_metadata(tmp_path):
+    archive = HtmlArchive(tmp_path)
+    path = archive.put("my-course", lesson(1), 1, html(1))
+    entry = load_archived(path)
+    assert (entry.course_slug, entry.lesson, entry.position) == ("my-course", lesson(1), 1)
+    assert entry.html == html(1) and entry.html_sha256 == html_sha256(html(1))
+
+    # Fetching again replaces the entry rather than adding one
+    archive.put("my-course", lesson(1), 1, "<p>new</p>")
+    assert archive.entries() == [path]
+    assert load_archived(path).html == "<p>new</p>"
+
+
+def test_entries_by_course(tmp_path):
+    archive = HtmlArchive(tmp_path)
+    archive.put("a", lesson(1), 1, html(1))
+    archive.put("b", lesson(2), 1, html(2))
+    assert archive.courses() == ["a", "b"]
+    assert len(archive.entries()) == 2
+    assert [load_archived(p).lesson_title for p in archive.entries("b")] == ["Lesson 2"]
+    assert HtmlArchive(tmp_path / "missing").entries() == []
+
+
+def test_reconvert_writes_lessons_in_discovery_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    archive = HtmlArchive(tmp_path / "archive")
+    for n in range(1, 8):
+        archive.put("slug", lesson(n), n, html(n))
+
+    stats = reconvert(archive, sink="jsonl", output_dir=tmp_path / "out", workers=2)
+
+    assert (stats.saved, stats.failed) == (7, 0)
+    rows = [json.loads(line) for line in (tmp_path / "out" / "slug.jsonl").read_text().splitlines()]
+    assert [r["lesson_title"] for r in rows] == [f"Lesson {n}" for n in range(1, 8)]
+
+
+def test_reconvert_updates_manifest(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    archive = HtmlArchive(tmp_path / "archive")
+    archive.put("slug", lesson(1), 1, html(1))
+    archive.put("slug", lesson(2), 2, "<h2>Broken")
+
+    stats = reconvert(archive, output_dir=tmp_path / "out", workers=1)
+
+    assert stats.saved == 2
+    out = tmp_path / "out" / "slug" / "Lesson_1.csv"
+    assert out.exists()
+    assert html_to_sections(html(1), "Lesson 1")[0].content in out.read_text()
+    manifest = Manifest("slug", manifest_dir=Path("output") / ".manifest")
+    assert manifest.is_unchanged(lesson(1).url, html_sha256(html(1)))
+    manifest.close()
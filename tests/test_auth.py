@@ -22,3 +22,83 @@ async def test_login_fills_credentials():
     mock_page.fill.assert_any_call('[name="email"]', "user@test.com")
     mock_page.fill.assert_any_call('[name="password"]', "pass123")
     assert result == (mock_playwright, mock_browser, mock_context)
+
+
+def mock_playwright_with(context):
+    browser = AsyncMock()
+    browser.new_context.return_value = context
+    playwright = AsyncMock()
+    playwright.chromium.launch.return_value = browser
+    return playwright, browser
+
+
+def session_response(status, elements):
+    response = AsyncMock()
+    response.status = status
+    response.ok = status < 400
+    response.json.return_value = {"elements": elements}
+    return response
+
+
+@pytest.mark.asyncio
+async def test_login_loads_full_storage_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "session.json").write_text('{"cookies": [], "origins": []}')
+    context = AsyncMock()
+    context.request.get.return_value = session_response(200, [{"id": "1"}])
+    playwright, browser = mock_playwright_with(context)
+
+    with patch("src.auth.async_playwright") as mock_ap:
+        mock_ap.return_value.start = AsyncMock(return_value=playwright)
+        from src.auth import login
+        await login("user@test.com", "pass123")
+
+    assert browser.new_context.call_args.kwargs["storage_state"] == "session.json"
+    context.request.get.assert_awaited_once()
+    context.new_page.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_expired_session_falls_back_to_the_login_form(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "session.json").write_text('{"cookies": [], "origins": []}')
+    page = AsyncMock()
+    context = AsyncMock()
+    context.new_page.return_value = page
+    context.request.get.return_value = session_response(401, [])
+    playwright, _ = mock_playwright_with(context)
+
+    with patch("src.auth.async_playwright") as mock_ap:
+        mock_ap.return_value.start = AsyncMock(return_value=playwright)
+        from src.auth import login
+        await login("user@test.com", "pass123")
+
+    context.clear_cookies.assert_awaited_once()
+    page.fill.assert_any_call('[name="password"]', "pass123")
+    context.storage_state.assert_awaited_once_with(path="session.json")
+
+
+@pytest.mark.asyncio
+async def test_open_browser_connects_to_endpoints():
+    from src.auth import open_browser
+    playwright = AsyncMock()
+
+    await open_browser(playwright, endpoint="ws://localhost:3000/abc")
+    playwright.chromium.connect.assert_awaited_once_with("ws://localhost:3000/abc")
+    await open_browser(playwright, endpoint="http://localhost:9222")
+    playwright.chromium.connect_over_cdp.assert_awaited_once_with("http://localhost:9222")
+    playwright.chromium.launch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_browser_start_stops_playwright():
+    playwright = AsyncMock()
+    playwright.chromium.connect_over_cdp.side_effect = ConnectionRefusedError("CDP refused")
+
+    with patch("src.auth.async_playwright") as mock_ap:
+        mock_ap.return_value.start = AsyncMock(return_value=playwright)
+        from src.auth import login
+        with pytest.raises(ConnectionRefusedError):
+            await login("user@test.com", "pass123", browser_endpoint="http://localhost:9222")
+
+    playwright.stop.assert_awaited_once()
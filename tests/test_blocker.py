@@ -0,0 +1,47 @@
+# tests/test_blocker.py
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.blocker import ResourceBlocker
+
+
+def make_route(url, resource_type):
+    route = MagicMock()
+    route.request.url = url
+    route.request.resource_type = resource_type
+    route.abort = AsyncMock()
+    route.fallback = AsyncMock()
+    return route
+
+
+def test_blocks_images_fonts_and_media():
+    blocker = ResourceBlocker()
+    assert blocker.should_block("https://cdn.example.com/a.png", "image")
+    assert blocker.should_block("https://cdn.example.com/a.woff2", "font")
+    assert blocker.should_block("https://cdn.example.com/a.mp4", "media")
+
+
+def test_blocks_telemetry_scripts():
+    blocker = ResourceBlocker()
+    assert blocker.should_block("https://www.google-analytics.com/analytics.js", "script")
+    assert not blocker.should_block("https://www.coursera.org/static/app.js", "script")
+
+
+def test_allowlist_wins_over_blocked_type():
+    blocker = ResourceBlocker()
+    assert not blocker.should_block("https://www.coursera.org/api/onDemandSupplements.v1/x", "fetch")
+    assert not blocker.should_block("https://www.coursera.org/learn/x", "document")
+
+
+@pytest.mark.asyncio
+async def test_handle_updates_counters():
+    blocker = ResourceBlocker()
+    blocked = make_route("https://cdn.example.com/a.png", "image")
+    allowed = make_route("https://www.coursera.org/learn/x", "document")
+    await blocker.handle(blocked)
+    await blocker.handle(allowed)
+
+    blocked.abort.assert_awaited_once()
+    allowed.fallback.assert_awaited_once()
+    assert blocker.stats.blocked == 1
+    assert blocker.stats.allowed == 1
+    assert blocker.stats.bytes_saved > 0
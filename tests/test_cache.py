@@ -0,0 +1,45 @@
+# tests/test_cache.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import HtmlCache
+
+
+def test_put_then_get(tmp_path):
+    cache = HtmlCache(tmp_path / "c.sqlite3")
+    cache.put("https://x/1", "<p>One</p>")
+    assert cache.get("https://x/1") == "<p>One</p>"
+    assert cache.get("https://x/2") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_persists_across_instances(tmp_path):
+    HtmlCache(tmp_path / "c.sqlite3").put("https://x/1", "<p>One</p>")
+    assert HtmlCache(tmp_path / "c.sqlite3").get("https://x/1") == "<p>One</p>"
+
+
+def test_expired_entry_is_a_miss(tmp_path):
+    cache = HtmlCache(tmp_path / "c.sqlite3", ttl=0.01)
+    cache.put("https://x/1", "<p>One</p>")
+    time.sleep(0.02)
+    assert cache.get("https://x/1") is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = HtmlCache(tmp_path / "c.sqlite3", max_bytes=25)
+    cache.put("https://x/1", "a" * 10)
+    cache.put("https://x/2", "b" * 10)
+    cache.get("https://x/1")
+    cache.put("https://x/3", "c" * 10)
+    assert cache.get("https://x/2") is None
+    assert cache.get("https://x/1") == "a" * 10
+    assert cache.get("https://x/3") == "c" * 10
+
+
+def test_usable_from_executor_threads(tmp_path):
+    cache = HtmlCache(tmp_path / "c.sqlite3")
+    urls = [f"https://x/{i}" for i in range(50)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda url: cache.put(url, url), urls))
+        assert list(pool.map(cache.get, urls)) == urls
+    assert cache.hits == 50
@@ -0,0 +1,44 @@
+# tests/test_cli.py
+import pytest
+import main
+from benchmarks.bench_startup import CASES, heavy_modules
+from src.converter import Section
+from src.database import SectionDatabase
+
+
+def test_split_command():
+    assert main.split_command(["export", "--course", "x"]) == ("export", ["--course", "x"])
+    assert main.split_command(["reconvert"]) == ("convert", [])
+    # Without a command name the arguments are a scrape, as before subcommands existed
+    assert main.split_command(["https://www.coursera.org/learn/x"]) == ("scrape", ["https://www.coursera.org/learn/x"])
+    assert main.split_command(["--batch", "courses.txt"]) == ("scrape", ["--batch", "courses.txt"])
+
+
+@pytest.mark.parametrize("args", [args for _, args, browser_free in CASES if browser_free])
+def test_browser_free_commands_skip_heavy_imports(args):
+    assert heavy_modules(args) == []
+
+
+def test_export_writes_csv(tmp_path):
+    db = SectionDatabase(tmp_path / "r.sqlite3")
+    db.write_lesson("course", "Week 1", "Prompting", [Section(heading="Intro", content="Zero-shot")])
+    db.commit()
+    db.close()
+
+    main.export(["--db", str(tmp_path / "r.sqlite3"), "--output", str(tmp_path / "out")])
+    assert (tmp_path / "out" / "course" / "Prompting.csv").exists()
+
+
+def test_search_prints_hits(tmp_path, capsys):
+    db = SectionDatabase(tmp_path / "r.sqlite3")
+    db.write_lesson("course", "Week 1", "Prompting", [Section(heading="Intro", content="Zero-shot")])
+    db.commit()
+    db.close()
+
+    main.main(["search", "zero", "--db", str(tmp_path / "r.sqlite3")])
+    assert "course / Week 1 / Prompting / Intro" in capsys.readouterr().out
+
+
+def test_scrape_args_still_validated():
+    with pytest.raises(SystemExit):
+        main.parse_args([])
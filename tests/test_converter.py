@@ -1,4 +1,5 @@
 # tests/test_converter.py
+from markdownify import markdownify as md
 from src.converter import html_to_sections, Section
 
 def test_single_section_no_headings():
@@ -25,3 +26,27 @@ def test_empty_html_returns_one_empty_section():
     sections = html_to_sections("", lesson_title="Empty")
     assert len(sections) == 1
     assert sections[0].heading == "Empty"
+
+def test_matches_markdownify_of_each_section():
+    html = (
+        "<p>Lead <em>in</em></p><ul><li>One</li><li>Two</li></ul>"
+        "<h2>Code</h2><pre><code>x = 1\n</code></pre><table><tr><th>A</th></tr><tr><td>1</td></tr></table>"
+    )
+    sections = html_to_sections(html, lesson_title="Lesson")
+    assert sections[0].content == md("<p>Lead <em>in</em></p><ul><li>One</li><li>Two</li></ul>", heading_style="ATX").strip()
+    assert sections[1].content == md(
+        "<pre><code>x = 1\n</code></pre><table><tr><th>A</th></tr><tr><td>1</td></tr></table>", heading_style="ATX"
+    ).strip()
+
+def test_lxml_parser_gives_same_sections():
+    html = "<p>Before</p><h2>Part A</h2><p>After <strong>A</strong></p><h3>Part B</h3><p>After B</p>"
+    assert html_to_sections(html, "Lesson", parser="lxml") == html_to_sections(html, "Lesson")
+
+def test_comments_are_dropped():
+    sections = html_to_sections("<p>a</p><!-- note --><h2>X</h2><p>b</p>", lesson_title="T")
+    assert [s.content for s in sections] == ["a", "b"]
+
+def test_lxml_drops_style_and_head_text():
+    html = "<head><title>Title</title></head><style>p{color:red}</style><p>a</p>"
+    assert html_to_sections(html, "T")[0].content == "Titlep{color:red}a"
+    assert html_to_sections(html, "T", parser="lxml")[0].content == "a"
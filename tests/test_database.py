@@ -0,0 +1,39 @@
+# tests/test_database.py
+import csv
+
+from src.converter import Section
+from src.database import SectionDatabase
+
+
+def test_write_and_search(tmp_path):
+    db = SectionDatabase(tmp_path / "r.sqlite3")
+    db.write_lesson("course", "Week 1", "Prompting", [
+        Section(heading="Intro", content="Zero-shot prompting asks directly"),
+        Section(heading="Chains", content="Chain of thought reasoning"),
+    ])
+    db.commit()
+
+    hits = db.search("chain")
+    assert len(hits) == 1
+    assert hits[0].lesson_title == "Prompting"
+    assert hits[0].section == "Chains"
+
+
+def test_rewriting_a_lesson_replaces_its_sections(tmp_path):
+    db = SectionDatabase(tmp_path / "r.sqlite3")
+    db.write_lesson("course", "Week 1", "L", [Section(heading="A", content="old text")])
+    db.write_lesson("course", "Week 1", "L", [Section(heading="A", content="new text")])
+    db.commit()
+
+    assert db.search("old") == []
+    assert [s.content for _, _, _, s_list in db.lessons() for s in s_list] == ["new text"]
+
+
+def test_export_csv(tmp_path):
+    db = SectionDatabase(tmp_path / "r.sqlite3")
+    db.write_lesson("course", "Week 1", "My Lesson", [Section(heading="S1", content="C1")])
+    paths = db.export_csv(tmp_path / "out")
+    rows = list(csv.DictReader(paths[0].open(encoding="utf-8")))
+    assert paths[0].name == "My_Lesson.csv"
+    assert rows[0]["section"] == "S1"
+    assert rows[0]["content"] == "C1"
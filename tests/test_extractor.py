@@ -1,5 +1,16 @@
 # tests/test_extractor.py
-from src.extractor import extract_html_from_response
+import asyncio
+import json
+import time
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.extractor import (
+    extract_html_from_response,
+    extract_reading_content,
+    fetch_reading_direct,
+    parse_lesson_url,
+)
 
 
 def test_extracts_html_from_ondemand_response():
@@ -62,3 +73,198 @@ def test_extracts_html_from_linked_assets():
     }
     result = extract_html_from_response(fake_json)
     assert result == "<p>Reading content here</p>"
+
+
+def test_prefers_the_asset_of_the_lesson_item():
+    def asset(item, text):
+        return {"itemId": item, "definition": {"renderableHtmlWithMetadata": {"renderableHtml": text}}}
+
+    data = {
+        "elements": [{"id": "course~A"}, {"id": "course~B"}],
+        "linked": {"openCourseAssets.v1": [asset("A", "<p>A</p>"), asset("B", "<p>B</p>")]},
+    }
+    assert extract_html_from_response(data, "B") == "<p>B</p>"
+    assert extract_html_from_response(data) == "<p>A</p>"
+    # A response that only covers other items has nothing for this lesson
+    assert extract_html_from_response({"elements": [{"id": "course~A"}], "linked": data["linked"]}, "B") is None
+
+
+def test_parse_lesson_url():
+    url = "https://www.coursera.org/learn/prompt-engineering/supplement/abc123/intro"
+    assert parse_lesson_url(url) == ("prompt-engineering", "abc123")
+    assert parse_lesson_url("https://www.coursera.org/learn/x/lecture/def456/video") is None
+
+
+def make_response(status, payload):
+    response = MagicMock(ok=200 <= status < 300, status=status)
+    response.json = AsyncMock(return_value=payload)
+    response.body = AsyncMock(return_value=json.dumps(payload).encode())
+    return response
+
+
+@pytest.mark.asyncio
+async def test_direct_fetch_uses_supplements_api():
+    context = MagicMock()
+    context.request.get = AsyncMock(side_effect=[
+        make_response(200, {"elements": [{"id": "COURSE1"}]}),
+        make_response(200, {"linked": {"openCourseAssets.v1": [
+            {"definition": {"renderableHtmlWithMetadata": {"renderableHtml": "<p>Direct</p>"}}}
+        ]}}),
+    ])
+    url = "https://www.coursera.org/learn/direct-slug/supplement/item1/intro"
+    html = await extract_reading_content(context, url)
+    assert html == "<p>Direct</p>"
+    assert "COURSE1~item1" in context.request.get.call_args_list[1].args[0]
+    context.new_page.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_direct_fetch_failure_returns_none():
+    context = MagicMock()
+    context.request.get = AsyncMock(return_value=make_response(401, {}))
+    url = "https://www.coursera.org/learn/denied-slug/supplement/item1/intro"
+    assert await fetch_reading_direct(context, url) is None
+
+
+class FakePage:
+    """Page that emits one API response and then never goes idle."""
+
+    def __init__(self, payload, delay=0.01):
+        self.payload = payload
+        self.delay = delay
+        self.handlers = []
+        self.closed = False
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.handlers.remove(handler)
+
+    async def goto(self, url, **kwargs):
+        await asyncio.sleep(self.delay)
+        response = MagicMock(
+            url="https://www.coursera.org/api/onDemandSupplements.v1/x",
+            status=200,
+            headers={"content-type": "application/json"},
+        )
+        response.json = AsyncMock(return_value=self.payload)
+        response.body = AsyncMock(return_value=json.dumps(self.payload).encode())
+        for handler in self.handlers:
+            asyncio.ensure_future(handler(response))
+        await asyncio.sleep(60)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_page_extraction_returns_on_first_matching_response():
+    page = FakePage({"elements": [{"definition": {"value": {"html": "<p>Fast</p>"}}}]})
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=page)
+
+    started = time.monotonic()
+    html = await extract_reading_content(context, "https://x/lesson", direct=False)
+    assert html == "<p>Fast</p>"
+    assert time.monotonic() - started < 1
+    assert page.closed
+
+
+@pytest.mark.asyncio
+async def test_page_extraction_times_out_without_content():
+    page = FakePage({"elements": []})
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=page)
+
+    html = await extract_reading_content(context, "https://x/lesson", timeout=0.1, retry=0, direct=False)
+    assert html is None
+    assert page.closed
+
+
+class StatusPage(FakePage):
+    """Page whose reading API answers with a fixed status."""
+
+    def __init__(self, status, payload):
+        super().__init__(payload)
+        self.status = status
+        self.visits = 0
+
+    async def goto(self, url, **kwargs):
+        self.visits += 1
+        response = MagicMock(
+            url="https://www.coursera.org/api/onDemandSupplements.v1/x",
+            status=self.status,
+            headers={"content-type": "application/json"},
+        )
+        response.body = AsyncMock(return_value=json.dumps(self.payload).encode())
+        for handler in self.handlers:
+            asyncio.ensure_future(handler(response))
+        await asyncio.sleep(60)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status, payload", [(401, {}), (200, {"elements": []})])
+async def test_auth_and_empty_readings_are_not_retried(status, payload):
+    page = StatusPage(status, payload)
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=page)
+
+    html = await extract_reading_content(context, "https://x/lesson", timeout=0.1, retry=3, direct=False)
+    assert html is None
+    assert page.visits == 1
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_retried_with_backoff():
+    page = FakePage({"elements": []}, delay=60)
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=page)
+
+    started = time.monotonic()
+    html = await extract_reading_content(
+        context, "https://x/lesson", timeout=0.05, retry=2, direct=False, backoff=0.1
+    )
+    assert html is None
+    assert context.new_page.await_count == 3
+    # Two retries: 0.05-0.1s then 0.1-0.2s of backoff on top of three 0.05s attempts
+    assert time.monotonic() - started >= 0.3
+
+
+class ScriptedPage(FakePage):
+    """Page that emits the given (url, content type, payload) responses in order."""
+
+    def __init__(self, responses):
+        super().__init__(None)
+        self.responses = []
+        for url, content_type, payload in responses:
+            response = MagicMock(url=url, status=200, headers={"content-type": content_type})
+            response.body = AsyncMock(return_value=json.dumps(payload).encode())
+            self.responses.append(response)
+
+    async def goto(self, url, **kwargs):
+        for response in self.responses:
+            for handler in list(self.handlers):
+                await handler(response)
+        await asyncio.sleep(60)
+
+
+@pytest.mark.asyncio
+async def test_page_capture_reads_only_the_lesson_items_json():
+    api = "https://www.coursera.org/api/"
+    reading = {"elements": [{"definition": {"value": {"html": "<p>Mine</p>"}}}]}
+    page = ScriptedPage([
+        (api + "onDemandLectureAssets.v1/course~video1?fields=x", "application/json", {"big": "payload"}),
+        (api + "onDemandSupplements.v1/course~other", "application/json", reading),
+        (api + "onDemandSupplements.v1/course~mine", "text/html", reading),
+        (api + "onDemandSupplements.v1/course~mine?includes=asset", "application/json", reading),
+        (api + "onDemandSupplements.v1/course~mine?includes=asset", "application/json", reading),
+    ])
+    context = MagicMock()
+    context.new_page = AsyncMock(return_value=page)
+
+    url = "https://www.coursera.org/learn/slug/supplement/mine/intro"
+    assert await extract_reading_content(context, url, direct=False) == "<p>Mine</p>"
+    assert [r.body.await_count for r in page.responses] == [0, 0, 0, 1, 0]
+    # The listener is gone once the reading is captured
+    assert page.handlers == []
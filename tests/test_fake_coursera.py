@@ -0,0 +1,41 @@
+# tests/test_fake_coursera.py
+import json
+import urllib.request
+import pytest
+from benchmarks.fake_coursera import FakeCourse, base_url, start_server
+from src.extractor import extract_html_from_response
+from src.navigator import parse_course_materials, parse_module_page
+
+
+@pytest.fixture
+def server():
+    server = start_server(FakeCourse(modules=2, readings_per_module=3, sections=2, latency=0))
+    yield base_url(server)
+    server.shutdown()
+
+
+def get(url: str) -> str:
+    with urllib.request.urlopen(url) as response:
+        return response.read().decode("utf-8")
+
+
+def test_api_and_pages_agree(server):
+    """The fake must stay parseable by the real scraper code, or the benchmark measures nothing."""
+    materials = json.loads(get(f"{server}/api/onDemandCourseMaterials.v2/?q=slug&slug=demo"))
+    from_api = parse_course_materials(materials, "demo", base_url=server)
+    assert len(from_api) == 6
+
+    from_pages = []
+    for module in (1, 2):
+        _, readings = parse_module_page(get(f"{server}/learn/demo/home/module/{module}"), base_url=server)
+        from_pages += readings
+    assert [(r.module, r.lesson_title, r.url) for r in from_pages] == [
+        (r.module, r.lesson_title, r.url) for r in from_api
+    ]
+
+
+def test_supplement_carries_reading_html(server):
+    data = json.loads(get(f"{server}/api/onDemandSupplements.v1/course-demo~m0r1?includes=asset"))
+    html = extract_html_from_response(data)
+    assert "m0r1" in html and "<h2>Section 1</h2>" in html
+    assert "onDemandSupplements.v1/course-demo~m0r1" in get(f"{server}/learn/demo/supplement/m0r1/reading-2")
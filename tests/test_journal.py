@@ -0,0 +1,99 @@
+# tests/test_journal.py
+import pytest
+from src.journal import Journal
+from src.navigator import ReadingLesson
+
+LESSONS = [
+    ReadingLesson(module="Week 1", lesson_title="A", url="https://x/a"),
+    ReadingLesson(module="Week 1", lesson_title="B", url="https://x/b"),
+]
+
+
+def test_resume_restores_discovery_and_completed(tmp_path):
+    out = tmp_path / "A.csv"
+    out.write_text("data")
+    journal = Journal("slug", journal_dir=tmp_path)
+    journal.record_discovery(LESSONS)
+    journal.record_written(LESSONS[0], out)
+    journal.close()
+
+    resumed = Journal("slug", journal_dir=tmp_path)
+    assert resumed.readings == LESSONS
+    assert resumed.is_done("https://x/a")
+    assert not resumed.is_done("https://x/b")
+
+
+def test_modified_output_is_not_done(tmp_path):
+    out = tmp_path / "A.csv"
+    out.write_text("data")
+    journal = Journal("slug", journal_dir=tmp_path)
+    journal.record_written(LESSONS[0], out)
+    out.write_text("truncated")
+    assert not journal.is_done("https://x/a")
+
+
+def test_finished_run_starts_over(tmp_path):
+    journal = Journal("slug", journal_dir=tmp_path)
+    journal.record_discovery(LESSONS)
+    journal.record_finished()
+    journal.close()
+    assert Journal("slug", journal_dir=tmp_path).readings is None
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal = Journal("slug", journal_dir=tmp_path)
+    journal.record_discovery(LESSONS)
+    journal.close()
+    with journal.path.open("a") as f:
+        f.write('{"event": "writ')
+    assert Journal("slug", journal_dir=tmp_path).readings == LESSONS
+
+
+def test_shared_output_is_not_hashed(tmp_path):
+    db = tmp_path / "readings.sqlite3"
+    db.write_text("v1")
+    journal = Journal("slug", journal_dir=tmp_path)
+    journal.record_written(LESSONS[0], db, shared=True)
+    db.write_text("v2")
+    assert journal.is_done("https://x/a")
+
+
+async def stream(lessons):
+    for lesson in lessons:
+        yield lesson
+
+
+@pytest.mark.asyncio
+async def test_streamed_discovery_is_reused_only_when_complete(tmp_path):
+    journal = Journal("slug", journal_dir=tmp_path)
+    seen = [lesson async for lesson in journal.track_discovery(stream(LESSONS))]
+    journal.close()
+    assert seen == LESSONS
+    assert Journal("slug", journal_dir=tmp_path).readings == LESSONS
+
+    failed = Journal("failed", journal_dir=tmp_path)
+    [lesson async for lesson in failed.track_discovery(stream(LESSONS), failed_modules=["Week 3"])]
+    failed.close()
+    # A module that failed to load must be discovered again, not treated as empty
+    assert Journal("failed", journal_dir=tmp_path).readings is None
+
+    partial = Journal("other", journal_dir=tmp_path)
+    async for _ in partial.track_discovery(stream(LESSONS)):
+        break
+    partial.close()
+    assert Journal("other", journal_dir=tmp_path).readings is None
+
+
+@pytest.mark.asyncio
+async def test_rediscovery_replaces_an_interrupted_one(tmp_path):
+    more = LESSONS + [ReadingLesson(module="Week 2", lesson_title="C", url="https://x/c")]
+    # Interrupted during discovery, then again after discovering everything
+    first = Journal("slug", journal_dir=tmp_path)
+    async for lesson in first.track_discovery(stream(more)):
+        if lesson == LESSONS[1]:
+            break
+    first.close()
+    second = Journal("slug", journal_dir=tmp_path)
+    [lesson async for lesson in second.track_discovery(stream(more))]
+    second.close()
+    assert Journal("slug", journal_dir=tmp_path).readings == more
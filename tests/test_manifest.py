@@ -0,0 +1,57 @@
+# tests/test_manifest.py
+from src.manifest import Manifest, html_sha256
+from src.navigator import ReadingLesson
+
+A = ReadingLesson(module="Week 1", lesson_title="A", url="https://x/a")
+B = ReadingLesson(module="Week 1", lesson_title="B", url="https://x/b")
+C = ReadingLesson(module="Week 2", lesson_title="C", url="https://x/c")
+
+
+def run(tmp_path, lessons, html, complete=True, parser="html.parser"):
+    """One run over `lessons`, writing those whose HTML changed. Returns the report."""
+    manifest = Manifest("slug", parser=parser, manifest_dir=tmp_path / "m")
+    for lesson in lessons:
+        manifest.see(lesson)
+        digest = html_sha256(html[lesson.url])
+        if manifest.is_unchanged(lesson.url, digest):
+            manifest.record_unchanged(lesson)
+        else:
+            out = tmp_path / f"{lesson.lesson_title}.csv"
+            out.write_text(html[lesson.url])
+            manifest.record_written(lesson, digest, out)
+    report = manifest.finish(complete=complete)
+    manifest.close()
+    return {kind: [l["lesson_title"] for l in getattr(report, kind)] for kind in ("added", "changed", "unchanged", "removed")}
+
+
+def test_reports_added_changed_unchanged_and_removed(tmp_path):
+    html = {A.url: "<p>a</p>", B.url: "<p>b</p>", C.url: "<p>c</p>"}
+    assert run(tmp_path, [A, B], html)["added"] == ["A", "B"]
+
+    html[B.url] = "<p>b, revised</p>"
+    assert run(tmp_path, [B, C], html) == {
+        "added": ["C"], "changed": ["B"], "unchanged": [], "removed": ["A"],
+    }
+    assert run(tmp_path, [B, C], html)["unchanged"] == ["B", "C"]
+
+
+def test_converter_change_or_missing_output_rewrites(tmp_path):
+    html = {A.url: "<p>a</p>", B.url: "<p>b</p>"}
+    run(tmp_path, [A, B], html)
+    assert run(tmp_path, [A, B], html, parser="lxml")["changed"] == ["A", "B"]
+
+    (tmp_path / "A.csv").unlink()
+    assert run(tmp_path, [A, B], html, parser="lxml")["changed"] == ["A"]
+
+
+def test_interrupted_run_changes_carry_over(tmp_path):
+    html = {A.url: "<p>a</p>", B.url: "<p>b</p>"}
+    run(tmp_path, [A, B], html)
+    html[A.url] = "<p>a2</p>"
+    # Incomplete: nothing is removed and the change stays pending
+    assert run(tmp_path, [A], html, complete=False) == {
+        "added": [], "changed": ["A"], "unchanged": [], "removed": [],
+    }
+    report = run(tmp_path, [A, B], html)
+    assert report["changed"] == ["A"] and report["unchanged"] == ["B"]
+    assert run(tmp_path, [A, B], html)["changed"] == []
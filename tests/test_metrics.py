@@ -0,0 +1,42 @@
+# tests/test_metrics.py
+import json
+import pytest
+from src.metrics import Metrics
+
+
+def test_spans_and_counters_roll_up_per_stage_and_lesson():
+    m = Metrics()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        m.observe("extract", seconds, lesson="https://x/a")
+    with m.span("convert", lesson="https://x/a"):
+        pass
+    m.incr("extract_retries", lesson="https://x/a")
+    m.incr("bytes_received", 2048, lesson="https://x/a")
+    m.incr("cache_hits")
+
+    report = m.report()
+    assert report["stages"]["extract"]["count"] == 4
+    assert report["stages"]["extract"]["total_s"] == pytest.approx(1.0)
+    assert report["stages"]["extract"]["max_s"] == 0.4
+    assert report["counters"] == {"extract_retries": 1, "bytes_received": 2048, "cache_hits": 1}
+    lesson = report["lessons"]["https://x/a"]
+    assert lesson["extract_s"] == pytest.approx(1.0)
+    assert lesson["bytes_received"] == 2048
+    assert "convert_s" in lesson
+
+    m.reset()
+    assert m.report()["stages"] == {}
+
+
+def test_json_and_prometheus_files(tmp_path):
+    m = Metrics()
+    m.observe("write", 0.5)
+    m.incr("lessons_saved", 3)
+
+    data = json.loads(m.write_json(tmp_path / "metrics.json").read_text())
+    assert data["counters"]["lessons_saved"] == 3
+
+    text = m.write_prometheus(tmp_path / "scraper.prom").read_text()
+    assert 'coursera_scraper_stage_seconds_count{stage="write"} 1' in text
+    assert "coursera_scraper_lessons_saved_total 3" in text
+    assert not (tmp_path / "scraper.prom.tmp").exists()
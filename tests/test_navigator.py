@@ -1,6 +1,16 @@
 # tests/test_navigator.py
+import asyncio
+import json
 from pathlib import Path
-from src.navigator import parse_module_page, ReadingLesson
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.navigator import (
+    get_course_readings,
+    parse_course_materials,
+    parse_module_page,
+    ReadingLesson,
+)
 
 
 FIXTURE = (Path(__file__).parent / "fixtures" / "course_sidebar.html").read_text()
@@ -29,3 +39,119 @@ def test_captures_module_name():
 def test_full_url():
     _, readings = parse_module_page(FIXTURE, base_url="https://www.coursera.org")
     assert readings[0].url.startswith("https://www.coursera.org")
+
+
+def module_html(name, items):
+    links = "".join(
+        f'<div data-test="WeekSingleItemDisplay-supplement"><a href="/learn/c/supplement/{i}/x">'
+        f'<p data-test="rc-ItemName">{i}</p></a></div>'
+        for i in items
+    )
+    return f'<div data-test="rc-periodPage"><h2>{name}</h2>{links}</div>'
+
+
+class FakeContext:
+    """Serves canned HTML per URL; module pages finish in reverse order."""
+
+    def __init__(self, pages, failures=None):
+        self.pages = pages
+        self.failures = dict(failures or {})
+
+    async def new_page(self):
+        context = self
+        page = MagicMock()
+
+        async def goto(url, **kwargs):
+            page.url = url
+            if context.failures.get(url, 0) > 0:
+                context.failures[url] -= 1
+                raise TimeoutError("navigation timed out")
+            await asyncio.sleep(0.05 if url.endswith("/1") else 0.0)
+
+        async def content():
+            return context.pages[page.url]
+
+        page.goto = goto
+        page.content = content
+        page.close = AsyncMock()
+        return page
+
+
+HOME = (
+    '<a data-testid="rc-WeekNavigationItem" href="/learn/c/home/module/1"></a>'
+    '<a data-testid="rc-WeekNavigationItem" href="/learn/c/home/module/2"></a>'
+    '<a data-testid="rc-WeekNavigationItem" href="/learn/c/home/module/3"></a>'
+)
+BASE = "https://www.coursera.org/learn/c/home/module/"
+
+
+@pytest.mark.asyncio
+async def test_module_order_is_deterministic():
+    context = FakeContext({
+        "https://www.coursera.org/learn/c": HOME,
+        BASE + "1": module_html("M1", ["a", "b"]),
+        BASE + "2": module_html("M2", ["c"]),
+        BASE + "3": module_html("M3", ["d"]),
+    })
+    readings, slug = await get_course_readings(context, "https://www.coursera.org/learn/c", use_api=False)
+    assert slug == "c"
+    assert [r.lesson_title for r in readings] == ["a", "b", "c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_failed_module_is_isolated():
+    context = FakeContext(
+        {
+            "https://www.coursera.org/learn/c": HOME,
+            BASE + "1": module_html("M1", ["a"]),
+            BASE + "2": module_html("M2", ["b"]),
+            BASE + "3": module_html("M3", ["c"]),
+        },
+        failures={BASE + "2": 5, BASE + "3": 1},
+    )
+    readings, _ = await get_course_readings(
+        context, "https://www.coursera.org/learn/c", retry=1, use_api=False
+    )
+    assert [r.lesson_title for r in readings] == ["a", "c"]
+
+
+MATERIALS = {
+    "elements": [{"id": "COURSE1", "moduleIds": ["m1", "m2"]}],
+    "linked": {
+        "onDemandCourseMaterialModules.v1": [
+            {"id": "m2", "name": "Week 2", "lessonIds": ["l2"]},
+            {"id": "m1", "name": "Week 1", "lessonIds": ["l1"]},
+        ],
+        "onDemandCourseMaterialLessons.v1": [
+            {"id": "l1", "name": "Basics", "itemIds": ["abc123", "def456"]},
+            {"id": "l2", "name": "More", "itemIds": ["ghi789"]},
+        ],
+        "onDemandCourseMaterialItems.v2": [
+            {"id": "abc123", "name": "Intro", "slug": "intro", "contentSummary": {"typeName": "supplement"}},
+            {"id": "def456", "name": "Video", "slug": "video", "contentSummary": {"typeName": "lecture"}},
+            {"id": "ghi789", "name": "Next", "slug": "next", "contentSummary": {"typeName": "supplement"}},
+        ],
+    },
+}
+
+
+def test_parse_course_materials_keeps_course_order():
+    readings = parse_course_materials(MATERIALS, "c")
+    assert readings == [
+        ReadingLesson("Week 1", "Intro", "https://www.coursera.org/learn/c/supplement/abc123/intro"),
+        ReadingLesson("Week 2", "Next", "https://www.coursera.org/learn/c/supplement/ghi789/next"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_discovery_uses_materials_api():
+    context = MagicMock()
+    response = MagicMock(ok=True, status=200)
+    response.json = AsyncMock(return_value=MATERIALS)
+    response.body = AsyncMock(return_value=json.dumps(MATERIALS).encode())
+    context.request.get = AsyncMock(return_value=response)
+    context.new_page = AsyncMock()
+
+    readings, _ = await get_course_readings(context, "https://www.coursera.org/learn/c")
+    assert [r.lesson_title for r in readings] == ["Intro", "Next"]
+    context.new_page.assert_not_called()
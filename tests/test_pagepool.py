@@ -0,0 +1,87 @@
+# tests/test_pagepool.py
+import pytest
+from src.pagepool import PagePool, borrow_page
+
+
+class FakePage:
+    def __init__(self, heap=0):
+        self.heap = heap
+        self.listeners = []
+        self.visits = []
+        self.closed = False
+
+    def on(self, event, handler):
+        self.listeners.append((event, handler))
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove((event, handler))
+
+    async def goto(self, url, **kwargs):
+        self.visits.append(url)
+
+    async def evaluate(self, script):
+        return self.heap
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, heap=0):
+        self.heap = heap
+        self.pages = []
+
+    async def new_page(self):
+        page = FakePage(self.heap)
+        self.pages.append(page)
+        return page
+
+
+@pytest.mark.asyncio
+async def test_pages_are_reused_with_listeners_removed():
+    context = FakeContext()
+    pool = PagePool(context)
+    for url in ("https://x/1", "https://x/2"):
+        async with pool.lease() as lease:
+            lease.on("response", lambda r: None)
+            await lease.page.goto(url)
+
+    [page] = context.pages
+    assert page.listeners == []
+    assert page.visits == ["https://x/1", "about:blank", "https://x/2", "about:blank"]
+    assert (pool.created, pool.reused) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_pages_are_recycled_after_max_uses():
+    context = FakeContext()
+    pool = PagePool(context, max_uses=2)
+    for _ in range(3):
+        async with pool.lease():
+            pass
+    assert len(context.pages) == 2
+    assert context.pages[0].closed and not context.pages[1].closed
+    assert pool.recycled == 1
+
+
+@pytest.mark.asyncio
+async def test_large_heap_and_failed_navigation_discard_the_page():
+    pool = PagePool(FakeContext(heap=500_000_000), max_heap_mb=256)
+    async with pool.lease() as lease:
+        pass
+    assert lease.page.closed
+
+    pool = PagePool(FakeContext())
+    with pytest.raises(TimeoutError):
+        async with pool.lease() as lease:
+            raise TimeoutError("navigation timed out")
+    assert lease.page.closed
+    assert pool.recycled == 1
+
+
+@pytest.mark.asyncio
+async def test_borrow_without_pool_closes_the_page():
+    context = FakeContext()
+    async with borrow_page(context) as lease:
+        pass
+    assert lease.page.closed
@@ -0,0 +1,269 @@
+# tests/test_pipeline.py
+import asyncio
+import csv
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from unittest.mock import patch
+from src.archive import HtmlArchive, load_archived
+from src.cache import HtmlCache
+from src.database import SectionDatabase
+from src.journal import Journal
+from src.manifest import Manifest
+from src.navigator import ReadingLesson
+from src.pipeline import scrape_lessons
+from src.sinks import LessonRecord, Sink, SqliteSink
+
+
+def make_lessons(n):
+    return [
+        ReadingLesson(module="Week 1", lesson_title=f"Lesson {i}", url=f"https://x/supplement/{i}/l")
+        for i in range(n)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_output_matches_sequential(tmp_path):
+    async def fake_extract(context, url, **kwargs):
+        await asyncio.sleep(0.01)
+        return f"<h2>Part</h2><p>{url}</p>"
+
+    lessons = make_lessons(6)
+    with patch("src.pipeline.extract_reading_content", side_effect=fake_extract):
+        await scrape_lessons(None, lessons, "slug", concurrency=1, output_dir=tmp_path / "seq")
+        stats = await scrape_lessons(None, lessons, "slug", concurrency=4, output_dir=tmp_path / "par")
+
+    assert stats.saved == 6
+    seq = sorted(p.name for p in (tmp_path / "seq" / "slug").iterdir())
+    par = sorted(p.name for p in (tmp_path / "par" / "slug").iterdir())
+    assert seq == par
+    for name in seq:
+        assert (tmp_path / "seq" / "slug" / name).read_text() == (tmp_path / "par" / "slug" / name).read_text()
+
+
+@pytest.mark.asyncio
+async def test_workers_run_in_parallel(tmp_path):
+    active = 0
+    peak = 0
+
+    async def fake_extract(context, url, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return "<p>x</p>"
+
+    with patch("src.pipeline.extract_reading_content", side_effect=fake_extract):
+        await scrape_lessons(None, make_lessons(8), "slug", concurrency=3, output_dir=tmp_path)
+
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_extraction_is_skipped(tmp_path):
+    async def fake_extract(context, url, **kwargs):
+        return None if url.endswith("/1/l") else "<p>ok</p>"
+
+    with patch("src.pipeline.extract_reading_content", side_effect=fake_extract):
+        stats = await scrape_lessons(None, make_lessons(3), "slug", concurrency=2, output_dir=tmp_path)
+
+    assert stats.saved == 2
+    assert stats.skipped == 1
+    rows = list(csv.DictReader((tmp_path / "slug" / "Lesson_0.csv").open(encoding="utf-8")))
+    assert rows[0]["content"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cached_lessons_skip_extraction(tmp_path):
+    cache = HtmlCache(tmp_path / "cache.sqlite3")
+    lessons = make_lessons(2)
+    cache.put(lessons[0].url, "<p>cached</p>")
+
+    with patch("src.pipeline.extract_reading_content", return_value="<p>fresh</p>") as extract:
+        await scrape_lessons(None, lessons, "slug", cache=cache, output_dir=tmp_path)
+        assert extract.await_count == 1
+
+        await scrape_lessons(None, lessons, "slug", cache=cache, refresh=True, output_dir=tmp_path)
+        assert extract.await_count == 3
+
+    assert cache.get(lessons[0].url) == "<p>fresh</p>"
+
+
+@pytest.mark.asyncio
+async def test_only_fetched_missing_or_moved_html_is_archived(tmp_path):
+    cache = HtmlCache(tmp_path / "cache.sqlite3")
+    archive = HtmlArchive(tmp_path / "archive")
+    lessons = make_lessons(3)
+    cache.put(lessons[0].url, "<p>cached</p>")
+    cache.put(lessons[1].url, "<p>cached</p>")
+    # Archived when it was fetched; the other cached lesson predates the archive
+    archived = archive.put("slug", lessons[0], 1, "<p>cached</p>")
+    archived_at = archived.stat().st_mtime_ns
+
+    with patch("src.pipeline.extract_reading_content", return_value="<p>fresh</p>"):
+        await scrape_lessons(None, lessons, "slug", cache=cache, archive=archive, output_dir=tmp_path)
+
+    assert archived.stat().st_mtime_ns == archived_at
+    assert load_archived(archive.path_for("slug", lessons[1].url)).html == "<p>cached</p>"
+    assert load_archived(archive.path_for("slug", lessons[2].url)).html == "<p>fresh</p>"
+
+    # The course is reorganised: the cached lesson moves to another module
+    moved = ReadingLesson(module="Week 2", lesson_title="Lesson 0", url=lessons[0].url)
+    with patch("src.pipeline.extract_reading_content", return_value="<p>fresh</p>"):
+        await scrape_lessons(None, [moved], "slug", cache=cache, archive=archive, output_dir=tmp_path)
+    assert load_archived(archived).module == "Week 2"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_lesson_url_does_not_abort_the_course(tmp_path):
+    lessons = make_lessons(2) + make_lessons(1)
+    manifest = Manifest("slug", manifest_dir=tmp_path / "manifest")
+
+    with patch("src.pipeline.extract_reading_content", return_value="<p>x</p>"):
+        stats = await scrape_lessons(
+            None, lessons, "slug", concurrency=2, output_dir=tmp_path, manifest=manifest
+        )
+    manifest.close()
+
+    assert (stats.total, stats.saved, stats.skipped) == (2, 2, 0)
+    assert sorted(p.name for p in (tmp_path / "slug").rglob("*.csv")) == ["Lesson_0.csv", "Lesson_1.csv"]
+
+
+@pytest.mark.asyncio
+async def test_journal_skips_finished_lessons(tmp_path):
+    lessons = make_lessons(3)
+    journal = Journal("slug", journal_dir=tmp_path / "journal")
+
+    with patch("src.pipeline.extract_reading_content", return_value="<p>x</p>") as extract:
+        await scrape_lessons(None, lessons[:2], "slug", journal=journal, output_dir=tmp_path)
+        stats = await scrape_lessons(None, lessons, "slug", journal=journal, output_dir=tmp_path)
+
+    assert extract.await_count == 3
+    assert stats.resumed == 2
+    assert stats.saved == 1
+
+
+@pytest.mark.asyncio
+async def test_process_pool_conversion_matches_inline(tmp_path):
+    lessons = make_lessons(4)
+
+    async def fake_extract(context, url, **kwargs):
+        return f"<p>Intro</p><h2>Part</h2><p>{url}</p>"
+
+    with patch("src.pipeline.extract_reading_content", side_effect=fake_extract):
+        await scrape_lessons(None, lessons, "slug", output_dir=tmp_path / "inline")
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            stats = await scrape_lessons(
+                None, lessons, "slug", concurrency=2, executor=executor,
+                convert_workers=2, output_dir=tmp_path / "pool",
+            )
+
+    assert stats.saved == 4
+    for lesson in lessons:
+        name = lesson.lesson_title.replace(" ", "_") + ".csv"
+        assert (tmp_path / "inline" / "slug" / name).read_text() == (tmp_path / "pool" / "slug" / name).read_text()
+
+
+@pytest.mark.asyncio
+async def test_failing_stage_cancels_the_others(tmp_path):
+    class RecordingSink(Sink):
+        def __init__(self):
+            self.closed = False
+            self.written_after_close = 0
+
+        def write_batch(self, records):
+            if self.closed:
+                self.written_after_close += len(records)
+            return [tmp_path / r.lesson_title for r in records]
+
+        def close(self):
+            self.closed = True
+
+    async def fake_extract(context, url, **kwargs):
+        await asyncio.sleep(0.01)
+        return "<p>x</p>"
+
+    def record(course_slug, module, lesson_title, url, sections):
+        if lesson_title == "Lesson 3":
+            raise RuntimeError("converter bug")
+        return LessonRecord(course_slug, module, lesson_title, url, sections)
+
+    sink = RecordingSink()
+    with patch("src.pipeline.extract_reading_content", side_effect=fake_extract), \
+            patch("src.pipeline.LessonRecord", side_effect=record):
+        with pytest.raises(RuntimeError, match="converter bug"):
+            await scrape_lessons(
+                None, make_lessons(20), "slug", concurrency=2, convert_workers=2, sink=sink, output_dir=tmp_path
+            )
+        sink.close()
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+        # Longer than the writer's flush interval: nothing may still be writing
+        await asyncio.sleep(1.2)
+
+    assert sink.written_after_close == 0
+
+
+@pytest.mark.asyncio
+async def test_database_sink_journals_written_lessons(tmp_path):
+    database = SectionDatabase(tmp_path / "r.sqlite3")
+    journal = Journal("slug", journal_dir=tmp_path / "journal")
+
+    with patch("src.pipeline.extract_reading_content", return_value="<p>searchable</p>"):
+        stats = await scrape_lessons(
+            None, make_lessons(3), "slug", sink=SqliteSink(database), journal=journal, output_dir=tmp_path
+        )
+
+    assert stats.saved == 3
+    assert not (tmp_path / "slug").exists()
+    assert len(database.search("searchable")) == 3
+    assert all(journal.is_done(l.url) for l in make_lessons(3))
+
+
+@pytest.mark.asyncio
+async def test_first_lesson_saved_while_discovery_runs(tmp_path):
+    saved_before_discovery_finished = []
+
+    async def slow_discovery():
+        first, *rest = make_lessons(3)
+        yield first
+        # Longer than the writer's flush interval
+        await asyncio.sleep(1.5)
+        saved_before_discovery_finished.extend((tmp_path / "slug").glob("*.csv"))
+        for lesson in rest:
+            yield lesson
+
+    with patch("src.pipeline.extract_reading_content", return_value="<p>x</p>"):
+        stats = await scrape_lessons(None, slow_discovery(), "slug", concurrency=2, output_dir=tmp_path)
+
+    assert stats.total == 3
+    assert stats.saved == 3
+    assert saved_before_discovery_finished
+
+
+@pytest.mark.asyncio
+async def test_unchanged_lessons_are_not_rewritten(tmp_path):
+    lessons = make_lessons(3)
+    html = {l.url: f"<h2>Part</h2><p>{l.url}</p>" for l in lessons}
+
+    async def fake_extract(context, url, **kwargs):
+        return html[url]
+
+    async def scrape():
+        manifest = Manifest("slug", manifest_dir=tmp_path / "manifest")
+        with patch("src.pipeline.extract_reading_content", side_effect=fake_extract):
+            stats = await scrape_lessons(None, lessons, "slug", output_dir=tmp_path, manifest=manifest)
+        report = manifest.finish()
+        manifest.close()
+        return stats, report
+
+    stats, report = await scrape()
+    assert stats.saved == 3 and len(report.added) == 3
+    mtimes = {p: p.stat().st_mtime_ns for p in (tmp_path / "slug").iterdir()}
+
+    html[lessons[1].url] = "<h2>Part</h2><p>revised</p>"
+    stats, report = await scrape()
+    assert (stats.saved, stats.unchanged) == (1, 2)
+    assert [l["url"] for l in report.changed] == [lessons[1].url]
+    changed = [p for p in mtimes if p.stat().st_mtime_ns != mtimes[p]]
+    assert [p.name for p in changed] == ["Lesson_1.csv"]
@@ -0,0 +1,85 @@
+# tests/test_runner.py
+import pytest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.pipeline import RunStats
+from src.runner import ScrapeOptions, run_courses
+
+OPTIONS = ScrapeOptions(use_cache=False, convert_workers=0, block_resources=False, metrics_path=None)
+
+
+def mock_login():
+    browser = MagicMock()
+    browser.close = AsyncMock()
+    playwright = MagicMock()
+    playwright.stop = AsyncMock()
+    context = MagicMock()
+    context.storage_state = AsyncMock(return_value={"cookies": [], "origins": []})
+    context.close = AsyncMock()
+    return AsyncMock(return_value=(playwright, browser, context)), browser, context
+
+
+@pytest.mark.asyncio
+async def test_batch_logs_in_once_and_isolates_failures():
+    login, browser, login_context = mock_login()
+    course_contexts = []
+
+    async def fake_new_context(browser, storage_state, blocker):
+        context = MagicMock()
+        context.close = AsyncMock()
+        course_contexts.append(context)
+        return context
+
+    async def fake_scrape(context, course_url, options, shared):
+        if course_url.endswith("broken"):
+            raise RuntimeError("module pages unavailable")
+        return RunStats(total=2, saved=2)
+
+    urls = ["https://x/learn/a", "https://x/learn/broken", "https://x/learn/c"]
+    with patch("src.runner.login", login), \
+            patch("src.runner.new_context", side_effect=fake_new_context), \
+            patch("src.runner.scrape_course", side_effect=fake_scrape) as scrape:
+        results = await run_courses(urls, "e", "p", OPTIONS)
+
+    login.assert_awaited_once()
+    browser.close.assert_awaited_once()
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[1].error == "module pages unavailable"
+    assert results[2].stats.saved == 2
+    # First course reuses the login context, the others get their own
+    assert scrape.call_args_list[0].args[0] is login_context
+    assert len(course_contexts) == 2
+    assert all(c.close.await_count == 1 for c in course_contexts)
+    # Every course draws on the same limiter and extraction slots
+    shared = {id(call.args[3]) for call in scrape.call_args_list}
+    assert len(shared) == 1
+
+
+def test_har_options_force_navigation():
+    options = ScrapeOptions(record_har=Path("run.har"))
+    assert not options.direct and not options.api_discovery
+    assert options.refresh and options.fresh
+    assert not options.use_cache and not options.incremental
+    replay = ScrapeOptions(replay_har=Path("run.har"))
+    assert not replay.direct and not replay.refresh
+    assert not replay.use_cache and not replay.incremental
+
+
+@pytest.mark.asyncio
+async def test_har_run_keeps_courses_in_the_login_context():
+    login, browser, login_context = mock_login()
+
+    async def fake_scrape(context, course_url, options, shared):
+        return RunStats(total=1, saved=1)
+
+    options = ScrapeOptions(use_cache=False, convert_workers=0, record_har=Path("run.har"), metrics_path=None)
+    with patch("src.runner.login", login), \
+            patch("src.runner.new_context") as new_context, \
+            patch("src.runner.scrape_course", side_effect=fake_scrape) as scrape:
+        await run_courses(["https://x/learn/a", "https://x/learn/b"], "e", "p", options)
+
+    assert login.call_args.kwargs["record_har"] == Path("run.har")
+    new_context.assert_not_called()
+    assert all(call.args[0] is login_context for call in scrape.call_args_list)
+    # The HAR is only written when the context is closed
+    login_context.close.assert_awaited_once()
@@ -0,0 +1,50 @@
+# tests/test_sharding.py
+import asyncio
+import sqlite3
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src import sharding
+from src.navigator import ReadingLesson
+from src.runner import ScrapeOptions
+
+OPTIONS = ScrapeOptions(
+    rate=0, use_cache=False, archive=False, block_resources=False, page_max_uses=0, metrics_path=None
+)
+LESSONS = [ReadingLesson(module="Week 1", lesson_title=f"Lesson {i}", url=f"https://x/{i}") for i in range(12)]
+
+
+def _fake_worker(queue_path, worker_id, email, password, options, workers):
+    """worker_main with a fake browser; runs in a spawned process."""
+    async def fake_extract(context, url, **kwargs):
+        await asyncio.sleep(0.05)
+        return f"<h2>Part</h2><p>{url}</p>"
+
+    login = AsyncMock(return_value=(MagicMock(stop=AsyncMock()), MagicMock(close=AsyncMock()), MagicMock()))
+    with patch("src.sharding.login", login), \
+            patch("src.sharding.extract_reading_content", side_effect=fake_extract):
+        asyncio.run(sharding._work(queue_path, worker_id, email, password, options, workers))
+
+
+@pytest.mark.asyncio
+async def test_two_workers_drain_the_queue(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def fake_enqueue(queue, course_urls, email, password, options):
+        queue.enqueue("slug", LESSONS)
+
+    with patch("src.sharding.enqueue_courses", side_effect=fake_enqueue), \
+            patch("src.sharding.worker_main", _fake_worker):
+        [result] = await sharding.run_sharded(
+            ["https://x/learn/slug"], "e", "p", OPTIONS, workers=2, queue_path=tmp_path / "q.sqlite3"
+        )
+
+    assert result.ok and result.stats.saved == len(LESSONS)
+    assert sorted(p.name for p in (tmp_path / "output" / "slug").iterdir()) == sorted(
+        f"Lesson_{i}.csv" for i in range(len(LESSONS))
+    )
+    conn = sqlite3.connect(tmp_path / "q.sqlite3")
+    workers = {worker for (worker,) in conn.execute("SELECT worker FROM jobs WHERE status = 'done'")}
+    conn.close()
+    # w<slot>-<restarts>: both first-generation workers, no replacement needed
+    assert workers <= {"w0-0", "w1-0"}
@@ -0,0 +1,125 @@
+# tests/test_sinks.py
+import asyncio
+import csv
+import gzip
+import json
+
+import pytest
+from src.converter import Section
+from src.pipeline import BatchWriter
+from src.sinks import LessonRecord, make_sink
+
+
+def record(title, n=2):
+    return LessonRecord(
+        course_slug="course",
+        module="Week 1",
+        lesson_title=title,
+        url=f"https://x/{title}",
+        sections=[Section(heading=f"H{i}", content=f"C{i}") for i in range(n)],
+    )
+
+
+def test_csv_sink_matches_write_csv_layout(tmp_path):
+    sink = make_sink("csv", output_dir=tmp_path)
+    [path] = sink.write_batch([record("My Lesson")])
+    assert path == tmp_path / "course" / "My_Lesson.csv"
+    rows = list(csv.DictReader(path.open(encoding="utf-8")))
+    assert [r["section"] for r in rows] == ["H0", "H1"]
+
+
+def test_jsonl_gz_sink_writes_one_line_per_section(tmp_path):
+    sink = make_sink("jsonl.gz", output_dir=tmp_path)
+    paths = sink.write_batch([record("A"), record("B", n=3)])
+    sink.close()
+
+    assert paths == [tmp_path / "course.jsonl.gz"] * 2
+    lines = [json.loads(l) for l in gzip.open(paths[0], "rt", encoding="utf-8")]
+    assert len(lines) == 5
+    assert lines[2] == {
+        "course": "course", "module": "Week 1", "lesson_title": "B",
+        "url": "https://x/B", "position": 0, "section": "H0", "content": "C0",
+    }
+
+
+def test_jsonl_append_keeps_earlier_lessons(tmp_path):
+    first = make_sink("jsonl", output_dir=tmp_path)
+    first.write_batch([record("A")])
+    first.close()
+    second = make_sink("jsonl", output_dir=tmp_path, append=True)
+    second.write_batch([record("B")])
+    second.close()
+
+    lines = (tmp_path / "course.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["lesson_title"] for l in lines] == ["A", "A", "B", "B"]
+
+
+def test_resume_after_torn_gzip_member(tmp_path):
+    crashed = make_sink("jsonl.gz", output_dir=tmp_path)
+    crashed.write_batch([record("A")])
+    crashed.write_batch([record("B")])
+    path = tmp_path / "course.jsonl.gz"
+    # What a crash leaves: flushed data, no gzip trailer, and B's last bytes cut off
+    torn = path.read_bytes()[:-4]
+    crashed.close()
+    path.write_bytes(torn)
+
+    resumed = make_sink("jsonl.gz", output_dir=tmp_path, append=True, keep={"https://x/A", "https://x/B"})
+    resumed.write_batch([record("C")])
+    resumed.close()
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        titles = [json.loads(l)["lesson_title"] for l in f]
+    assert titles[:2] == ["A", "A"] and titles[-2:] == ["C", "C"]
+    assert set(titles) <= {"A", "B", "C"}
+
+
+def test_resume_drops_rows_the_journal_does_not_know(tmp_path):
+    first = make_sink("jsonl", output_dir=tmp_path)
+    first.write_batch([record("A"), record("B")])
+    first.close()
+    second = make_sink("jsonl", output_dir=tmp_path, append=True, keep={"https://x/A"})
+    second.write_batch([record("B")])
+    second.close()
+
+    lines = (tmp_path / "course.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["lesson_title"] for l in lines] == ["A", "A", "B", "B"]
+
+
+def test_resume_keeps_rows_with_unicode_line_separators(tmp_path):
+    first = make_sink("jsonl", output_dir=tmp_path)
+    odd = record("A")
+    odd.sections[0].content = "before\u2028after\x85 and \x1c"
+    first.write_batch([odd, record("B")])
+    first.close()
+    second = make_sink("jsonl", output_dir=tmp_path, append=True, keep={"https://x/A", "https://x/B"})
+    second.write_batch([record("C")])
+    second.close()
+
+    lines = (tmp_path / "course.jsonl").read_text(encoding="utf-8").split("\n")[:-1]
+    rows = [json.loads(l) for l in lines]
+    assert [r["lesson_title"] for r in rows] == ["A", "A", "B", "B", "C", "C"]
+    assert rows[0]["content"] == "before\u2028after\x85 and \x1c"
+
+
+@pytest.mark.asyncio
+async def test_batch_writer_flushes_in_batches(tmp_path):
+    batches = []
+
+    class RecordingSink:
+        shared = True
+
+        def write_batch(self, records):
+            batches.append([r.lesson_title for r in records])
+            return [tmp_path] * len(records)
+
+    written = []
+    writer = BatchWriter(RecordingSink(), batch_size=3, on_written=lambda r, p: written.append(r.lesson_title))
+    task = asyncio.ensure_future(writer.run())
+    for title in "ABCDE":
+        await writer.put(record(title))
+    await writer.close()
+    await task
+
+    assert batches == [["A", "B", "C"], ["D", "E"]]
+    assert written == list("ABCDE")
@@ -0,0 +1,87 @@
+# tests/test_throttle.py
+import asyncio
+import time
+
+import pytest
+from src.throttle import AdaptiveController, AdaptiveLimit, RateLimiter, backoff_delay
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_acquisitions():
+    limiter = RateLimiter(rate=20)
+    started = time.monotonic()
+    await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+    # First slot is immediate, the next three wait 0.05s each
+    assert time.monotonic() - started >= 0.14
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_zero_rate_is_unlimited():
+    limiter = RateLimiter(rate=0)
+    started = time.monotonic()
+    for _ in range(50):
+        await limiter.acquire()
+    assert time.monotonic() - started < 0.05
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_can_shrink_and_grow():
+    slots = AdaptiveLimit(2)
+    await slots.acquire()
+    await slots.acquire()
+    slots.limit = 1
+    slots.release()
+    waiter = asyncio.ensure_future(slots.acquire())
+    await asyncio.sleep(0)
+    # One holder left and the limit is now 1: still no room
+    assert not waiter.done()
+    slots.limit = 3
+    await asyncio.sleep(0)
+    assert waiter.done() and slots.active == 2
+
+
+def test_controller_backs_off_on_429_and_recovers():
+    limiter = RateLimiter(rate=2.0)
+    slots = AdaptiveLimit(4)
+    controller = AdaptiveController(
+        limiter, slots, min_rate=0.5, max_rate=3.0, max_concurrency=5, increase_after=2, cooldown=60
+    )
+
+    controller.observe(429)
+    assert (limiter.rate, slots.limit) == (1.0, 2)
+    # A burst of errors inside the cooldown counts once
+    controller.observe(503)
+    assert (limiter.rate, slots.limit) == (1.0, 2)
+
+    for _ in range(4):
+        controller.observe(200, latency=0.2)
+    assert (limiter.rate, slots.limit) == (1.5, 4)
+    for _ in range(20):
+        controller.observe(200, latency=0.2)
+    assert (limiter.rate, slots.limit) == (3.0, 5)
+
+
+def test_controller_treats_slow_responses_as_congestion():
+    limiter = RateLimiter(rate=0.6)
+    slots = AdaptiveLimit(1)
+    controller = AdaptiveController(limiter, slots, min_rate=0.5, max_rate=3.0, target_latency=2.0)
+    controller.observe(200, latency=9.0)
+    assert (limiter.rate, slots.limit) == (0.5, 1)
+    assert controller.decreases == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_the_limiter():
+    limiter = RateLimiter(rate=0)
+    controller = AdaptiveController(limiter, AdaptiveLimit(1), min_rate=0.1, max_rate=1000)
+    controller.observe(429, retry_after=0.1)
+    started = time.monotonic()
+    await limiter.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_backoff_delay_grows_with_jitter_and_cap():
+    for attempt, low, high in [(0, 0.5, 1.0), (1, 1.0, 2.0), (3, 4.0, 8.0), (10, 15.0, 30.0)]:
+        delays = [backoff_delay(attempt, base=1.0, cap=30.0) for _ in range(50)]
+        assert all(low <= d <= high for d in delays)
+        assert len(set(delays)) > 1
@@ -0,0 +1,99 @@
+# tests/test_workqueue.py
+import multiprocessing
+from src.navigator import ReadingLesson
+from src.workqueue import WorkQueue
+
+LESSONS = [
+    ReadingLesson(module="Week 1", lesson_title=f"L{i}", url=f"https://x/{i}")
+    for i in range(3)
+]
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    queue = WorkQueue(tmp_path / "q.sqlite3")
+    assert queue.enqueue("slug", LESSONS) == 3
+    assert queue.enqueue("slug", LESSONS) == 0
+    assert queue.counts() == {"pending": 3, "claimed": 0, "done": 0, "failed": 0}
+
+
+def test_claims_are_exclusive_and_complete(tmp_path):
+    path = tmp_path / "q.sqlite3"
+    a, b = WorkQueue(path), WorkQueue(path)
+    a.enqueue("slug", LESSONS)
+
+    first = a.claim("a")
+    second = b.claim("b")
+    assert first.url != second.url
+    assert first.lesson == LESSONS[0]
+
+    a.complete(first, "a", "out/L0.csv")
+    assert b.counts("slug") == {"pending": 1, "claimed": 1, "done": 1, "failed": 0}
+    assert b.remaining() == 2
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = WorkQueue(tmp_path / "q.sqlite3")
+    queue.enqueue("slug", LESSONS[:1])
+    crashed = queue.claim("a", lease_seconds=-1)
+
+    job = queue.claim("b")
+    assert job.url == crashed.url
+    assert job.attempts == 2
+    # The crashed worker can no longer finish a job it lost
+    queue.complete(crashed, "a", "stale")
+    assert queue.counts()["done"] == 0
+    queue.complete(job, "b", "out.csv")
+    assert queue.counts()["done"] == 1
+
+
+def test_live_lease_is_kept_until_released(tmp_path):
+    queue = WorkQueue(tmp_path / "q.sqlite3")
+    queue.enqueue("slug", LESSONS[:1])
+    job = queue.claim("a", lease_seconds=60)
+
+    # Nobody else gets a job whose lease is still running
+    assert queue.claim("b") is None
+    assert queue.counts() == {"pending": 0, "claimed": 1, "done": 0, "failed": 0}
+    # Failing it hands it straight back, without waiting for the lease
+    queue.fail(job, "a", "timeout")
+    retry = queue.claim("b")
+    assert (retry.url, retry.attempts) == (job.url, 2)
+    # The first worker no longer owns it and cannot release it again
+    queue.fail(job, "a", "late")
+    assert queue.counts()["claimed"] == 1
+
+
+def test_failures_retry_until_attempts_run_out(tmp_path):
+    queue = WorkQueue(tmp_path / "q.sqlite3", max_attempts=2)
+    queue.enqueue("slug", LESSONS[:1])
+
+    queue.fail(queue.claim("a"), "a", "timeout")
+    assert queue.counts()["pending"] == 1
+    queue.fail(queue.claim("a"), "a", "timeout")
+    assert queue.claim("a") is None
+    assert queue.counts()["failed"] == 1
+    assert queue.remaining() == 0
+
+
+def _drain(path, worker, results):
+    queue = WorkQueue(path)
+    while (job := queue.claim(worker)) is not None:
+        queue.complete(job, worker, worker)
+        results.put(job.url)
+
+
+def test_processes_claim_each_job_once(tmp_path):
+    path = tmp_path / "q.sqlite3"
+    lessons = [ReadingLesson(module="M", lesson_title=f"L{i}", url=f"https://x/{i}") for i in range(200)]
+    WorkQueue(path).enqueue("slug", lessons)
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_drain, args=(path, f"w{i}", results)) for i in range(4)]
+    for p in workers:
+        p.start()
+    urls = [results.get(timeout=30) for _ in lessons]
+    for p in workers:
+        p.join()
+
+    assert sorted(urls) == sorted(l.url for l in lessons)
@@ -40,3 +40,19 @@ def test_write_csv_multiple_rows(tmp_path):
     path = write_csv("slug", "Mod", "Lesson", sections, tmp_path)
     rows = list(csv.DictReader(path.open(encoding="utf-8")))
     assert len(rows) == 3
+
+
+def test_write_csv_keeps_colliding_titles_apart(tmp_path):
+    def write(module, url, content, owners):
+        return write_csv("slug", module, "Summary", [Section(heading="S", content=content)], tmp_path, url, owners)
+
+    owners = {}
+    first = write("Week 1", "https://x/1", "one", owners)
+    second = write("Week 2", "https://x/2", "two", owners)
+    third = write("Week 2", "https://x/3", "three", owners)
+    assert first.name == "Summary.csv" and second.name == "Summary_Week_2.csv"
+    assert len({first, second, third}) == 3
+    assert "one" in first.read_text(encoding="utf-8")
+    # A later run rewriting one lesson finds its own file again
+    assert write("Week 2", "https://x/2", "two", {}) == second
+    assert write("Week 1", "https://x/1", "one", owners) == first